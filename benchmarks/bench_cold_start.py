@@ -0,0 +1,109 @@
+"""
+Worker cold start: time from a fresh interpreter to the first response, for
+the full settings and the API-only inventory_backend.settings_api profile.
+
+Each run starts a new Python process that builds the WSGI application and
+serves one authenticated GET /api/products/ against a seeded SQLite file,
+then a second request for comparison. Times are medians over --runs.
+
+    python -m benchmarks.bench_cold_start --runs 10
+
+``python manage.py importtime`` shows which imports the startup time goes to.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.common import create_user, print_table, seed_products, test_database
+
+from users.tokens import UserRefreshToken
+
+# Runs in the child; the clock starts before Django is imported
+CHILD = """
+import time
+start = time.perf_counter()
+import json, os, sys
+from django.core.wsgi import get_wsgi_application
+application = get_wsgi_application()
+ready = time.perf_counter()
+
+def request():
+    environ = {
+        'REQUEST_METHOD': 'GET', 'PATH_INFO': '/api/products/', 'QUERY_STRING': '',
+        'SERVER_NAME': 'localhost', 'SERVER_PORT': '80', 'SERVER_PROTOCOL': 'HTTP/1.1',
+        'HTTP_HOST': 'localhost', 'HTTP_ACCEPT': 'application/json',
+        'HTTP_AUTHORIZATION': 'Bearer ' + os.environ['BENCH_TOKEN'],
+        'wsgi.input': sys.stdin.buffer, 'wsgi.url_scheme': 'http', 'wsgi.errors': sys.stderr,
+        'wsgi.multithread': False, 'wsgi.multiprocess': True, 'wsgi.run_once': False,
+    }
+    statuses = []
+    body = b''.join(application(environ, lambda status, headers: statuses.append(status)))
+    return statuses[0], len(body)
+
+status, size = request()
+first = time.perf_counter()
+request()
+second = time.perf_counter()
+print(json.dumps({
+    'status': status, 'bytes': size, 'modules': len(sys.modules),
+    'setup': ready - start, 'first': first - ready, 'second': second - first,
+}))
+"""
+
+
+def run_child(settings_module, env):
+    env = {**env, 'DJANGO_SETTINGS_MODULE': settings_module}
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, '-c', CHILD], env=env, capture_output=True, text=True, check=True,
+    )
+    data = json.loads(result.stdout.splitlines()[-1])
+    data['process'] = time.perf_counter() - start
+    return data
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--products', type=int, default=1000)
+    parser.add_argument('--profiles', default='inventory_backend.settings,inventory_backend.settings_api')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'cold_start.sqlite3')
+        with test_database(path):
+            user = create_user()
+            seed_products(user, args.products)
+            env = {
+                **os.environ,
+                'DB_NAME': path,
+                'DB_REPLICAS': '',
+                'BENCH_TOKEN': str(UserRefreshToken.for_user(user).access_token),
+            }
+            table = []
+            for settings_module in args.profiles.split(','):
+                runs = [run_child(settings_module, env) for _ in range(args.runs)]
+                if runs[0]['status'] != '200 OK':
+                    sys.exit(f"{settings_module}: first request returned {runs[0]['status']}")
+
+                def median_ms(key):
+                    return f"{statistics.median(run[key] for run in runs) * 1000:.1f}"
+
+                table.append([
+                    settings_module, runs[0]['modules'], median_ms('setup'), median_ms('first'),
+                    median_ms('second'), median_ms('process'),
+                ])
+    print_table(
+        ['settings', 'modules', 'setup ms', 'first request ms', 'second request ms', 'process ms'],
+        table,
+    )
+
+
+if __name__ == '__main__':
+    main()
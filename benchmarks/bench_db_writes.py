@@ -0,0 +1,130 @@
+"""
+Concurrent product write throughput for each database profile.
+
+Each configuration gets a fresh database. The script migrates it, then
+starts ``--processes`` local worker processes that each run ``--writes``
+short transactions shaped like the product API's: read the current row,
+then write (insert a product, then bump its quantity).
+Throughput and "database is locked" failures are reported per profile.
+
+    python -m benchmarks.bench_db_writes --processes 8 --writes 200
+
+SQLite profiles always run. Pass ``--postgres`` to include PostgreSQL with
+and without the connection pool; it uses the DB_* connection variables
+from the environment and needs an empty database it may migrate.
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+PROFILES = {
+    'sqlite-default': {'DB_ENGINE': 'sqlite', 'DB_SQLITE_TUNING': 'false'},
+    'sqlite-wal': {'DB_ENGINE': 'sqlite', 'DB_SQLITE_TUNING': 'true'},
+    'postgres-persistent': {'DB_ENGINE': 'postgres', 'DB_POOL': 'false'},
+    'postgres-pool': {'DB_ENGINE': 'postgres', 'DB_POOL': 'true'},
+}
+
+
+def worker(writes, start_at):
+    import django
+
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'inventory_backend.settings')
+    django.setup()
+    from django.contrib.auth.models import User
+    from django.db import OperationalError, transaction
+    from django.db.models import F
+
+    from products.models import Product
+
+    user = User.objects.get(username='bench')
+    done = errors = 0
+    time.sleep(max(0, start_at - time.time()))
+    start = time.perf_counter()
+    for i in range(writes):
+        try:
+            with transaction.atomic():
+                # Read before writing, as the update views do
+                Product.objects.filter(user=user, category='Load').exists()
+                product = Product.objects.create(
+                    user=user, name=f'Load {os.getpid()}-{i}', category='Load', quantity=1, price='1.00'
+                )
+                Product.objects.filter(pk=product.pk).update(quantity=F('quantity') + 1)
+            done += 1
+        except OperationalError as e:
+            if 'locked' not in str(e):
+                raise
+            errors += 1
+    print(json.dumps({'writes': done, 'errors': errors, 'seconds': time.perf_counter() - start}))
+
+
+def run_profile(name, env, args):
+    env = {**os.environ, **env}
+    with tempfile.TemporaryDirectory() as tmp:
+        if env['DB_ENGINE'] == 'sqlite':
+            env['DB_NAME'] = os.path.join(tmp, 'bench.sqlite3')
+        manage = [sys.executable, 'manage.py']
+        subprocess.run([*manage, 'migrate', '--verbosity', '0'], env=env, check=True)
+        subprocess.run(
+            [*manage, 'shell', '--verbosity', '0', '-c',
+             "from django.contrib.auth.models import User; "
+             "User.objects.filter(username='bench').delete(); "
+             "User.objects.create_user('bench', password='bench-password')"],
+            env=env, check=True,
+        )
+
+        start_at = time.time() + 2
+        workers = [
+            subprocess.Popen(
+                [sys.executable, '-m', 'benchmarks.bench_db_writes', '--worker',
+                 '--writes', str(args.writes), '--start-at', str(start_at)],
+                env=env, stdout=subprocess.PIPE, text=True,
+            )
+            for _ in range(args.processes)
+        ]
+        results = []
+        for process in workers:
+            out, _ = process.communicate()
+            if process.returncode:
+                raise SystemExit(f'{name}: worker exited with status {process.returncode}')
+            results.append(json.loads(out.strip().splitlines()[-1]))
+
+        if env['DB_ENGINE'] == 'postgres':
+            subprocess.run(
+                [*manage, 'shell', '--verbosity', '0', '-c',
+                 "from django.contrib.auth.models import User; User.objects.filter(username='bench').delete()"],
+                env=env, check=True,
+            )
+
+    writes = sum(result['writes'] for result in results)
+    errors = sum(result['errors'] for result in results)
+    elapsed = max(result['seconds'] for result in results)
+    return (name, args.processes, writes, errors, f'{writes / elapsed:.0f}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--processes', type=int, default=8)
+    parser.add_argument('--writes', type=int, default=200, help='Transactions per process')
+    parser.add_argument('--postgres', action='store_true')
+    parser.add_argument('--worker', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--start-at', type=float, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        worker(args.writes, args.start_at)
+        return
+
+    from benchmarks.common import print_table
+
+    names = [name for name in PROFILES if args.postgres or name.startswith('sqlite')]
+    rows = [run_profile(name, PROFILES[name], args) for name in names]
+    print_table(['profile', 'processes', 'writes', 'locked errors', 'writes/s'], rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+"""
+Compare the InsightsView statistics as summary.summary_stats reads them
+from InventorySummary with the per-row loop InsightsView started with.
+
+    python -m benchmarks.bench_inventory_stats --sizes 1000,100000,1000000
+"""
+
+import argparse
+
+from benchmarks.common import (
+    create_user, measure, parse_sizes, print_table, seed_products, test_database,
+)
+from products.models import Product
+from products import summary
+
+
+def legacy_stats(products):
+    # The statistics as InsightsView computed them before products.stats
+    if not products.exists():
+        return None
+    total_items = products.count()
+    total_value = sum(p.quantity * p.price for p in products)
+    categories = list(set(p.category for p in products))
+    low_stock = [p for p in products if p.quantity < 10 and p.quantity != 0]
+    out_of_stock = [p for p in products if p.quantity == 0]
+    category_counts = {}
+    for product in products:
+        category_counts[product.category] = category_counts.get(product.category, 0) + 1
+    return total_items, total_value, categories, low_stock, out_of_stock, category_counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', type=parse_sizes, default=parse_sizes('1000,100000,1000000'))
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--skip-legacy-above', type=int, default=100000,
+                        help='Skip the legacy implementation above this many rows')
+    args = parser.parse_args()
+
+    rows = []
+    with test_database():
+        user = create_user()
+        seeded = 0
+        for size in sorted(args.sizes):
+            seed_products(user, size - seeded, seed=size)
+            seeded = size
+            summary.rebuild(user.id)
+
+            def products():
+                return Product.objects.filter(user=user)
+
+            new = measure(lambda: summary.summary_stats(user.id), args.repeat)
+            rows.append((size, 'summary_stats', new['queries'], f"{new['median_ms']:.1f}"))
+            if size <= args.skip_legacy_above:
+                old = measure(lambda: legacy_stats(products()), args.repeat)
+                rows.append((size, 'legacy', old['queries'], f"{old['median_ms']:.1f}"))
+
+    print_table(['rows', 'implementation', 'queries', 'median ms'], rows)
+
+
+if __name__ == '__main__':
+    main()
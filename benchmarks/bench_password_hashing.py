@@ -0,0 +1,83 @@
+"""
+Password hashing cost per configuration, and login hashing throughput in
+users.passwords under different PASSWORD_HASH_CONCURRENCY caps.
+
+    python -m benchmarks.bench_password_hashing --iterations 260000,600000,1000000 --concurrency 1,2,4
+
+``hashes/s/core`` is single-thread throughput; the concurrency rows show
+what a burst of concurrent logins gets when that many hashes may run at
+once. The hashers release the GIL, so throughput grows with the cap up to
+the number of cores.
+"""
+
+import argparse
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.common import parse_sizes, print_table
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.test.utils import override_settings
+
+from users import passwords
+
+
+def hashes_per_second(hasher, duration):
+    count = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < duration:
+        make_password('correct horse battery staple', hasher=hasher)
+        count += 1
+    return count / (time.perf_counter() - start)
+
+
+def burst_throughput(concurrency, burst):
+    # No queue timeout: every hash in the burst waits for its slot
+    with override_settings(PASSWORD_HASH_CONCURRENCY=concurrency, PASSWORD_HASH_QUEUE_TIMEOUT=None):
+        passwords._slots = None
+        with ThreadPoolExecutor(burst) as requests:
+            start = time.perf_counter()
+            list(requests.map(passwords.hash_password, ['correct horse battery staple'] * burst))
+            elapsed = time.perf_counter() - start
+        passwords._slots = None
+    return burst / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--iterations', type=parse_sizes, default=parse_sizes('260000,600000,1000000'))
+    parser.add_argument('--scrypt-work-factors', type=parse_sizes, default=parse_sizes('16384'))
+    parser.add_argument('--concurrency', type=parse_sizes, default=parse_sizes('1,2,4'))
+    parser.add_argument('--burst', type=int, default=16, help='Concurrent hashes per run')
+    parser.add_argument('--duration', type=float, default=2.0, help='Seconds per single-core run')
+    args = parser.parse_args()
+
+    rows = []
+    for iterations in args.iterations:
+        with override_settings(PASSWORD_PBKDF2_ITERATIONS=iterations):
+            rate = hashes_per_second('pbkdf2_sha256', args.duration)
+        rows.append((f'pbkdf2 iterations={iterations}', f'{rate:.1f}', f'{1000 / rate:.1f}'))
+    for work_factor in args.scrypt_work_factors:
+        with override_settings(PASSWORD_SCRYPT_WORK_FACTOR=work_factor):
+            rate = hashes_per_second('scrypt', args.duration)
+        rows.append((f'scrypt work_factor={work_factor}', f'{rate:.1f}', f'{1000 / rate:.1f}'))
+    try:
+        rate = hashes_per_second('argon2', args.duration)
+        rows.append(('argon2 (defaults)', f'{rate:.1f}', f'{1000 / rate:.1f}'))
+    except ValueError:
+        print('argon2: skipped, argon2-cffi is not installed')
+    print_table(['hasher', 'hashes/s/core', 'ms/hash'], rows)
+    print()
+
+    rows = []
+    hasher = settings.PASSWORD_HASHERS[0].rsplit('.', 1)[-1]
+    for concurrency in args.concurrency:
+        rate = burst_throughput(concurrency, args.burst)
+        rows.append((hasher, concurrency, args.burst, f'{rate:.1f}'))
+    print(f'{os.cpu_count()} CPU(s) available')
+    print_table(['preferred hasher', 'concurrency', 'burst', 'hashes/s'], rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+"""
+Query plans and latencies for the product access patterns with and without
+the composite/partial indexes on Product.
+
+Seeds ``--rows`` products spread over ``--users`` users into an on-disk
+SQLite file, drops the Product indexes declared in Meta.indexes to measure
+the "before" state, then recreates them and measures again.
+
+    python -m benchmarks.bench_product_indexes --rows 1000000 --users 20
+"""
+
+import argparse
+import os
+import tempfile
+
+from benchmarks.common import (
+    create_user, measure, print_table, seed_products, test_database,
+)
+from django.db import connection
+from products.models import Product
+from products.stats import category_rows, low_stock, out_of_stock
+
+
+def scenarios(user_id, product_id):
+    products = Product.objects.filter(user_id=user_id)
+    return {
+        'list: first page': lambda: products.order_by('id')[:101],
+        'list: category filter': lambda: products.filter(category='Tools').order_by('id')[:101],
+        'list: quantity range': lambda: products.filter(quantity__lte=5).order_by('quantity', 'id')[:101],
+        'list: order by price': lambda: products.order_by('-price', '-id')[:101],
+        'list: order by name': lambda: products.order_by('name', 'id')[:101],
+        'detail': lambda: products.filter(id=product_id),
+        'insights: categories': lambda: category_rows(products.order_by()),
+        'insights: low stock': lambda: low_stock(products.order_by(), 50),
+        'insights: out of stock': lambda: out_of_stock(products.order_by(), 50),
+    }
+
+
+def run(label, user_id, product_id, repeat, show_plans):
+    rows = []
+    for name, build in scenarios(user_id, product_id).items():
+        if show_plans:
+            print(f"[{label}] {name}\n{build().explain()}\n")
+        result = measure(lambda: list(build()), repeat)
+        rows.append((label, name, f"{result['median_ms']:.2f}"))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--users', type=int, default=20)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--quiet', action='store_true', help='Skip printing query plans')
+    args = parser.parse_args()
+
+    if connection.vendor != 'sqlite':
+        parser.error('This benchmark targets SQLite (EXPLAIN QUERY PLAN).')
+
+    path = os.path.join(tempfile.mkdtemp(), 'bench_indexes.sqlite3')
+    results = []
+    with test_database(path):
+        users = [create_user(f'bench{i}') for i in range(args.users)]
+        per_user = args.rows // args.users
+        for i, user in enumerate(users):
+            seed_products(user, per_user, seed=i)
+        user_id = users[len(users) // 2].id
+        product_id = Product.objects.filter(user_id=user_id).order_by('id').values_list('id', flat=True)[per_user // 2]
+
+        indexes = Product._meta.indexes
+        with connection.schema_editor() as editor:
+            for index in indexes:
+                editor.remove_index(Product, index)
+        connection.cursor().execute('ANALYZE')
+        results += run('before', user_id, product_id, args.repeat, not args.quiet)
+
+        with connection.schema_editor() as editor:
+            for index in indexes:
+                editor.add_index(Product, index)
+        connection.cursor().execute('ANALYZE')
+        results += run('after', user_id, product_id, args.repeat, not args.quiet)
+
+    print_table(['indexes', 'query', 'median ms'], results)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+"""
+Search latency: an ``icontains`` scan of one user's products against the
+indexed search_product_ids() (FTS5 trigram on SQLite, pg_trgm on
+PostgreSQL), on ``--rows`` products spread over ``--users`` users.
+
+    python -m benchmarks.bench_product_search --rows 1000000 --users 20
+"""
+
+import argparse
+import os
+import tempfile
+
+from benchmarks.common import create_user, measure, print_table, seed_products, test_database
+from django.db import connection
+
+from products.models import Product
+from products.search import _scan_search, parse_terms, search_product_ids
+
+LIMIT = 20
+
+
+def queries(per_user):
+    number = per_user // 2
+    return {
+        'rare term': f'Product {number}',
+        'category': 'Electronics',
+        'common term': 'Product',
+        'substring': f'{number}'[:4],
+        'typo (fuzzy)': f'Prodcut {number}',
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--users', type=int, default=20)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    path = os.path.join(tempfile.mkdtemp(), 'bench_search.sqlite3') if connection.vendor == 'sqlite' else None
+    table = []
+    with test_database(path):
+        users = [create_user(f'bench{i}') for i in range(args.users)]
+        per_user = args.rows // args.users
+        for i, user in enumerate(users):
+            seed_products(user, per_user, seed=i)
+        connection.cursor().execute('ANALYZE')
+        user_id = users[len(users) // 2].id
+
+        for name, query in queries(per_user).items():
+            scan = measure(lambda: _scan_search(user_id, parse_terms(query), LIMIT), args.repeat)
+            indexed = measure(lambda: search_product_ids(user_id, query, LIMIT), args.repeat)
+            hits = len(search_product_ids(user_id, query, LIMIT))
+            table.append((
+                name, repr(query), hits, f"{scan['median_ms']:.2f}", f"{indexed['median_ms']:.2f}",
+                f"{scan['median_ms'] / indexed['median_ms']:.1f}x",
+            ))
+
+    print(f"{Product.__name__} rows: {args.rows:,} over {args.users} users; limit {LIMIT}\n")
+    print_table(['query', 'q', 'hits', 'icontains ms', 'indexed ms', 'speedup'], table)
+
+
+if __name__ == '__main__':
+    main()
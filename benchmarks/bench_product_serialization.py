@@ -0,0 +1,73 @@
+"""
+Rows/sec for a product list page: ProductSerializer + JSONRenderer (the
+old path) against values() rows + product_rows, rendered by JSONRenderer
+and by FastJSONRenderer (orjson, when installed). Each run checks that
+the new output is byte-identical to the old one.
+
+    python -m benchmarks.bench_product_serialization --sizes 100,1000,10000
+"""
+
+import argparse
+import time
+
+from benchmarks.common import create_user, parse_sizes, print_table, seed_products, test_database
+from rest_framework.renderers import JSONRenderer
+
+from products.models import Product
+from products.renderers import FastJSONRenderer, orjson
+from products.serializers import ProductSerializer, product_rows
+
+
+def rows_per_second(func, rows, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return rows / best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', type=parse_sizes, default=parse_sizes('100,1000,10000'))
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    fields = ProductSerializer.Meta.fields
+    columns = ['user_id' if name == 'user' else name for name in fields]
+    table = []
+    with test_database():
+        user = create_user()
+        seed_products(user, max(args.sizes))
+        for size in sorted(args.sizes):
+            def products():
+                return Product.objects.filter(user=user).order_by('id')[:size]
+
+            def serializer_path():
+                return JSONRenderer().render(ProductSerializer(products(), many=True).data)
+
+            def rows_path(renderer):
+                return renderer.render(product_rows(products().values(*columns), fields))
+
+            expected = serializer_path()
+            assert rows_path(JSONRenderer()) == expected
+            assert rows_path(FastJSONRenderer()) == expected
+
+            runs = [
+                ('ProductSerializer + JSONRenderer', serializer_path),
+                ('product_rows + JSONRenderer', lambda: rows_path(JSONRenderer())),
+                ('product_rows + FastJSONRenderer' + ('' if orjson else ' (no orjson)'),
+                 lambda: rows_path(FastJSONRenderer())),
+            ]
+            baseline = None
+            for name, func in runs:
+                rate = rows_per_second(func, size, args.repeat)
+                baseline = baseline or rate
+                table.append((size, name, f'{rate:,.0f}', f'{rate / baseline:.1f}x'))
+
+    print_table(['rows', 'path', 'rows/s', 'speedup'], table)
+
+
+if __name__ == '__main__':
+    main()
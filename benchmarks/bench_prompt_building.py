@@ -0,0 +1,101 @@
+"""
+Prompt size and build time for tenants of growing size: the old single
+user message listing every category and stock-band name, against the
+system message plus budgeted inventory data from build_messages().
+
+Stats are synthesized in memory, so this measures prompt construction
+only; no database or LLM is involved.
+
+    python -m benchmarks.bench_prompt_building --sizes 10,100,1000,10000
+"""
+
+import argparse
+import random
+import time
+from decimal import Decimal
+
+from benchmarks.common import parse_sizes, print_table
+from django.conf import settings
+
+from products.prompts import (
+    SYSTEM_PROMPT, build_messages, compact_inventory_summary, estimate_tokens,
+    format_inventory_summary, prompt_tokens,
+)
+from products.stats import STOCK_LIST_LIMIT
+
+
+def synthetic_stats(categories, rng):
+    """summary_stats()-shaped data with ``categories`` categories."""
+    rows = [
+        {'category': f'Category {n:05d} {"x" * rng.randint(0, 20)}', 'item_count': categories - n}
+        for n in range(categories)
+    ]
+    low_stock_count = categories * 20
+    out_of_stock_count = categories * 5
+    return {
+        'total_items': sum(row['item_count'] for row in rows),
+        'total_value': Decimal('123456.78') * categories,
+        'categories': rows,
+        'low_stock_count': low_stock_count,
+        'out_of_stock_count': out_of_stock_count,
+        'low_stock': [
+            (f'Low stock product {n} with a descriptive name', rng.randint(1, 9))
+            for n in range(min(low_stock_count, STOCK_LIST_LIMIT))
+        ],
+        'out_of_stock': [
+            f'Out of stock product {n}' for n in range(min(out_of_stock_count, STOCK_LIST_LIMIT))
+        ],
+        'movements': [
+            {'category': row['category'], 'units_in': rng.randint(0, 500), 'units_out': rng.randint(0, 500),
+             'net': 0, 'previous_net': rng.randint(-500, 500)}
+            for row in rows
+        ],
+    }
+
+
+def legacy_messages(stats):
+    # The single user message sent before the system prompt was split out
+    return [{'role': 'user', 'content': SYSTEM_PROMPT + format_inventory_summary(stats)}]
+
+
+def best_ms(func, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', type=parse_sizes, default=parse_sizes('10,100,1000,10000'),
+                        help='Category counts to try.')
+    parser.add_argument('--budget', type=int, default=settings.INSIGHTS_PROMPT_TOKEN_BUDGET)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    table = []
+    for size in sorted(args.sizes):
+        stats = synthetic_stats(size, rng)
+
+        def budgeted():
+            return build_messages(compact_inventory_summary(stats, args.budget))
+
+        assert budgeted() == budgeted(), "prompt construction is not deterministic"
+        for name, func in (('single user message', lambda: legacy_messages(stats)),
+                           ('system + budgeted data', budgeted)):
+            messages = func()
+            table.append((
+                size, name, f'{prompt_tokens(messages):,}', f'{estimate_tokens(messages[-1]["content"]):,}',
+                f'{best_ms(func, args.repeat):.3f}',
+            ))
+
+    print(f"Token budget: {args.budget:,}; system message: {estimate_tokens(SYSTEM_PROMPT):,} tokens\n")
+    print_table(['categories', 'prompt', 'est. tokens', 'user msg tokens', 'build ms'], table)
+
+
+if __name__ == '__main__':
+    main()
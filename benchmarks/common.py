@@ -0,0 +1,108 @@
+"""
+Shared helpers for the benchmark scripts.
+
+Benchmarks run against a throwaway test database created from the current
+settings, so they never touch db.sqlite3. Run them from the project root,
+e.g. ``python -m benchmarks.bench_inventory_stats --sizes 1000,100000``.
+"""
+
+import os
+import random
+import statistics
+import time
+from contextlib import contextmanager
+
+import django
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'inventory_backend.settings')
+django.setup()
+
+from django.contrib.auth.models import User  # noqa: E402
+from django.db import connection, transaction  # noqa: E402
+from django.test.utils import CaptureQueriesContext  # noqa: E402
+
+from products.models import Product  # noqa: E402
+
+CATEGORIES = [
+    'Electronics', 'Home Office', 'Accessories', 'Apparel', 'Tools',
+    'Kitchen', 'Garden', 'Toys', 'Books', 'Sports', 'Health', 'Auto',
+]
+
+
+def parse_sizes(value):
+    return [int(size) for size in value.split(',') if size]
+
+
+@contextmanager
+def test_database(name=None):
+    """
+    Create a fresh test database for the duration of the block.
+
+    SQLite test databases live in memory unless ``name`` gives a file path.
+    """
+    old_name = connection.settings_dict['NAME']
+    if name:
+        connection.settings_dict.setdefault('TEST', {})['NAME'] = name
+    connection.creation.create_test_db(verbosity=0, autoclobber=True)
+    try:
+        yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+def create_user(username='bench'):
+    return User.objects.create_user(username=username, password='bench-password')
+
+
+def seed_products(user, count, batch_size=5000, seed=0):
+    """Bulk insert ``count`` random products for ``user``."""
+    if isinstance(user, int):
+        user = User(id=user)
+    rng = random.Random(seed)
+    created = 0
+    with transaction.atomic():
+        while created < count:
+            size = min(batch_size, count - created)
+            Product.objects.bulk_create(
+                [
+                    Product(
+                        user=user,
+                        name=f'Product {created + i}',
+                        category=rng.choice(CATEGORIES),
+                        quantity=rng.choice([0, rng.randint(1, 9), rng.randint(10, 500)]),
+                        price=f'{rng.uniform(1, 2000):.2f}',
+                    )
+                    for i in range(size)
+                ],
+                batch_size=size,
+            )
+            created += size
+
+
+def measure(func, repeat=5):
+    """Run ``func`` ``repeat`` times and return timing and query stats."""
+    timings = []
+    queries = 0
+    for _ in range(repeat):
+        with CaptureQueriesContext(connection) as ctx:
+            start = time.perf_counter()
+            func()
+            timings.append(time.perf_counter() - start)
+        queries = len(ctx.captured_queries)
+    return {
+        'queries': queries,
+        'median_ms': statistics.median(timings) * 1000,
+        'min_ms': min(timings) * 1000,
+    }
+
+
+def print_table(headers, rows):
+    widths = [
+        max(len(str(header)), *(len(str(row[i])) for row in rows))
+        for i, header in enumerate(headers)
+    ]
+    line = '  '.join(str(header).ljust(width) for header, width in zip(headers, widths))
+    print(line)
+    print('-' * len(line))
+    for row in rows:
+        print('  '.join(str(cell).ljust(width) for cell, width in zip(row, widths)))
@@ -12,5 +12,7 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'inventory_backend.settings')
+# Under ASGI, serve insights from the native async view
+os.environ.setdefault('INSIGHTS_ASYNC_VIEW', 'true')
 
 application = get_asgi_application()
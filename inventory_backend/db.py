@@ -0,0 +1,119 @@
+"""
+Environment-driven DATABASES profile.
+
+DB_ENGINE selects the backend:
+
+``sqlite`` (default)
+    DB_NAME (default db.sqlite3 in the project root). Unless DB_SQLITE_TUNING
+    is ``false``, every new connection switches to WAL journaling with
+    ``synchronous=NORMAL``, a busy timeout (DB_SQLITE_BUSY_TIMEOUT ms) and a
+    memory-mapped window (DB_SQLITE_MMAP_SIZE bytes). Transactions begin
+    IMMEDIATE so concurrent writers queue on the busy timeout instead of
+    failing with "database is locked" when a read lock is upgraded.
+
+``postgres``
+    DB_NAME, DB_USER, DB_PASSWORD, DB_HOST, DB_PORT. With DB_POOL=true
+    connections come from psycopg's built-in pool (DB_POOL_MIN_SIZE,
+    DB_POOL_MAX_SIZE, DB_POOL_TIMEOUT; requires ``psycopg[pool]``);
+    otherwise connections persist for DB_CONN_MAX_AGE seconds. Reused
+    connections are health-checked unless DB_CONN_HEALTH_CHECKS is false.
+
+DB_REPLICAS adds read replicas as ``replica1``, ``replica2``...: a
+comma-separated list of SQLite file paths, or of Postgres ``host[:port]``
+entries that otherwise share the primary's settings. Replicas mirror the
+primary in tests; see inventory_backend/routers.py for what reads them.
+"""
+
+import copy
+import os
+
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+
+def _env_bool(name, default):
+    return os.getenv(name, str(default)).lower() in ('1', 'true', 'yes')
+
+
+def sqlite_pragmas():
+    return {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'busy_timeout': int(os.getenv('DB_SQLITE_BUSY_TIMEOUT', 5000)),
+        'mmap_size': int(os.getenv('DB_SQLITE_MMAP_SIZE', 128 * 1024 * 1024)),
+    }
+
+
+def _sqlite(base_dir):
+    config = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.getenv('DB_NAME', str(base_dir / 'db.sqlite3')),
+    }
+    if _env_bool('DB_SQLITE_TUNING', True):
+        config['OPTIONS'] = {
+            'transaction_mode': 'IMMEDIATE',
+            'timeout': int(os.getenv('DB_SQLITE_BUSY_TIMEOUT', 5000)) / 1000,
+        }
+        config['PRAGMAS'] = sqlite_pragmas()
+    return config
+
+
+def _postgres():
+    config = {
+        'ENGINE': 'django.db.backends.postgresql',
+        'NAME': os.getenv('DB_NAME', 'inventory'),
+        'USER': os.getenv('DB_USER', ''),
+        'PASSWORD': os.getenv('DB_PASSWORD', ''),
+        'HOST': os.getenv('DB_HOST', ''),
+        'PORT': os.getenv('DB_PORT', ''),
+        'CONN_HEALTH_CHECKS': _env_bool('DB_CONN_HEALTH_CHECKS', True),
+        'OPTIONS': {},
+    }
+    if _env_bool('DB_POOL', False):
+        # Pooled connections are returned to the pool after each request;
+        # Django requires CONN_MAX_AGE to stay 0 in this mode.
+        config['CONN_MAX_AGE'] = 0
+        config['OPTIONS']['pool'] = {
+            'min_size': int(os.getenv('DB_POOL_MIN_SIZE', 2)),
+            'max_size': int(os.getenv('DB_POOL_MAX_SIZE', 10)),
+            'timeout': float(os.getenv('DB_POOL_TIMEOUT', 10)),
+        }
+    else:
+        config['CONN_MAX_AGE'] = int(os.getenv('DB_CONN_MAX_AGE', 60))
+    return config
+
+
+def database_config(base_dir):
+    engine = os.getenv('DB_ENGINE', 'sqlite')
+    if engine == 'sqlite':
+        return _sqlite(base_dir)
+    if engine in ('postgres', 'postgresql'):
+        return _postgres()
+    raise ValueError(f"Unsupported DB_ENGINE {engine!r}; use 'sqlite' or 'postgres'")
+
+
+def replica_configs(primary):
+    """Return ``{alias: settings}`` for the DB_REPLICAS entries."""
+    entries = [entry.strip() for entry in os.getenv('DB_REPLICAS', '').split(',') if entry.strip()]
+    replicas = {}
+    for n, entry in enumerate(entries, start=1):
+        config = copy.deepcopy(primary)
+        if primary['ENGINE'] == 'django.db.backends.sqlite3':
+            config['NAME'] = entry
+        else:
+            host, _, port = entry.partition(':')
+            config['HOST'] = host
+            config['PORT'] = port or primary['PORT']
+        config['TEST'] = {'MIRROR': 'default'}
+        replicas[f'replica{n}'] = config
+    return replicas
+
+
+@receiver(connection_created)
+def apply_sqlite_pragmas(sender, connection, **kwargs):
+    pragmas = connection.settings_dict.get('PRAGMAS')
+    if connection.vendor != 'sqlite' or not pragmas:
+        return
+    # On the raw sqlite3 connection, so these don't show up as request queries
+    for name, value in pragmas.items():
+        connection.connection.execute(f"PRAGMA {name} = {value}")
@@ -0,0 +1,205 @@
+"""
+In-process metrics exposed in the Prometheus text format at /metrics.
+
+Values are kept per process; with several workers, scrape each one (or run a
+single worker per container). The names follow Prometheus conventions:
+durations in seconds, counters ending in ``_total``.
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden
+from rest_framework import serializers
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 250)
+
+
+def _format_labels(names, values):
+    if not names:
+        return ''
+    pairs = ','.join(
+        '{}="{}"'.format(name, str(value).replace('\\', r'\\').replace('"', r'\"'))
+        for name, value in zip(names, values)
+    )
+    return '{' + pairs + '}'
+
+
+def _format_value(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric:
+    kind = None
+
+    def __init__(self, name, help, labels=()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def header(self):
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(Metric):
+    kind = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = tuple(labels[name] for name in self.labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self):
+        lines = self.header()
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            lines.append(f"{self.name}{_format_labels(self.labels, key)} {_format_value(value)}")
+        return lines
+
+
+class Histogram(Metric):
+    kind = 'histogram'
+
+    def __init__(self, name, help, labels=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, **labels):
+        key = tuple(labels[name] for name in self.labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                # Per-bucket counts (plus +Inf), sum
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0]
+            state[0][bisect_left(self.buckets, value)] += 1
+            state[1] += value
+
+    def render(self):
+        lines = self.header()
+        with self._lock:
+            items = sorted((key, (list(counts), total)) for key, (counts, total) in self._values.items())
+        names = self.labels + ('le',)
+        for key, (counts, total) in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + ('+Inf',), counts):
+                cumulative += count
+                labels = _format_labels(names, key + (bound,))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labels, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(float(total))}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+    def totals(self, **labels):
+        """Return (count, sum) over the series matching ``labels``."""
+        count = total = 0
+        with self._lock:
+            for key, (counts, value) in self._values.items():
+                series = dict(zip(self.labels, key))
+                if all(series[name] == label for name, label in labels.items()):
+                    count += sum(counts)
+                    total += value
+        return count, total
+
+
+REGISTRY = []
+
+
+def register(metric):
+    REGISTRY.append(metric)
+    return metric
+
+
+def render():
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return '\n'.join(lines) + '\n'
+
+
+REQUEST_DURATION = register(Histogram(
+    'http_request_duration_seconds', 'Time to produce a response, by view.',
+    labels=('view', 'method', 'status'),
+))
+REQUEST_QUERIES = register(Histogram(
+    'http_request_db_queries', 'Database queries run per request.',
+    labels=('view',), buckets=QUERY_COUNT_BUCKETS,
+))
+REQUEST_DB_DURATION = register(Histogram(
+    'http_request_db_duration_seconds', 'Time spent in database queries per request.',
+    labels=('view',),
+))
+SERIALIZER_DURATION = register(Histogram(
+    'serializer_duration_seconds', 'Time spent validating or rendering serializers.',
+    labels=('serializer', 'operation'),
+))
+LLM_DURATION = register(Histogram(
+    'llm_request_duration_seconds', 'Latency of outbound LLM calls.',
+    labels=('model', 'mode', 'outcome'),
+))
+LLM_TOKENS = register(Counter(
+    'llm_tokens_total', 'Tokens reported in LLM usage blocks.',
+    labels=('model', 'type'),
+))
+INSIGHTS_COALESCED = register(Counter(
+    'insights_coalesced_total', 'Insight requests answered by a generation already in flight.',
+    labels=('scope',),
+))
+THROTTLED_REQUESTS = register(Counter(
+    'throttled_requests_total', 'Requests rejected by a token bucket throttle.',
+    labels=('scope',),
+))
+
+
+@contextmanager
+def timed(histogram, **labels):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        histogram.observe(time.perf_counter() - start, **labels)
+
+
+def record_llm_usage(model, usage):
+    """Count the prompt/completion tokens from an OpenAI-style usage block."""
+    if not usage:
+        return
+    for kind in ('prompt', 'completion'):
+        tokens = usage.get(f'{kind}_tokens')
+        if tokens:
+            LLM_TOKENS.inc(tokens, model=model, type=kind)
+
+
+class TimedSerializerMixin:
+    """Record validation and ``.data`` time for a serializer."""
+
+    def _metric_name(self):
+        return type(getattr(self, 'child', self)).__name__
+
+    def is_valid(self, *args, **kwargs):
+        with timed(SERIALIZER_DURATION, serializer=self._metric_name(), operation='validate'):
+            return super().is_valid(*args, **kwargs)
+
+    @property
+    def data(self):
+        with timed(SERIALIZER_DURATION, serializer=self._metric_name(), operation='render'):
+            return super().data
+
+
+class TimedListSerializer(TimedSerializerMixin, serializers.ListSerializer):
+    pass
+
+
+def metrics_view(request):
+    """Prometheus scrape endpoint; requires METRICS_TOKEN as a bearer token if set."""
+    token = settings.METRICS_TOKEN
+    if token and request.headers.get('Authorization') != f'Bearer {token}':
+        return HttpResponseForbidden()
+    return HttpResponse(render(), content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -0,0 +1,78 @@
+import time
+from contextlib import ExitStack
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.db import connections
+
+from . import metrics
+
+
+class QueryStats:
+    """``execute_wrapper`` hook counting queries and their time."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.duration += time.perf_counter() - start
+
+
+def _view_name(request):
+    # The URL name keeps label cardinality bounded; unmatched paths share one
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return 'unmatched'
+    if match.view_name:
+        return match.view_name
+    func = match.func
+    return f"{func.__module__}.{getattr(func, '__qualname__', type(func).__qualname__)}"
+
+
+class MetricsMiddleware:
+    """
+    Record latency, query count and query time for every request.
+
+    For streaming responses this covers producing the response object, not
+    sending its body. Async requests record latency only: their queries run
+    on sync_to_async threads, whose connections this cannot wrap.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        queries = QueryStats()
+        start = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(queries))
+            response = self.get_response(request)
+        self._observe(request, response, time.perf_counter() - start, queries)
+        return response
+
+    async def __acall__(self, request):
+        start = time.perf_counter()
+        response = await self.get_response(request)
+        self._observe(request, response, time.perf_counter() - start)
+        return response
+
+    def _observe(self, request, response, duration, queries=None):
+        view = _view_name(request)
+        metrics.REQUEST_DURATION.observe(
+            duration, view=view, method=request.method, status=response.status_code
+        )
+        if queries is not None:
+            metrics.REQUEST_QUERIES.observe(queries.count, view=view)
+            metrics.REQUEST_DB_DURATION.observe(queries.duration, view=view)
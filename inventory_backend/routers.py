@@ -0,0 +1,90 @@
+"""
+Read-replica routing.
+
+Writes, migrations and most reads use the primary (``default``). Reads only
+go to a replica inside ``replica_reads()``, which the read-heavy product and
+insights views enter through ReplicaReadMixin. A user whose inventory
+changed within DB_REPLICA_STICKY_SECONDS is pinned to the primary, so they
+never read a replica that has not caught up with their own write.
+"""
+
+import contextvars
+import random
+from contextlib import ExitStack, contextmanager
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.permissions import SAFE_METHODS
+
+# Replica alias chosen for the current request, or None for the primary
+_replica = contextvars.ContextVar('replica', default=None)
+
+
+def _pin_key(user_id):
+    return f'db:pinned:{user_id}'
+
+
+def pin_to_primary(user_id):
+    """Keep ``user_id``'s reads on the primary for the sticky window."""
+    if settings.DATABASE_REPLICAS and settings.DB_REPLICA_STICKY_SECONDS:
+        caches[settings.DB_REPLICA_PIN_CACHE].set(
+            _pin_key(user_id), 1, timeout=settings.DB_REPLICA_STICKY_SECONDS
+        )
+
+
+def is_pinned(user_id):
+    return caches[settings.DB_REPLICA_PIN_CACHE].get(_pin_key(user_id)) is not None
+
+
+@contextmanager
+def replica_reads(user_id=None):
+    """
+    Send reads in the block to one replica, picked at random.
+
+    One replica serves the whole block, so its queries see a single
+    snapshot's worth of lag. Without replicas, or for a pinned user, reads
+    stay on the primary.
+    """
+    alias = None
+    if settings.DATABASE_REPLICAS and (user_id is None or not is_pinned(user_id)):
+        alias = random.choice(settings.DATABASE_REPLICAS)
+    token = _replica.set(alias)
+    try:
+        yield alias
+    finally:
+        _replica.reset(token)
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        return _replica.get() or 'default'
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same data as the primary
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Replicas get their schema through replication
+        return db == 'default'
+
+
+class ReplicaReadMixin:
+    """
+    Run a DRF view's ``replica_methods`` requests inside replica_reads().
+
+    The block is entered after authentication, so the user's pin is known,
+    and left when dispatch returns.
+    """
+    replica_methods = SAFE_METHODS
+
+    def dispatch(self, request, *args, **kwargs):
+        with ExitStack() as self.replica_stack:
+            return super().dispatch(request, *args, **kwargs)
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if request.method in self.replica_methods:
+            self.replica_stack.enter_context(replica_reads(request.user.id))
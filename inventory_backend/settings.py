@@ -14,6 +14,9 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 from pathlib import Path
 import os
 from dotenv import load_dotenv
+from django.core.exceptions import ImproperlyConfigured
+
+from .db import database_config, replica_configs
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -23,6 +26,15 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 load_dotenv(BASE_DIR / '.env')
 
 GROQ_API_KEY = os.getenv('GROQ_API_KEY')
+GROQ_API_URL = os.getenv('GROQ_API_URL', 'https://api.groq.com/openai/v1/chat/completions')
+GROQ_MODEL = os.getenv('GROQ_MODEL', 'meta-llama/llama-4-scout-17b-16e-instruct')
+GROQ_CONNECT_TIMEOUT = float(os.getenv('GROQ_CONNECT_TIMEOUT', 5))
+GROQ_READ_TIMEOUT = float(os.getenv('GROQ_READ_TIMEOUT', 60))
+GROQ_MAX_RETRIES = int(os.getenv('GROQ_MAX_RETRIES', 3))
+GROQ_RETRY_BACKOFF = float(os.getenv('GROQ_RETRY_BACKOFF', 0.5))
+GROQ_RETRY_BACKOFF_MAX = float(os.getenv('GROQ_RETRY_BACKOFF_MAX', 10))
+# Upper bound on simultaneous upstream calls per process (and pool size)
+GROQ_MAX_CONCURRENCY = int(os.getenv('GROQ_MAX_CONCURRENCY', 32))
 
 # Quick-start development settings - unsuitable for production
 # See https://docs.djangoproject.com/en/5.2/howto/deployment/checklist/
@@ -38,6 +50,8 @@ ALLOWED_HOSTS = ['localhost', '127.0.0.1']
 
 # Application definition
 
+# API-only nodes can run inventory_backend.settings_api, which drops the
+# admin, sessions and messages from the apps and middleware below
 INSTALLED_APPS = [
     'django.contrib.admin',
     'django.contrib.auth',
@@ -60,6 +74,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'inventory_backend.middleware.MetricsMiddleware',
 ]
 
 # CORS settings
@@ -91,14 +106,82 @@ WSGI_APPLICATION = 'inventory_backend.wsgi.application'
 
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
+# Configured from DB_* environment variables; see inventory_backend/db.py
 DATABASES = {
+    'default': database_config(BASE_DIR),
+}
+DATABASES.update(replica_configs(DATABASES['default']))
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias != 'default']
+DATABASE_ROUTERS = ['inventory_backend.routers.ReplicaRouter']
+# After a user's inventory changes, their reads stay on the primary this many
+# seconds so they see their own writes despite replication lag. Pins live in
+# the DB_REPLICA_PIN_CACHE alias, which must be shared by all workers: with
+# replicas configured, a per-process cache is rejected below. Use 'throttle'
+# with a redis/memcached THROTTLE_CACHE_BACKEND, or 'insights' with the file
+# backend on a single node.
+DB_REPLICA_STICKY_SECONDS = int(os.getenv('DB_REPLICA_STICKY_SECONDS', 10))
+DB_REPLICA_PIN_CACHE = os.getenv('DB_REPLICA_PIN_CACHE', 'default')
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+
+# Generated insights are cached per inventory snapshot. 'locmem' is a per-process
+# LRU cache; 'file' is shared by all workers on one node but culls at random
+# rather than LRU once MAX_ENTRIES is reached.
+INSIGHTS_CACHE_BACKEND = os.getenv('INSIGHTS_CACHE_BACKEND', 'locmem')
+INSIGHTS_CACHE_TTL = int(os.getenv('INSIGHTS_CACHE_TTL', 60 * 60))
+INSIGHTS_CACHE_MAX_ENTRIES = int(os.getenv('INSIGHTS_CACHE_MAX_ENTRIES', 1000))
+
+# Token buckets of the insights throttles. 'locmem' keeps them per process,
+# so each worker enforces the rates on its own. 'redis' (needs the redis
+# package) or 'memcached' (needs pymemcache) share them across all workers;
+# the bucket lock relies on their atomic add(), which the file cache lacks.
+THROTTLE_CACHE = 'throttle'
+THROTTLE_CACHE_BACKEND = os.getenv('THROTTLE_CACHE_BACKEND', 'locmem')
+THROTTLE_CACHE_BACKENDS = {
+    'locmem': ('django.core.cache.backends.locmem.LocMemCache', 'throttle'),
+    'redis': ('django.core.cache.backends.redis.RedisCache', 'redis://127.0.0.1:6379/0'),
+    'memcached': ('django.core.cache.backends.memcached.PyMemcacheCache', '127.0.0.1:11211'),
+}
+
+CACHES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
-    }
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'insights': {
+        'BACKEND': (
+            'django.core.cache.backends.filebased.FileBasedCache'
+            if INSIGHTS_CACHE_BACKEND == 'file'
+            else 'django.core.cache.backends.locmem.LocMemCache'
+        ),
+        'LOCATION': (
+            os.getenv('INSIGHTS_CACHE_LOCATION', str(BASE_DIR / '.cache' / 'insights'))
+            if INSIGHTS_CACHE_BACKEND == 'file'
+            else 'insights'
+        ),
+        'TIMEOUT': INSIGHTS_CACHE_TTL,
+        'OPTIONS': {
+            'MAX_ENTRIES': INSIGHTS_CACHE_MAX_ENTRIES,
+        },
+    },
+    THROTTLE_CACHE: {
+        'BACKEND': THROTTLE_CACHE_BACKENDS[THROTTLE_CACHE_BACKEND][0],
+        'LOCATION': os.getenv('THROTTLE_CACHE_LOCATION', THROTTLE_CACHE_BACKENDS[THROTTLE_CACHE_BACKEND][1]),
+    },
 }
 
 
+# A pin only reaches the worker that wrote it through a shared cache
+if DATABASE_REPLICAS and DB_REPLICA_STICKY_SECONDS and CACHES[DB_REPLICA_PIN_CACHE]['BACKEND'] in (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+):
+    raise ImproperlyConfigured(
+        f"DB_REPLICA_PIN_CACHE ({DB_REPLICA_PIN_CACHE!r}) must be a cache shared by all workers "
+        "when DB_REPLICAS is set; see the database settings."
+    )
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -117,6 +200,70 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# Password hashing
+# https://docs.djangoproject.com/en/5.2/topics/auth/passwords/
+
+# The first hasher encodes new passwords; the rest still verify older hashes,
+# which are re-encoded with the preferred one on the next login. Compare
+# costs with ``python -m benchmarks.bench_password_hashing``.
+PASSWORD_HASHER = os.getenv('PASSWORD_HASHER', 'pbkdf2')
+PASSWORD_PBKDF2_ITERATIONS = int(os.getenv('PASSWORD_PBKDF2_ITERATIONS', 1_000_000))
+PASSWORD_SCRYPT_WORK_FACTOR = int(os.getenv('PASSWORD_SCRYPT_WORK_FACTOR', 2 ** 14))
+_PASSWORD_HASHERS = {
+    'pbkdf2': 'users.hashers.PBKDF2PasswordHasher',
+    'scrypt': 'users.hashers.ScryptPasswordHasher',
+    # Requires the argon2-cffi package
+    'argon2': 'django.contrib.auth.hashers.Argon2PasswordHasher',
+}
+PASSWORD_HASHERS = [_PASSWORD_HASHERS[PASSWORD_HASHER]] + [
+    path for name, path in _PASSWORD_HASHERS.items() if name != PASSWORD_HASHER
+] + [
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+]
+# Login/registration hashes running at once per process (0 for no cap); a
+# request waits up to PASSWORD_HASH_QUEUE_TIMEOUT seconds for a slot, then
+# gets 503 + Retry-After
+PASSWORD_HASH_CONCURRENCY = int(os.getenv('PASSWORD_HASH_CONCURRENCY', os.cpu_count() or 1))
+PASSWORD_HASH_QUEUE_TIMEOUT = float(os.getenv('PASSWORD_HASH_QUEUE_TIMEOUT', 5))
+
+
+# Logging and metrics
+# https://docs.djangoproject.com/en/5.2/topics/logging/
+
+LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
+# Fraction of info/debug records kept; warnings and errors are never dropped
+LOG_SAMPLE_RATE = float(os.getenv('LOG_SAMPLE_RATE', 1.0))
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'filters': {
+        'sampling': {
+            '()': 'inventory_backend.log.SamplingFilter',
+            'rate': LOG_SAMPLE_RATE,
+        },
+    },
+    'formatters': {
+        'json': {
+            '()': 'inventory_backend.log.JSONFormatter',
+        },
+    },
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+            'filters': ['sampling'],
+            'formatter': 'json',
+        },
+    },
+    'loggers': {
+        'products': {'handlers': ['console'], 'level': LOG_LEVEL, 'propagate': False},
+        'users': {'handlers': ['console'], 'level': LOG_LEVEL, 'propagate': False},
+    },
+}
+
+# /metrics (Prometheus text format); when set, scrapers must send it as a bearer token
+METRICS_TOKEN = os.getenv('METRICS_TOKEN')
+
 
 # Internationalization
 # https://docs.djangoproject.com/en/5.2/topics/i18n/
@@ -143,13 +290,36 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 # Django REST Framework settings
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'users.authentication.StatelessJWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
     ),
+    'DEFAULT_RENDERER_CLASSES': (
+        # orjson-backed when installed, otherwise DRF's JSONRenderer
+        'products.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
+    'DEFAULT_PAGINATION_CLASS': 'products.pagination.ProductCursorPagination',
+    'PAGE_SIZE': 100,
 }
 
+# Bulk product import/export (/api/products/bulk/)
+PRODUCT_BULK_BATCH_SIZE = int(os.getenv('PRODUCT_BULK_BATCH_SIZE', 1000))
+PRODUCT_BULK_MAX_BATCH_SIZE = 10000
+PRODUCT_EXPORT_CHUNK_SIZE = int(os.getenv('PRODUCT_EXPORT_CHUNK_SIZE', 2000))
+# Batched PATCH (/api/products/batch/)
+PRODUCT_BATCH_MAX_ITEMS = int(os.getenv('PRODUCT_BATCH_MAX_ITEMS', 500))
+# Product search (/api/products/search/)
+PRODUCT_SEARCH_LIMIT = int(os.getenv('PRODUCT_SEARCH_LIMIT', 20))
+PRODUCT_SEARCH_MAX_LIMIT = 100
+# Serialized product list/detail responses, keyed by user, inventory version and request
+PRODUCT_RESPONSE_CACHE = 'default'
+PRODUCT_RESPONSE_CACHE_TTL = int(os.getenv('PRODUCT_RESPONSE_CACHE_TTL', 300))
+# Seconds a stock movement must age before rollup_stock_movements folds it
+# into the snapshots, covering transactions that commit out of id order
+STOCK_ROLLUP_LAG = int(os.getenv('STOCK_ROLLUP_LAG', 60))
+
 from datetime import timedelta
 
 SIMPLE_JWT = {
@@ -158,4 +328,29 @@ SIMPLE_JWT = {
     'ROTATE_REFRESH_TOKENS': False,
     'BLACKLIST_AFTER_ROTATION': False,
     'UPDATE_LAST_LOGIN': False,
-}
\ No newline at end of file
+    # request.user is built from the token claims; see users/authentication.py
+    'TOKEN_USER_CLASS': 'users.authentication.ClaimsUser',
+    'TOKEN_OBTAIN_SERIALIZER': 'users.tokens.UserTokenObtainPairSerializer',
+}
+
+# Insights
+# INSIGHTS_LLM_CLIENT is a dotted path to a products.llm.LLMClient subclass.
+INSIGHTS_LLM_CLIENT = os.getenv('INSIGHTS_LLM_CLIENT', 'products.llm.GroqClient')
+# Estimated input tokens per insights prompt; long product lists are cut to fit
+INSIGHTS_PROMPT_TOKEN_BUDGET = int(os.getenv('INSIGHTS_PROMPT_TOKEN_BUDGET', 4000))
+# Token bucket rates ("<burst>/<s|m|h|d>") for POST /api/insights/ and
+# /api/insights/stream/, per user and across all users; empty disables
+INSIGHTS_THROTTLE_RATES = {
+    'user': os.getenv('INSIGHTS_USER_RATE', '10/m'),
+    'global': os.getenv('INSIGHTS_GLOBAL_RATE', '600/m'),
+}
+# Seconds a request waits for an identical generation already in flight
+# before calling the LLM itself; also the lifetime of the cross-worker lock
+INSIGHTS_COALESCE_TIMEOUT = float(os.getenv('INSIGHTS_COALESCE_TIMEOUT', 90))
+# When true, POST /api/insights/ queues a job and answers 202; ?async= overrides per request
+INSIGHTS_ASYNC = os.getenv('INSIGHTS_ASYNC', 'false').lower() == 'true'
+# 'thread' runs jobs in an in-process pool, 'db' leaves them for manage.py run_insight_worker
+INSIGHTS_JOB_BACKEND = os.getenv('INSIGHTS_JOB_BACKEND', 'thread')
+INSIGHTS_JOB_WORKERS = int(os.getenv('INSIGHTS_JOB_WORKERS', 4))
+# Serve /api/insights/ from the native async view; asgi.py turns this on
+INSIGHTS_ASYNC_VIEW = os.getenv('INSIGHTS_ASYNC_VIEW', 'false').lower() == 'true'
@@ -0,0 +1,38 @@
+"""
+Settings for API-only nodes: DJANGO_SETTINGS_MODULE=inventory_backend.settings_api.
+
+Everything in settings applies, minus the admin, sessions, messages and the
+browsable API, which JWT-authenticated JSON clients never use. Skipping
+those apps, their middleware and templates cuts worker startup time; see
+``manage.py importtime`` and benchmarks/bench_cold_start.py.
+"""
+
+from .settings import *  # noqa: F401,F403
+from .settings import INSTALLED_APPS, MIDDLEWARE, REST_FRAMEWORK, TEMPLATES
+
+WITHOUT_APPS = {
+    'django.contrib.admin',
+    'django.contrib.sessions',
+    'django.contrib.messages',
+    'django.contrib.staticfiles',
+}
+# AuthenticationMiddleware needs sessions; DRF authenticates requests itself
+WITHOUT_MIDDLEWARE = {
+    'django.contrib.sessions.middleware.SessionMiddleware',
+    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'django.contrib.messages.middleware.MessageMiddleware',
+}
+
+INSTALLED_APPS = [app for app in INSTALLED_APPS if app not in WITHOUT_APPS]
+MIDDLEWARE = [middleware for middleware in MIDDLEWARE if middleware not in WITHOUT_MIDDLEWARE]
+
+ROOT_URLCONF = 'inventory_backend.urls_api'
+
+TEMPLATES = [
+    {**TEMPLATES[0], 'OPTIONS': {'context_processors': ['django.template.context_processors.request']}},
+]
+
+REST_FRAMEWORK = {
+    **REST_FRAMEWORK,
+    'DEFAULT_RENDERER_CLASSES': ('products.renderers.FastJSONRenderer',),
+}
@@ -0,0 +1,20 @@
+"""
+URL configuration without the admin, for API-only nodes (settings_api).
+inventory_backend.urls adds the admin on top of these routes.
+"""
+from django.urls import path, include
+from rest_framework_simplejwt.views import (
+    TokenObtainPairView,
+    TokenRefreshView,
+)
+from users.views import RegisterView, LoginView
+from .metrics import metrics_view
+
+urlpatterns = [
+    path('api/', include('products.urls')),
+    path('api/register/', RegisterView.as_view(), name='register'),
+    path('api/login/', LoginView.as_view(), name='login'),
+    path('api/token/', TokenObtainPairView.as_view(), name='token_obtain_pair'),
+    path('api/token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
+    path('metrics', metrics_view, name='metrics'),
+]
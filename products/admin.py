@@ -1,6 +1,107 @@
-from django.contrib import admin
-from .models import Product
+from django import forms
+from django.contrib import admin, messages
+from django.contrib.admin.helpers import ActionForm
+from django.core.paginator import Paginator
+from django.db import DatabaseError, connections
+from django.utils.functional import cached_property
 
-# Register your models here.
+from .batch import update_quantities
+from .models import InventorySummary, Product
 
-admin.site.register(Product)
\ No newline at end of file
+# Counts up to this many rows are exact; past it, an unfiltered list uses
+# the planner's row estimate and a filtered one stops counting
+COUNT_LIMIT = 100000
+
+
+def estimated_row_count(model, using):
+    """Return the database's own estimate of ``model``'s row count, or None."""
+    connection = connections[using]
+    table = model._meta.db_table
+    if connection.vendor == 'postgresql':
+        sql, params = "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass", [table]
+    elif connection.vendor == 'sqlite':
+        # Only present once ANALYZE has run; the first number is the row count
+        sql, params = "SELECT stat FROM sqlite_stat1 WHERE tbl = %s LIMIT 1", [table]
+    else:
+        return None
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            row = cursor.fetchone()
+    except DatabaseError:
+        return None
+    if row is None:
+        return None
+    estimate = int(str(row[0]).split()[0])
+    # PostgreSQL reports -1 for a table that was never analyzed
+    return estimate if estimate >= 0 else None
+
+
+class EstimatedCountPaginator(Paginator):
+    """Paginator that never counts more than COUNT_LIMIT rows."""
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list.order_by()
+        if not queryset.query.where:
+            estimate = estimated_row_count(queryset.model, queryset.db)
+            if estimate is not None and estimate >= COUNT_LIMIT:
+                return estimate
+        return queryset[:COUNT_LIMIT].count()
+
+
+class CategoryFilter(admin.SimpleListFilter):
+    title = 'category'
+    parameter_name = 'category'
+
+    def lookups(self, request, model_admin):
+        # From the summary table, not a DISTINCT over every product
+        categories = InventorySummary.objects.filter(item_count__gt=0).values_list('category', flat=True)
+        return [(category, category) for category in categories.distinct().order_by('category')]
+
+    def queryset(self, request, queryset):
+        if self.value() is not None:
+            return queryset.filter(category=self.value())
+        return queryset
+
+
+class QuantityActionForm(ActionForm):
+    amount = forms.IntegerField(required=False)
+
+
+@admin.register(Product)
+class ProductAdmin(admin.ModelAdmin):
+    list_display = ('id', 'name', 'category', 'quantity', 'price', 'user')
+    list_select_related = ('user',)
+    list_filter = (CategoryFilter,)
+    list_per_page = 100
+    ordering = ('-id',)
+    autocomplete_fields = ('user',)
+    readonly_fields = ('version',)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    show_facets = admin.ShowFacets.NEVER
+    action_form = QuantityActionForm
+    actions = ['add_quantity', 'set_quantity']
+
+    def _amount(self, request):
+        form = self.action_form(request.POST)
+        form.fields['action'].choices = self.get_action_choices(request)
+        if not form.is_valid() or form.cleaned_data['amount'] is None:
+            self.message_user(request, "Enter a whole number in the amount field.", messages.ERROR)
+            return None
+        return form.cleaned_data['amount']
+
+    @admin.action(description="Add the amount to the quantity of selected products", permissions=['change'])
+    def add_quantity(self, request, queryset):
+        amount = self._amount(request)
+        if amount is not None:
+            updated = update_quantities(queryset, delta=amount)
+            self.message_user(request, f"Adjusted the quantity of {updated} products.", messages.SUCCESS)
+
+    @admin.action(description="Set the quantity of selected products to the amount", permissions=['change'])
+    def set_quantity(self, request, queryset):
+        amount = self._amount(request)
+        if amount is not None:
+            updated = update_quantities(queryset, quantity=amount)
+            self.message_user(request, f"Set the quantity of {updated} products.", messages.SUCCESS)
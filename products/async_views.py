@@ -0,0 +1,107 @@
+"""
+Native async views, mounted instead of their DRF counterparts when the
+project runs under ASGI (see INSIGHTS_ASYNC_VIEW in settings).
+"""
+
+import logging
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import JsonResponse
+from django.urls import reverse
+from django.utils.decorators import method_decorator
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework import exceptions, status
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+
+from inventory_backend.routers import replica_reads
+
+from . import jobs, throttling
+from .insights import InsightsError, agenerate_insights
+
+logger = logging.getLogger(__name__)
+
+
+def _json(data, status=status.HTTP_200_OK):
+    # Match DRF's JSONRenderer, which leaves emojis unescaped
+    return JsonResponse(data, status=status, json_dumps_params={"ensure_ascii": False})
+
+
+def _authenticate(request, authenticators):
+    # Reuse the DRF authentication classes so tokens behave exactly as in
+    # the synchronous views.
+    return Request(request, authenticators=authenticators).user
+
+
+def _error(exc, context, authenticators):
+    """Render an APIException as DRF's APIView.handle_exception would."""
+    if isinstance(exc, (exceptions.NotAuthenticated, exceptions.AuthenticationFailed)):
+        header = authenticators[0].authenticate_header(context['request']) if authenticators else None
+        if header:
+            exc.auth_header = header
+        else:
+            exc.status_code = status.HTTP_403_FORBIDDEN
+    drf_response = api_settings.EXCEPTION_HANDLER(exc, context)
+    response = _json(drf_response.data, status=drf_response.status_code)
+    for header in ('WWW-Authenticate', 'Retry-After'):
+        if header in drf_response:
+            response[header] = drf_response[header]
+    return response
+
+
+@method_decorator(csrf_exempt, name='dispatch')
+class AsyncInsightsView(View):
+    http_method_names = ['post', 'options']
+
+    def use_async(self, request):
+        # ?async=true|false overrides the INSIGHTS_ASYNC default
+        value = request.GET.get('async')
+        if value is None:
+            return settings.INSIGHTS_ASYNC
+        return value.lower() in ('1', 'true', 'yes')
+
+    async def post(self, request):
+        authenticators = [auth() for auth in api_settings.DEFAULT_AUTHENTICATION_CLASSES]
+        context = {"view": self, "request": request}
+        try:
+            user = await sync_to_async(_authenticate)(request, authenticators)
+        except exceptions.APIException as e:
+            return _error(e, context, authenticators)
+
+        if not user or not user.is_authenticated:
+            return _error(exceptions.NotAuthenticated(), context, authenticators)
+
+        request.user = user
+        wait = await sync_to_async(throttling.check)(request)
+        if wait is not None:
+            return _error(exceptions.Throttled(wait), context, authenticators)
+
+        try:
+            if self.use_async(request):
+                job = await sync_to_async(jobs.enqueue)(user.id)
+                location = reverse('insight-job', kwargs={'job_id': job.id})
+                response = _json(
+                    {"job_id": str(job.id), "status": job.status, "url": location},
+                    status=status.HTTP_202_ACCEPTED
+                )
+                response["Location"] = location
+                return response
+
+            with replica_reads(user.id):
+                generated_insights, cache_hit = await agenerate_insights(user.id)
+            response = _json(generated_insights)
+            if cache_hit is not None:
+                response["X-Insights-Cache"] = "HIT" if cache_hit else "MISS"
+            return response
+
+        except InsightsError as e:
+            return _json({"error": e.message}, status=e.status_code)
+
+        except Exception:
+            logger.exception("Insights request failed")
+            return _json(
+                {"error": "Internal server error"},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
@@ -0,0 +1,188 @@
+"""
+Atomic multi-product updates for /api/products/batch/.
+
+Each item is either ``{"id", "quantity_delta"}``, applied as
+``quantity = quantity + delta`` so concurrent scanners never lose counts
+(refused if it would take the stock below zero or out of the column's
+range), or ``{"id", "fields", "version"}``, a partial edit that only applies if the
+product is still at ``version`` (optimistic concurrency). The whole batch
+commits or rolls back together.
+
+``update_quantities`` applies one quantity change to a whole queryset, for
+the admin's bulk actions.
+"""
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import F
+
+from . import history, summary, versioning
+from .models import Product, StockMovement
+from .serializers import ProductSerializer
+from .signals import send_inventory_changed
+
+OK = 'ok'
+INVALID = 'invalid'
+NOT_FOUND = 'not_found'
+CONFLICT = 'conflict'
+ROLLED_BACK = 'rolled_back'
+SKIPPED = 'skipped'
+
+
+def _stock(product):
+    return (product.user_id, product.category, product.quantity, product.price)
+
+
+def _int_errors(value, field_name):
+    """Return error messages unless ``value`` is an int the ``field_name`` column can hold."""
+    if not isinstance(value, int) or isinstance(value, bool):
+        return ["A valid integer is required."]
+    try:
+        Product._meta.get_field(field_name).run_validators(value)
+    except ValidationError as e:
+        return e.messages
+    return None
+
+
+def _check_item(item):
+    """Return an errors dict for a malformed item, or None."""
+    if not isinstance(item, dict):
+        return {"non_field_errors": ["Expected an object."]}
+    errors = {}
+    id_errors = _int_errors(item.get('id'), 'id')
+    if id_errors:
+        errors['id'] = id_errors
+    has_delta = 'quantity_delta' in item
+    has_fields = 'fields' in item
+    if has_delta == has_fields:
+        errors['non_field_errors'] = ["Provide exactly one of 'quantity_delta' or 'fields'."]
+    elif has_delta:
+        delta_errors = _int_errors(item['quantity_delta'], 'quantity')
+        if delta_errors:
+            errors['quantity_delta'] = delta_errors
+    elif has_fields:
+        if not isinstance(item['fields'], dict):
+            errors['fields'] = ["Expected an object."]
+        if 'version' not in item:
+            errors['version'] = ["The product version is required for field edits."]
+        else:
+            version_errors = _int_errors(item['version'], 'version')
+            if version_errors:
+                errors['version'] = version_errors
+    return errors or None
+
+
+def _apply_delta(user_id, product, delta):
+    quantity = product.quantity + delta
+    errors = _int_errors(quantity, 'quantity')
+    if quantity < 0:
+        errors = ["Ensure the resulting quantity is greater than or equal to 0."]
+    if errors:
+        return {"id": product.id, "status": INVALID, "errors": {"quantity_delta": errors}}
+    Product.objects.filter(user_id=user_id, id=product.id).update(
+        quantity=F('quantity') + delta,
+        version=F('version') + 1,
+    )
+    product.quantity = quantity
+    product.version += 1
+    return {"id": product.id, "status": OK, "quantity": product.quantity, "version": product.version}
+
+
+def _apply_fields(user_id, product, fields, version):
+    serializer = ProductSerializer(product, data=fields, partial=True)
+    if not serializer.is_valid():
+        return {"id": product.id, "status": INVALID, "errors": serializer.errors}
+    if product.version != version:
+        return {"id": product.id, "status": CONFLICT, "current_version": product.version}
+
+    data = serializer.validated_data
+    updated = Product.objects.filter(user_id=user_id, id=product.id, version=version).update(
+        **data, version=F('version') + 1
+    )
+    if not updated:
+        return {"id": product.id, "status": CONFLICT, "current_version": product.version}
+    for field, value in data.items():
+        setattr(product, field, value)
+    product.version += 1
+    return {"id": product.id, "status": OK, "quantity": product.quantity, "version": product.version}
+
+
+def apply_batch(user_id, items):
+    """
+    Apply ``items`` for a user and return ``(results, committed)``.
+
+    ``results`` has one entry per item, in order. If any item fails, the
+    whole batch is rolled back and ``committed`` is False.
+    """
+    results = [None] * len(items)
+    for index, item in enumerate(items):
+        errors = _check_item(item)
+        if errors:
+            results[index] = {"id": item.get('id') if isinstance(item, dict) else None,
+                              "status": INVALID, "errors": errors}
+    if any(results):
+        return [result or {"id": item['id'], "status": SKIPPED} for result, item in zip(results, items)], False
+
+    with transaction.atomic():
+        # One locking read for every product in the batch
+        products = Product.objects.select_for_update().filter(
+            user_id=user_id, id__in={item['id'] for item in items}
+        ).in_bulk()
+        removed = []
+        added = []
+        changes = []
+        for index, item in enumerate(items):
+            product = products.get(item['id'])
+            if product is None:
+                results[index] = {"id": item['id'], "status": NOT_FOUND}
+                continue
+            before = _stock(product)
+            if 'quantity_delta' in item:
+                results[index] = _apply_delta(user_id, product, item['quantity_delta'])
+            else:
+                results[index] = _apply_fields(user_id, product, item['fields'], item['version'])
+            if results[index]['status'] == OK:
+                removed.append(before)
+                added.append(_stock(product))
+                changes.append((product.id, before, _stock(product)))
+
+        committed = all(result['status'] == OK for result in results)
+        if committed:
+            summary.apply_changes(removed, added)
+            history.record(changes, StockMovement.BATCH)
+            versioning.bump(user_id)
+            send_inventory_changed(user_id)
+        else:
+            transaction.set_rollback(True)
+            results = [
+                {"id": result['id'], "status": ROLLED_BACK} if result['status'] == OK else result
+                for result in results
+            ]
+    return results, committed
+
+
+def update_quantities(queryset, delta=None, quantity=None):
+    """
+    Add ``delta`` to, or set ``quantity`` on, every product in ``queryset``
+    with one UPDATE statement, and return the number of products changed.
+
+    The summary, ledger and inventory versions are updated from a single
+    read of the rows' previous stock, in the same transaction.
+    """
+    new_quantity = F('quantity') + delta if quantity is None else quantity
+    with transaction.atomic():
+        queryset = queryset.order_by()
+        rows = queryset.select_for_update().values_list('id', 'user_id', 'category', 'quantity', 'price')
+        changes = []
+        for product_id, user_id, category, old, price in rows.iterator(chunk_size=2000):
+            new = old + delta if quantity is None else quantity
+            changes.append((product_id, (user_id, category, old, price), (user_id, category, new, price)))
+        if not changes:
+            return 0
+        queryset.update(quantity=new_quantity, version=F('version') + 1)
+        summary.apply_changes([before for _, before, _ in changes], [after for _, _, after in changes])
+        history.record(changes, StockMovement.ADMIN)
+        for user_id in {before[0] for _, before, _ in changes}:
+            versioning.bump(user_id)
+            send_inventory_changed(user_id)
+    return len(changes)
@@ -0,0 +1,220 @@
+"""
+Streaming bulk import and export of products.
+
+Imports are validated with ProductSerializer(many=True) and written with
+bulk_create/bulk_update one batch (and one transaction) at a time; rows
+with an ``id`` update the user's existing product, rows without one create
+a new product. Exports stream the user's products with a server-side
+iterator, so memory use does not grow with the number of rows.
+"""
+
+import csv
+import json
+from itertools import islice
+
+from django.db import transaction
+from django.db.models import F
+
+from . import history, summary, versioning
+from .models import Product, StockMovement
+from .serializers import ProductSerializer
+from .signals import send_inventory_changed
+
+EXPORT_FIELDS = ['id', 'name', 'category', 'quantity', 'price']
+UPDATE_FIELDS = ['name', 'category', 'quantity', 'price', 'version']
+
+# Cap the error list in the import report; the total is always reported
+MAX_REPORTED_ERRORS = 1000
+
+
+def _lines(stream):
+    # utf-8-sig drops the byte order mark Excel writes before the header
+    for line in stream:
+        yield line.decode('utf-8-sig') if isinstance(line, bytes) else line.lstrip('\ufeff')
+
+
+def iter_csv_rows(stream):
+    """Yield ``(row, error)`` for each record of a CSV stream with a header."""
+    reader = csv.DictReader(_lines(stream))
+    try:
+        for row in reader:
+            yield {key.strip(): value for key, value in row.items() if key}, None
+    except (csv.Error, UnicodeDecodeError) as e:
+        yield None, f"Invalid CSV: {e}"
+
+
+def iter_ndjson_rows(stream):
+    """Yield ``(row, error)`` for each non-blank line of an NDJSON stream."""
+    for line in _lines(stream):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except json.JSONDecodeError as e:
+            yield None, f"Invalid JSON: {e.msg}"
+            continue
+        if not isinstance(row, dict):
+            yield None, "Expected a JSON object"
+            continue
+        yield row, None
+
+
+def _batches(rows, batch_size):
+    rows = iter(rows)
+    while True:
+        batch = list(islice(rows, batch_size))
+        if not batch:
+            return
+        yield batch
+
+
+def _validate(parsed):
+    """Yield ``(row_number, row, validated_data, errors)`` for a batch."""
+    serializer = ProductSerializer(data=[row for _, row in parsed], many=True)
+    if serializer.is_valid():
+        for (row_number, row), data in zip(parsed, serializer.validated_data):
+            yield row_number, row, data, None
+        return
+
+    # A failed ListSerializer discards all validated data, so re-validate
+    # just the rows that passed to recover theirs.
+    errors_by_index = serializer.errors
+    if isinstance(errors_by_index, list):
+        errors_by_index = dict(enumerate(errors_by_index))
+    for index, (row_number, row) in enumerate(parsed):
+        errors = errors_by_index.get(index)
+        if errors:
+            yield row_number, row, None, errors
+        else:
+            yield row_number, row, serializer.child.run_validation(row), None
+
+
+def _stock(product):
+    return (product.user_id, product.category, product.quantity, product.price)
+
+
+class ImportReport:
+    def __init__(self):
+        self.created = 0
+        self.updated = 0
+        self.failed = 0
+        self.errors = []
+
+    def error(self, row_number, errors):
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"row": row_number, "errors": errors})
+
+    def as_dict(self):
+        return {
+            "created": self.created,
+            "updated": self.updated,
+            "failed": self.failed,
+            "errors": self.errors,
+        }
+
+
+def import_products(user_id, rows, batch_size):
+    """
+    Import ``(row, error)`` pairs for a user and return an ImportReport.
+
+    Each batch is validated and written in its own transaction, so a bad
+    row only fails itself and earlier batches stay committed.
+    """
+    report = ImportReport()
+    numbered = enumerate(rows, start=1)
+    for batch in _batches(numbered, batch_size):
+        parsed = []
+        for row_number, (row, error) in batch:
+            if error:
+                report.error(row_number, {"non_field_errors": [error]})
+            else:
+                parsed.append((row_number, row))
+        if not parsed:
+            continue
+
+        to_create = []
+        to_update = {}
+        for row_number, row, data, errors in _validate(parsed):
+            if errors:
+                report.error(row_number, errors)
+                continue
+            product_id = row.get('id')
+            if product_id in (None, ''):
+                to_create.append(Product(user_id=user_id, **data))
+                continue
+            try:
+                to_update[int(product_id)] = (row_number, data)
+            except (TypeError, ValueError):
+                report.error(row_number, {"id": ["A valid integer is required."]})
+
+        removed = []
+        added = []
+        changes = []
+        with transaction.atomic():
+            if to_update:
+                existing = Product.objects.select_for_update().filter(
+                    user_id=user_id, id__in=list(to_update)
+                ).in_bulk()
+                products = []
+                for product_id, (row_number, data) in to_update.items():
+                    product = existing.get(product_id)
+                    if product is None:
+                        report.error(row_number, {"id": ["Product not found."]})
+                        continue
+                    before = _stock(product)
+                    removed.append(before)
+                    for field, value in data.items():
+                        setattr(product, field, value)
+                    product.version = F('version') + 1
+                    added.append(_stock(product))
+                    changes.append((product.id, before, _stock(product)))
+                    products.append(product)
+                Product.objects.bulk_update(products, UPDATE_FIELDS)
+                report.updated += len(products)
+            if to_create:
+                Product.objects.bulk_create(to_create)
+                added.extend(_stock(product) for product in to_create)
+                changes.extend((product.id, None, _stock(product)) for product in to_create)
+                report.created += len(to_create)
+            summary.apply_changes(removed, added)
+            history.record(changes, StockMovement.IMPORT)
+            if removed or added:
+                versioning.bump(user_id)
+
+    # bulk_create/bulk_update bypass the post_save signal handlers
+    if report.created or report.updated:
+        send_inventory_changed(user_id)
+    return report
+
+
+class _Echo:
+    # csv.writer target that hands each formatted line straight back
+    def write(self, value):
+        return value
+
+
+def _export_rows(queryset, chunk_size):
+    return (
+        queryset.order_by('id')
+        .values_list(*EXPORT_FIELDS)
+        .iterator(chunk_size=chunk_size)
+    )
+
+
+def export_csv(queryset, chunk_size):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(EXPORT_FIELDS)
+    for product_id, name, category, quantity, price in _export_rows(queryset, chunk_size):
+        yield writer.writerow([product_id, name, category, quantity, format(price, 'f')])
+
+
+def export_ndjson(queryset, chunk_size):
+    for product_id, name, category, quantity, price in _export_rows(queryset, chunk_size):
+        yield json.dumps({
+            "id": product_id,
+            "name": name,
+            "category": category,
+            "quantity": quantity,
+            "price": format(price, 'f'),
+        }, ensure_ascii=False) + "\n"
@@ -0,0 +1,160 @@
+"""
+A local stand-in for the Groq chat completions API.
+
+Used by tests and benchmarks so insights can be exercised without network
+access or API costs::
+
+    with FakeGroqServer(delay=0.5) as server:
+        settings.GROQ_API_URL = server.url
+
+It can also run on its own: ``python -m products.fake_groq --port 8765``.
+"""
+
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_INSIGHTS = {
+    "summary": "Your inventory is healthy.\n\nElectronics dominates the inventory.\n\n🔄 Based on historical data, levels are stable.",
+    "trends": "Demand is steady.\n\nNo stock-outs detected.\n\nAvailability supports sales.\n\n📈 Trend analysis based on current data.",
+    "actions": "**❗ Out of Stock:**\n- None\n**⚠️ Low on Stock:**\n- None\n**💡 Optimization Suggestions:**\n- Keep monitoring stock levels",
+}
+
+
+class FakeGroqServer:
+    def __init__(self, content=None, delay=0.0, status=200, host='127.0.0.1', port=0,
+                 chunk_size=16, chunk_delay=0.0, stream_failure=None):
+        self.content = content if content is not None else json.dumps(DEFAULT_INSIGHTS)
+        self.delay = delay
+        self.chunk_size = chunk_size
+        self.chunk_delay = chunk_delay
+        # Break streams after the first chunk: 'invalid' sends a line that is
+        # not JSON, 'disconnect' drops the connection mid-body
+        self.stream_failure = stream_failure
+        self.status = status
+        self.requests = 0
+        self._httpd = ThreadingHTTPServer((host, port), self._handler_class())
+        self._httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._httpd.server_address[:2]
+        return f'http://{host}:{port}/openai/v1/chat/completions'
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_POST(self):
+                length = int(self.headers.get('Content-Length') or 0)
+                payload = json.loads(self.rfile.read(length) or b'{}')
+                server.requests += 1
+                if server.delay:
+                    time.sleep(server.delay)
+                if server.status != 200:
+                    self._send(server.status, {"error": {"message": "fake upstream error"}})
+                    return
+                if payload.get('stream'):
+                    self._stream(payload)
+                    return
+                prompt = ''.join(m.get('content', '') for m in payload.get('messages', []))
+                self._send(200, {
+                    "id": "fake-completion",
+                    "model": payload.get('model'),
+                    "choices": [{
+                        "index": 0,
+                        "message": {"role": "assistant", "content": server.content},
+                        "finish_reason": "stop",
+                    }],
+                    "usage": {
+                        "prompt_tokens": len(prompt) // 4,
+                        "completion_tokens": len(server.content) // 4,
+                        "total_tokens": (len(prompt) + len(server.content)) // 4,
+                    },
+                })
+
+            def _stream(self, payload):
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/event-stream')
+                self.send_header('Connection', 'close')
+                if server.stream_failure == 'disconnect':
+                    # Chunked framing, so closing early is a broken body
+                    self.send_header('Transfer-Encoding', 'chunked')
+                self.end_headers()
+                content = server.content
+                for start in range(0, len(content), server.chunk_size):
+                    if start and server.stream_failure == 'invalid':
+                        self.wfile.write(b"data: {not json\n\n")
+                        break
+                    chunk = {
+                        "id": "fake-completion",
+                        "model": payload.get('model'),
+                        "choices": [{
+                            "index": 0,
+                            "delta": {"content": content[start:start + server.chunk_size]},
+                        }],
+                    }
+                    event = f"data: {json.dumps(chunk)}\n\n".encode('utf-8')
+                    if server.stream_failure == 'disconnect':
+                        self.wfile.write(b"%x\r\n%s\r\n" % (len(event), event))
+                        self.wfile.flush()
+                        break
+                    self.wfile.write(event)
+                    self.wfile.flush()
+                    if server.chunk_delay:
+                        time.sleep(server.chunk_delay)
+                else:
+                    self.wfile.write(b"data: [DONE]\n\n")
+                self.close_connection = True
+
+            def _send(self, status, body):
+                data = json.dumps(body).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run a fake Groq chat completions server.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--delay', type=float, default=0.0, help='Seconds to wait before answering')
+    args = parser.parse_args()
+
+    server = FakeGroqServer(delay=args.delay, host=args.host, port=args.port)
+    print(f'Fake Groq API listening on {server.url}')
+    try:
+        server._httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
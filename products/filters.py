@@ -0,0 +1,67 @@
+from django import forms
+from django.core.exceptions import ValidationError as DjangoValidationError
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import BaseFilterBackend, OrderingFilter
+
+from .models import Product
+
+
+class ProductFilter(BaseFilterBackend):
+    """
+    Filter products by ``category`` (comma-separated for several),
+    ``min_quantity``/``max_quantity`` and ``min_price``/``max_price``.
+    """
+
+    range_params = {
+        'min_quantity': ('quantity__gte', 'quantity'),
+        'max_quantity': ('quantity__lte', 'quantity'),
+        'min_price': ('price__gte', 'price'),
+        'max_price': ('price__lte', 'price'),
+    }
+
+    def number_fields(self):
+        # Values the columns can hold: finite, within price's max_digits and
+        # the database's integer range for quantity
+        quantity = Product._meta.get_field('quantity')
+        return {
+            'quantity': forms.IntegerField(validators=quantity.validators),
+            'price': Product._meta.get_field('price').formfield(),
+        }
+
+    def filter_queryset(self, request, queryset, view):
+        params = request.query_params
+
+        category = params.get('category')
+        if category:
+            categories = [value for value in category.split(',') if value]
+            if len(categories) == 1:
+                queryset = queryset.filter(category=categories[0])
+            else:
+                queryset = queryset.filter(category__in=categories)
+
+        lookups = {}
+        errors = {}
+        fields = self.number_fields()
+        for param, (lookup, field) in self.range_params.items():
+            value = params.get(param)
+            if value in (None, ''):
+                continue
+            try:
+                lookups[lookup] = fields[field].clean(value)
+            except DjangoValidationError as e:
+                errors[param] = e.messages
+        if errors:
+            raise ValidationError(errors)
+        return queryset.filter(**lookups)
+
+
+class ProductOrderingFilter(OrderingFilter):
+    """OrderingFilter that always breaks ties on ``id`` so pages are stable."""
+    ordering_fields = ['id', 'name', 'category', 'price', 'quantity']
+
+    def get_ordering(self, request, queryset, view):
+        ordering = super().get_ordering(request, queryset, view)
+        if ordering and ordering[0].lstrip('-') != 'id':
+            tiebreak = '-id' if ordering[0].startswith('-') else 'id'
+            ordering = [*ordering, tiebreak]
+        return ordering
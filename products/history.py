@@ -0,0 +1,197 @@
+"""
+Stock movement ledger, snapshot rollups and period-over-period trends.
+
+Product writes append StockMovement rows (``record``) in the writing
+transaction. ``rollup`` folds new movements into daily and weekly
+StockSnapshot rows, resuming from a checkpoint, so trend queries read a
+few snapshot rows per category instead of the raw ledger. ``period_deltas``
+combines those snapshots with the movements not rolled up yet.
+"""
+
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .models import InventorySummary, RollupCheckpoint, StockMovement, StockSnapshot
+
+CHECKPOINT = 'stock_snapshots'
+
+# Days per comparison window in the insights prompt
+TREND_WINDOW_DAYS = 7
+
+
+def _movements(product_id, before, after):
+    # ``before``/``after`` are (user_id, category, quantity, price) or None
+    if before is None:
+        return [(after[0], after[1], after[2], after[2])]
+    if after is None:
+        return [(before[0], before[1], -before[2], 0)]
+    if before[:2] != after[:2]:
+        # An owner or category change moves the stock out of one and into the other
+        return [(before[0], before[1], -before[2], 0), (after[0], after[1], after[2], after[2])]
+    return [(after[0], after[1], after[2] - before[2], after[2])]
+
+
+def record(changes, reason):
+    """
+    Append ledger rows for ``(product_id, before, after)`` changes.
+
+    ``before`` is None for created products and ``after`` is None for
+    deleted ones. Changes that leave every quantity as it was are skipped.
+    """
+    now = timezone.now()
+    rows = [
+        StockMovement(
+            user_id=user_id, product_id=product_id, category=category,
+            delta=delta, quantity_after=quantity_after, reason=reason, created_at=now,
+        )
+        for product_id, before, after in changes
+        for user_id, category, delta, quantity_after in _movements(product_id, before, after)
+        if delta
+    ]
+    if rows:
+        StockMovement.objects.bulk_create(rows)
+
+
+def _week_start(day):
+    return day - timedelta(days=day.weekday())
+
+
+def _add_flows(user_id, category, period, period_start, flows):
+    rows = StockSnapshot.objects.filter(
+        user_id=user_id, category=category, period=period, period_start=period_start
+    )
+    increments = {field: F(field) + value for field, value in flows.items()}
+    if rows.update(**increments):
+        return
+    try:
+        with transaction.atomic():
+            StockSnapshot.objects.create(
+                user_id=user_id, category=category, period=period, period_start=period_start, **flows
+            )
+    except IntegrityError:
+        rows.update(**increments)
+
+
+def rollup(batch_size=50000, lag=None, now=None):
+    """
+    Fold movements recorded since the last run into the snapshots.
+
+    Movements younger than ``lag`` seconds are left for the next run, so a
+    transaction that commits a lower id late is not skipped. Returns the
+    number of movements processed.
+    """
+    now = now or timezone.now()
+    lag = settings.STOCK_ROLLUP_LAG if lag is None else lag
+    checkpoint, _ = RollupCheckpoint.objects.get_or_create(name=CHECKPOINT)
+    processed = 0
+    while True:
+        with transaction.atomic():
+            checkpoint = RollupCheckpoint.objects.select_for_update().get(name=CHECKPOINT)
+            ids = list(
+                StockMovement.objects.filter(
+                    id__gt=checkpoint.last_movement_id, created_at__lt=now - timedelta(seconds=lag)
+                ).order_by('id').values_list('id', flat=True)[:batch_size]
+            )
+            if not ids:
+                break
+            groups = (
+                StockMovement.objects.filter(id__gte=ids[0], id__lte=ids[-1])
+                .annotate(day=TruncDate('created_at'))
+                .values('user_id', 'category', 'day')
+                .annotate(
+                    units_in=Sum('delta', filter=Q(delta__gt=0), default=0),
+                    units_out=-Sum('delta', filter=Q(delta__lt=0), default=0),
+                    movements=Count('id'),
+                )
+                .order_by()
+            )
+            for group in groups:
+                flows = {name: group[name] for name in ('units_in', 'units_out', 'movements')}
+                _add_flows(group['user_id'], group['category'], StockSnapshot.DAY, group['day'], flows)
+                _add_flows(
+                    group['user_id'], group['category'], StockSnapshot.WEEK, _week_start(group['day']), flows
+                )
+            checkpoint.last_movement_id = ids[-1]
+            checkpoint.save(update_fields=['last_movement_id', 'updated_at'])
+        processed += len(ids)
+    return processed
+
+
+def snapshot_closing(today=None):
+    """Copy the current InventorySummary figures onto the open day and week."""
+    today = today or timezone.now().date()
+    for period, start in ((StockSnapshot.DAY, today), (StockSnapshot.WEEK, _week_start(today))):
+        for row in InventorySummary.objects.order_by().iterator():
+            closing = {'closing_item_count': row.item_count, 'closing_value': row.total_value}
+            updated = StockSnapshot.objects.filter(
+                user_id=row.user_id, category=row.category, period=period, period_start=start
+            ).update(**closing)
+            if not updated:
+                try:
+                    with transaction.atomic():
+                        StockSnapshot.objects.create(
+                            user_id=row.user_id, category=row.category,
+                            period=period, period_start=start, **closing
+                        )
+                except IntegrityError:
+                    pass
+
+
+def _window_flows(user_id, since, until):
+    # {category: (units_in, units_out)} from daily snapshots in [since, until)
+    rows = StockSnapshot.objects.filter(
+        user_id=user_id, period=StockSnapshot.DAY, period_start__gte=since, period_start__lt=until
+    ).values('category').annotate(units_in=Sum('units_in'), units_out=Sum('units_out')).order_by()
+    return {row['category']: (row['units_in'], row['units_out']) for row in rows}
+
+
+def period_deltas(user_id, today=None, days=TREND_WINDOW_DAYS):
+    """
+    Compare the last ``days`` days of stock movement with the ``days`` before.
+
+    Returns one dict per category with ``units_in``, ``units_out``, ``net``
+    and ``previous_net``, largest absolute change first, or an empty list
+    when nothing has been recorded yet.
+    """
+    today = today or timezone.now().date()
+    current_start = today - timedelta(days=days - 1)
+    previous_start = current_start - timedelta(days=days)
+    current = _window_flows(user_id, current_start, today + timedelta(days=1))
+    previous = _window_flows(user_id, previous_start, current_start)
+
+    # Movements the last rollup has not reached yet
+    checkpoint = RollupCheckpoint.objects.filter(name=CHECKPOINT).values_list('last_movement_id', flat=True).first()
+    window_start = timezone.make_aware(datetime.combine(previous_start, time.min))
+    pending = (
+        StockMovement.objects.filter(user_id=user_id, created_at__gte=window_start, id__gt=checkpoint or 0)
+        .annotate(day=TruncDate('created_at'))
+        .values('category', 'day')
+        .annotate(
+            units_in=Sum('delta', filter=Q(delta__gt=0), default=0),
+            units_out=-Sum('delta', filter=Q(delta__lt=0), default=0),
+        )
+        .order_by()
+    )
+    for row in pending:
+        window = current if row['day'] >= current_start else previous
+        units_in, units_out = window.get(row['category'], (0, 0))
+        window[row['category']] = (units_in + row['units_in'], units_out + row['units_out'])
+
+    deltas = []
+    for category in current.keys() | previous.keys():
+        units_in, units_out = current.get(category, (0, 0))
+        previous_in, previous_out = previous.get(category, (0, 0))
+        deltas.append({
+            'category': category,
+            'units_in': units_in,
+            'units_out': units_out,
+            'net': units_in - units_out,
+            'previous_net': previous_in - previous_out,
+        })
+    deltas.sort(key=lambda row: (-abs(row['net'] - row['previous_net']), row['category']))
+    return deltas
@@ -0,0 +1,315 @@
+"""
+Insight generation shared by InsightsView and the background job worker.
+
+Concurrent requests for the same user and inventory state share one LLM
+call: within a process through singleflight, and across workers sharing
+the insights cache through its generation lock.
+"""
+
+import json
+import logging
+import re
+from concurrent.futures import TimeoutError
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from rest_framework import status
+
+from inventory_backend import metrics
+
+from . import history, insights_cache, singleflight
+from .llm import LLMError, get_llm_client
+from .prompts import build_messages, compact_inventory_summary
+from .summary import asummary_stats, summary_stats
+
+logger = logging.getLogger(__name__)
+
+REQUIRED_KEYS = ("summary", "trends", "actions")
+
+EMPTY_INVENTORY_INSIGHTS = {
+    "summary": "No inventory data available.",
+    "trends": "No trends available due to lack of inventory data.",
+    "actions": "No actions recommended at this time."
+}
+
+JSON_FENCE_RE = re.compile(r"```json\s*\n([\s\S]*?)\n```")
+# A "key": "value" pair whose string value has been fully received
+SECTION_RE = re.compile(r'"(summary|trends|actions)"\s*:\s*("(?:[^"\\]|\\.)*")')
+
+
+class InsightsError(Exception):
+    """An insights failure that maps to an error response."""
+
+    def __init__(self, message, status_code=status.HTTP_500_INTERNAL_SERVER_ERROR):
+        super().__init__(message)
+        self.message = message
+        self.status_code = status_code
+
+
+def parse_insights(content):
+    """Extract the insights JSON object from a completion."""
+    json_match = JSON_FENCE_RE.search(content)
+
+    if json_match:
+        json_text = json_match.group(1)
+    else:
+        # Fallback: Try using full content directly
+        json_text = content.strip()
+
+    try:
+        generated_insights = json.loads(json_text)
+    except json.JSONDecodeError as e:
+        logger.warning("Invalid JSON in LLM response", extra={"error": str(e), "content": json_text})
+        raise InsightsError("Invalid JSON format in Groq response")
+
+    # Check for required keys
+    if not all(key in generated_insights for key in REQUIRED_KEYS):
+        logger.warning("LLM response is missing insight keys", extra={"content": generated_insights})
+        raise InsightsError("Incomplete insights data from Groq API")
+
+    return generated_insights
+
+
+class SectionParser:
+    """
+    Incrementally pick completed sections out of a streamed completion.
+
+    ``feed`` takes the next chunk of text and returns ``(name, text)`` for
+    every summary/trends/actions value whose closing quote has arrived.
+    """
+
+    def __init__(self):
+        self.buffer = ""
+        self.sections = {}
+        self._pos = 0
+
+    def feed(self, chunk):
+        self.buffer += chunk
+        completed = []
+        while True:
+            match = SECTION_RE.search(self.buffer, self._pos)
+            if not match:
+                break
+            self._pos = match.end()
+            name = match.group(1)
+            if name in self.sections:
+                continue
+            try:
+                self.sections[name] = json.loads(match.group(2))
+            except json.JSONDecodeError:
+                continue
+            completed.append((name, self.sections[name]))
+        return completed
+
+
+def _with_movements(stats, movements):
+    return {**stats, 'movements': movements}
+
+
+def _lookup(stats):
+    """Return ``(inventory_summary, cache_key, cached_insights)`` for ``stats``."""
+    inventory_summary = compact_inventory_summary(stats)
+    cache_key = insights_cache.make_key(inventory_summary)
+    return inventory_summary, cache_key, insights_cache.get(cache_key)
+
+
+def _flight_key(user_id, cache_key):
+    return f'{user_id}:{cache_key}'
+
+
+def _complete(user_id, inventory_summary, cache_key, client):
+    # Called by the in-process leader; waits instead if another worker is
+    # already generating the same entry
+    token = insights_cache.lock(cache_key)
+    if token is None:
+        insights = insights_cache.wait(cache_key)
+        if insights is not None:
+            metrics.INSIGHTS_COALESCED.inc(scope='cache')
+            return insights
+    try:
+        try:
+            content = client.complete(build_messages(inventory_summary))
+        except LLMError as e:
+            raise InsightsError(f"Failed to generate insights: {e.body}", e.status_code)
+        generated_insights = parse_insights(content)
+        # Stored before the lock goes, so waiters never see neither
+        insights_cache.store(user_id, cache_key, generated_insights)
+    finally:
+        if token:
+            insights_cache.unlock(cache_key, token)
+    return generated_insights
+
+
+async def _acomplete(user_id, inventory_summary, cache_key, client):
+    token = insights_cache.lock(cache_key)
+    if token is None:
+        insights = await sync_to_async(insights_cache.wait, thread_sensitive=False)(cache_key)
+        if insights is not None:
+            metrics.INSIGHTS_COALESCED.inc(scope='cache')
+            return insights
+    try:
+        try:
+            content = await client.acomplete(build_messages(inventory_summary))
+        except LLMError as e:
+            raise InsightsError(f"Failed to generate insights: {e.body}", e.status_code)
+        generated_insights = parse_insights(content)
+        # Stored before the lock goes, so waiters never see neither
+        insights_cache.store(user_id, cache_key, generated_insights)
+    finally:
+        if token:
+            insights_cache.unlock(cache_key, token)
+    return generated_insights
+
+
+def generate_insights(user_id, client=None):
+    """
+    Return ``(insights, cache_hit)`` for the user's current inventory.
+
+    ``cache_hit`` is None when the inventory is empty and no lookup was made.
+    Raises InsightsError on upstream or parsing failures.
+    """
+    stats = summary_stats(user_id)
+
+    # Handle empty inventory
+    if not stats['total_items']:
+        return EMPTY_INVENTORY_INSIGHTS, None
+
+    stats = _with_movements(stats, history.period_deltas(user_id))
+    inventory_summary, cache_key, cached_insights = _lookup(stats)
+    if cached_insights is not None:
+        return cached_insights, True
+
+    client = client or get_llm_client()
+    generated_insights, leader = singleflight.run(
+        _flight_key(user_id, cache_key),
+        lambda: _complete(user_id, inventory_summary, cache_key, client),
+        timeout=settings.INSIGHTS_COALESCE_TIMEOUT,
+    )
+    if not leader:
+        metrics.INSIGHTS_COALESCED.inc(scope='process')
+    return generated_insights, False
+
+
+async def agenerate_insights(user_id, client=None):
+    """Async variant of generate_insights() using the async ORM and client."""
+    stats = await asummary_stats(user_id)
+
+    if not stats['total_items']:
+        return EMPTY_INVENTORY_INSIGHTS, None
+
+    stats = _with_movements(stats, await sync_to_async(history.period_deltas)(user_id))
+
+    # Cache backends used here are in-process or local files, cheap enough
+    # to call directly from the event loop.
+    inventory_summary, cache_key, cached_insights = _lookup(stats)
+    if cached_insights is not None:
+        return cached_insights, True
+
+    client = client or get_llm_client()
+    generated_insights, leader = await singleflight.arun(
+        _flight_key(user_id, cache_key),
+        lambda: _acomplete(user_id, inventory_summary, cache_key, client),
+        timeout=settings.INSIGHTS_COALESCE_TIMEOUT,
+    )
+    if not leader:
+        metrics.INSIGHTS_COALESCED.inc(scope='process')
+    return generated_insights, False
+
+
+def _replay(insights):
+    for key in REQUIRED_KEYS:
+        yield "section", {"name": key, "content": insights[key]}
+    yield "done", insights
+
+
+def _stream_completion(user_id, inventory_summary, cache_key, client):
+    parser = SectionParser()
+    try:
+        for delta in client.stream(build_messages(inventory_summary)):
+            yield "token", {"delta": delta}
+            for name, content in parser.feed(delta):
+                yield "section", {"name": name, "content": content}
+
+        # The assembled text goes through the same parsing as the
+        # non-streaming path, including the fenced-JSON fallback.
+        logger.debug("LLM response", extra={"content": parser.buffer})
+        generated_insights = parse_insights(parser.buffer)
+    except LLMError as e:
+        yield "error", {"error": f"Failed to generate insights: {e.body}", "status": e.status_code}
+        return
+    except InsightsError as e:
+        yield "error", {"error": e.message, "status": e.status_code}
+        return
+
+    insights_cache.store(user_id, cache_key, generated_insights)
+    yield "done", generated_insights
+
+
+def _leader_stream(user_id, inventory_summary, cache_key, client):
+    token = insights_cache.lock(cache_key)
+    if token is None:
+        insights = insights_cache.wait(cache_key)
+        if insights is not None:
+            metrics.INSIGHTS_COALESCED.inc(scope='cache')
+            yield from _replay(insights)
+            return
+    try:
+        yield from _stream_completion(user_id, inventory_summary, cache_key, client)
+    finally:
+        if token:
+            insights_cache.unlock(cache_key, token)
+
+
+def _coalesced_stream(user_id, inventory_summary, cache_key, client):
+    # Joins the flight on first iteration, so a response that is never
+    # streamed does not leave a leader behind
+    key = _flight_key(user_id, cache_key)
+    future, leader = singleflight.join(key)
+    if not leader:
+        try:
+            insights = future.result(settings.INSIGHTS_COALESCE_TIMEOUT)
+        except InsightsError as e:
+            yield "error", {"error": e.message, "status": e.status_code}
+            return
+        except (singleflight.Abandoned, TimeoutError):
+            yield from _stream_completion(user_id, inventory_summary, cache_key, client)
+            return
+        metrics.INSIGHTS_COALESCED.inc(scope='process')
+        yield from _replay(insights)
+        return
+
+    # Followers get the final insights, not the token stream
+    result, error = None, singleflight.Abandoned()
+    try:
+        for event, data in _leader_stream(user_id, inventory_summary, cache_key, client):
+            if event == "done":
+                result, error = data, None
+            elif event == "error":
+                error = InsightsError(data["error"], data["status"])
+            yield event, data
+    finally:
+        singleflight.finish(key, future, result, error)
+
+
+def stream_insights(user_id, client=None):
+    """
+    Return ``(events, cache_hit)`` where ``events`` yields ``(event, data)``.
+
+    Statistics and the cache lookup run immediately; the LLM is only called
+    once ``events`` is iterated. Events are ``token`` (raw text deltas),
+    ``section`` (a completed summary/trends/actions value), then ``done``
+    with the full insights or ``error``.
+    """
+    stats = summary_stats(user_id)
+
+    if not stats['total_items']:
+        return _replay(EMPTY_INVENTORY_INSIGHTS), None
+
+    stats = _with_movements(stats, history.period_deltas(user_id))
+
+    inventory_summary, cache_key, cached_insights = _lookup(stats)
+    if cached_insights is not None:
+        return _replay(cached_insights), True
+
+    client = client or get_llm_client()
+    return _coalesced_stream(user_id, inventory_summary, cache_key, client), False
@@ -0,0 +1,122 @@
+"""
+Content-addressed cache for generated insights.
+
+Entries are keyed by a hash of the inventory summary and the prompt version,
+so an unchanged inventory never triggers a second Groq call. Each user also
+has a pointer to their latest entry so product writes can drop it eagerly.
+
+``lock``/``wait`` let one worker generate an entry while others sharing the
+cache wait for it; with the per-process locmem backend they only see their
+own process.
+"""
+
+import hashlib
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import caches
+
+from .prompts import PROMPT_VERSION
+
+CACHE_ALIAS = 'insights'
+HITS_KEY = 'insights:stats:hits'
+MISSES_KEY = 'insights:stats:misses'
+
+
+def _cache():
+    return caches[CACHE_ALIAS]
+
+
+def _user_key(user_id):
+    return f'insights:user:{user_id}'
+
+
+def make_key(inventory_summary):
+    digest = hashlib.sha256(
+        f'{PROMPT_VERSION}\n{inventory_summary}'.encode('utf-8')
+    ).hexdigest()
+    return f'insights:v{PROMPT_VERSION}:{digest}'
+
+
+def _count(key):
+    cache = _cache()
+    cache.add(key, 0, timeout=None)
+    try:
+        cache.incr(key)
+    except ValueError:
+        # Evicted between add() and incr()
+        cache.set(key, 1, timeout=None)
+
+
+def get(key):
+    """Return cached insights for ``key`` or None, recording a hit or miss."""
+    insights = _cache().get(key)
+    _count(HITS_KEY if insights is not None else MISSES_KEY)
+    return insights
+
+
+def store(user_id, key, insights):
+    cache = _cache()
+    cache.set(key, insights)
+    cache.set(_user_key(user_id), key)
+
+
+def _lock_key(key):
+    return f'{key}:lock'
+
+
+def lock(key):
+    """Try to claim generation of ``key``; return a token, or None if taken."""
+    token = uuid.uuid4().hex
+    if _cache().add(_lock_key(key), token, timeout=settings.INSIGHTS_COALESCE_TIMEOUT):
+        return token
+    return None
+
+
+def unlock(key, token):
+    cache = _cache()
+    # Best effort: only drop the lock if it has not expired and been retaken
+    if cache.get(_lock_key(key)) == token:
+        cache.delete(_lock_key(key))
+
+
+def wait(key, timeout=None, interval=0.1):
+    """
+    Poll for insights another worker is generating under ``key``.
+
+    Returns them, or None once the lock is released without a result or
+    ``timeout`` (INSIGHTS_COALESCE_TIMEOUT by default) passes.
+    """
+    cache = _cache()
+    deadline = time.monotonic() + (settings.INSIGHTS_COALESCE_TIMEOUT if timeout is None else timeout)
+    while True:
+        insights = cache.get(key)
+        if insights is not None:
+            return insights
+        if cache.get(_lock_key(key)) is None:
+            # The result may have landed just before the lock was released
+            return cache.get(key)
+        if time.monotonic() >= deadline:
+            return None
+        time.sleep(interval)
+
+
+def invalidate(user_id):
+    """Drop the user's latest cached insights after an inventory change."""
+    cache = _cache()
+    user_key = _user_key(user_id)
+    key = cache.get(user_key)
+    cache.delete_many([user_key, key] if key else [user_key])
+
+
+def stats():
+    cache = _cache()
+    hits = cache.get(HITS_KEY, 0)
+    misses = cache.get(MISSES_KEY, 0)
+    total = hits + misses
+    return {
+        'hits': hits,
+        'misses': misses,
+        'hit_ratio': hits / total if total else 0.0,
+    }
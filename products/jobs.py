@@ -0,0 +1,95 @@
+"""
+Background execution of insight generation.
+
+``settings.INSIGHTS_JOB_BACKEND`` selects where queued jobs run:
+
+- ``thread``: an in-process thread pool picks the job up as soon as the
+  enqueuing transaction commits.
+- ``db``: jobs stay pending in the InsightJob table until a
+  ``manage.py run_insight_worker`` process claims them.
+
+Neither needs an external broker.
+"""
+
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+
+from .insights import InsightsError, generate_insights
+from .models import InsightJob
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.INSIGHTS_JOB_WORKERS,
+                thread_name_prefix='insights',
+            )
+    return _executor
+
+
+def enqueue(user_id):
+    job = InsightJob.objects.create(user_id=user_id)
+    if settings.INSIGHTS_JOB_BACKEND == 'thread':
+        transaction.on_commit(lambda: get_executor().submit(run_in_thread, job.id))
+    return job
+
+
+def claim(job_id):
+    # Only one worker wins the PENDING -> RUNNING transition
+    return InsightJob.objects.filter(id=job_id, status=InsightJob.PENDING).update(
+        status=InsightJob.RUNNING
+    ) == 1
+
+
+def claim_next():
+    """Claim the oldest pending job, or return None if there is none."""
+    while True:
+        job_id = (
+            InsightJob.objects.filter(status=InsightJob.PENDING)
+            .order_by('created_at')
+            .values_list('id', flat=True)
+            .first()
+        )
+        if job_id is None:
+            return None
+        if claim(job_id):
+            return job_id
+
+
+def execute(job_id):
+    """Run a claimed job and store its result or error."""
+    job = InsightJob.objects.get(id=job_id)
+    try:
+        job.result, _ = generate_insights(job.user_id)
+        job.status = InsightJob.DONE
+    except InsightsError as e:
+        job.status = InsightJob.FAILED
+        job.error = e.message
+        job.error_status = e.status_code
+    except Exception:
+        logger.exception("Insight job failed", extra={"job_id": str(job_id)})
+        job.status = InsightJob.FAILED
+        job.error = "Internal server error"
+        job.error_status = 500
+    job.save(update_fields=['status', 'result', 'error', 'error_status', 'updated_at'])
+    return job
+
+
+def run_in_thread(job_id):
+    close_old_connections()
+    try:
+        if claim(job_id):
+            execute(job_id)
+    finally:
+        close_old_connections()
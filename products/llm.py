@@ -0,0 +1,269 @@
+"""
+LLM clients used to generate insights.
+
+Views and the job worker only depend on ``LLMClient.complete`` (or
+``acomplete`` from async code); the concrete class is chosen by
+``settings.INSIGHTS_LLM_CLIENT`` so tests and benchmarks can point at a local
+fake server (see products.fake_groq) or swap in their own.
+
+GroqClient keeps one pooled keep-alive connection set per process (and per
+event loop for async callers), applies explicit timeouts, retries 429/5xx
+responses with exponential backoff, and caps concurrent upstream calls.
+Call latency and the token counts from each response's ``usage`` block are
+recorded in inventory_backend.metrics.
+
+The HTTP libraries are imported on first use rather than with this module,
+so worker startup does not pay for them.
+"""
+
+import asyncio
+import json
+import logging
+import random
+import threading
+import time
+import weakref
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+from inventory_backend import metrics
+
+logger = logging.getLogger(__name__)
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+class LLMError(Exception):
+    """Raised when the upstream API answers with an error status."""
+
+    def __init__(self, status_code, body):
+        super().__init__(f"{status_code} {body}")
+        self.status_code = status_code
+        self.body = body
+
+
+class LLMClient:
+    def complete(self, messages):
+        """Send chat ``messages`` and return the completion text."""
+        raise NotImplementedError
+
+    async def acomplete(self, messages):
+        # Clients without native async support run in a worker thread
+        return await sync_to_async(self.complete, thread_sensitive=False)(messages)
+
+    def stream(self, messages):
+        """Yield the completion text in chunks as it is generated."""
+        yield self.complete(messages)
+
+
+_session = None
+_session_lock = threading.Lock()
+_sync_slots = None
+
+# One AsyncClient and concurrency cap per event loop; httpx clients cannot be
+# shared across loops.
+_async_state = weakref.WeakKeyDictionary()
+
+
+def _timeout():
+    return (settings.GROQ_CONNECT_TIMEOUT, settings.GROQ_READ_TIMEOUT)
+
+
+def get_session():
+    import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+
+    global _session, _sync_slots
+    with _session_lock:
+        if _session is None:
+            retry = Retry(
+                total=settings.GROQ_MAX_RETRIES,
+                backoff_factor=settings.GROQ_RETRY_BACKOFF,
+                status_forcelist=RETRY_STATUSES,
+                allowed_methods=None,
+                respect_retry_after_header=True,
+                raise_on_status=False,
+            )
+            adapter = HTTPAdapter(
+                pool_connections=1,
+                pool_maxsize=settings.GROQ_MAX_CONCURRENCY,
+                max_retries=retry,
+            )
+            session = requests.Session()
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+            _sync_slots = threading.BoundedSemaphore(settings.GROQ_MAX_CONCURRENCY)
+            _session = session
+    return _session
+
+
+def get_async_client():
+    """Return the (client, semaphore) pair for the running event loop."""
+    import httpx
+
+    loop = asyncio.get_running_loop()
+    state = _async_state.get(loop)
+    if state is None:
+        client = httpx.AsyncClient(
+            timeout=httpx.Timeout(
+                settings.GROQ_READ_TIMEOUT, connect=settings.GROQ_CONNECT_TIMEOUT
+            ),
+            limits=httpx.Limits(
+                max_connections=settings.GROQ_MAX_CONCURRENCY,
+                max_keepalive_connections=settings.GROQ_MAX_CONCURRENCY,
+            ),
+        )
+        state = (client, asyncio.Semaphore(settings.GROQ_MAX_CONCURRENCY))
+        _async_state[loop] = state
+    return state
+
+
+def _retry_delay(attempt, response=None):
+    retry_after = response is not None and response.headers.get('Retry-After')
+    if retry_after and retry_after.isdigit():
+        return min(int(retry_after), settings.GROQ_RETRY_BACKOFF_MAX)
+    delay = settings.GROQ_RETRY_BACKOFF * (2 ** attempt)
+    return min(delay, settings.GROQ_RETRY_BACKOFF_MAX) * random.uniform(0.5, 1.0)
+
+
+class GroqClient(LLMClient):
+    def __init__(self, api_url=None, api_key=None, model=None):
+        self.api_url = api_url or settings.GROQ_API_URL
+        self.api_key = api_key or settings.GROQ_API_KEY
+        self.model = model or settings.GROQ_MODEL
+
+    def _request(self, messages, stream=False):
+        payload = {
+            "model": self.model,
+            "messages": messages,
+        }
+        if stream:
+            payload["stream"] = True
+        return {
+            "headers": {
+                "Content-Type": "application/json",
+                "Authorization": f"Bearer {self.api_key}",
+            },
+            "json": payload,
+        }
+
+    def _observe(self, mode, start, outcome):
+        metrics.LLM_DURATION.observe(
+            time.perf_counter() - start, model=self.model, mode=mode, outcome=outcome
+        )
+
+    def _content(self, status_code, text, json_body):
+        if not 200 <= status_code < 300:
+            logger.warning("Groq API error", extra={"status": status_code, "body": text})
+            raise LLMError(status_code, text)
+
+        data = json_body()
+        metrics.record_llm_usage(self.model, data.get("usage"))
+        content = data.get("choices", [{}])[0].get("message", {}).get("content", "")
+        logger.debug("LLM response", extra={"content": content})
+        return content
+
+    def complete(self, messages):
+        import requests
+
+        session = get_session()
+        start = time.perf_counter()
+        try:
+            with _sync_slots:
+                response = session.post(self.api_url, timeout=_timeout(), **self._request(messages))
+        except requests.Timeout:
+            self._observe("complete", start, "timeout")
+            raise LLMError(504, "Timed out waiting for the Groq API")
+        except requests.RequestException as e:
+            self._observe("complete", start, "transport_error")
+            raise LLMError(502, f"Could not reach the Groq API: {e}")
+        self._observe("complete", start, "ok" if response.ok else "http_error")
+        return self._content(response.status_code, response.text, response.json)
+
+    def stream(self, messages):
+        import requests
+
+        session = get_session()
+        start = time.perf_counter()
+        with _sync_slots:
+            try:
+                response = session.post(
+                    self.api_url, timeout=_timeout(), stream=True,
+                    **self._request(messages, stream=True)
+                )
+            except requests.Timeout:
+                self._observe("stream", start, "timeout")
+                raise LLMError(504, "Timed out waiting for the Groq API")
+            except requests.RequestException as e:
+                self._observe("stream", start, "transport_error")
+                raise LLMError(502, f"Could not reach the Groq API: {e}")
+
+            with response:
+                if not response.ok:
+                    self._observe("stream", start, "http_error")
+                    logger.warning("Groq API error", extra={"status": response.status_code, "body": response.text})
+                    raise LLMError(response.status_code, response.text)
+
+                # OpenAI-style server-sent events: "data: {json}" ... "data: [DONE]"
+                response.encoding = "utf-8"
+                try:
+                    for line in response.iter_lines(decode_unicode=True):
+                        if not line or not line.startswith("data:"):
+                            continue
+                        data = line[len("data:"):].strip()
+                        if data == "[DONE]":
+                            break
+                        chunk = json.loads(data)
+                        # OpenAI puts usage on the last chunk, Groq under x_groq
+                        metrics.record_llm_usage(
+                            self.model, chunk.get("usage") or chunk.get("x_groq", {}).get("usage")
+                        )
+                        delta = chunk.get("choices", [{}])[0].get("delta", {}).get("content")
+                        if delta:
+                            yield delta
+                except requests.Timeout:
+                    self._observe("stream", start, "timeout")
+                    raise LLMError(504, "Timed out reading the Groq API stream")
+                except requests.RequestException as e:
+                    self._observe("stream", start, "transport_error")
+                    raise LLMError(502, f"Groq API stream was interrupted: {e}")
+                except ValueError as e:
+                    self._observe("stream", start, "invalid_response")
+                    raise LLMError(502, f"Invalid chunk in the Groq API stream: {e}")
+                self._observe("stream", start, "ok")
+
+    async def acomplete(self, messages):
+        import httpx
+
+        client, semaphore = get_async_client()
+        start = time.perf_counter()
+        async with semaphore:
+            for attempt in range(settings.GROQ_MAX_RETRIES + 1):
+                last_attempt = attempt == settings.GROQ_MAX_RETRIES
+                try:
+                    response = await client.post(self.api_url, **self._request(messages))
+                except httpx.TimeoutException:
+                    if last_attempt:
+                        self._observe("complete", start, "timeout")
+                        raise LLMError(504, "Timed out waiting for the Groq API")
+                    await asyncio.sleep(_retry_delay(attempt))
+                    continue
+                except httpx.TransportError as e:
+                    if last_attempt:
+                        self._observe("complete", start, "transport_error")
+                        raise LLMError(502, f"Could not reach the Groq API: {e}")
+                    await asyncio.sleep(_retry_delay(attempt))
+                    continue
+                if response.status_code in RETRY_STATUSES and not last_attempt:
+                    await asyncio.sleep(_retry_delay(attempt, response))
+                    continue
+                break
+        self._observe("complete", start, "ok" if response.is_success else "http_error")
+        return self._content(response.status_code, response.text, response.json)
+
+
+def get_llm_client():
+    return import_string(settings.INSIGHTS_LLM_CLIENT)()
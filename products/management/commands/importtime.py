@@ -0,0 +1,75 @@
+import os
+import subprocess
+import sys
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# What a worker imports before serving: app setup, then the URLconf
+STARTUP = (
+    "import django; django.setup(); "
+    "from django.urls import get_resolver; get_resolver().url_patterns"
+)
+
+
+def parse_importtime(output):
+    """Return ``(module, self_us, cumulative_us)`` rows from ``-X importtime`` output."""
+    rows = []
+    for line in output.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, module = line[len('import time:'):].split('|')
+        rows.append((module.strip(), int(self_us), int(cumulative_us)))
+    return rows
+
+
+class Command(BaseCommand):
+    help = (
+        "Profile worker startup with python -X importtime in a fresh interpreter "
+        "and list the slowest imports. Honours --settings, so the full and "
+        "API-only (inventory_backend.settings_api) profiles can be compared."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, default=25, help='Rows to show.')
+        parser.add_argument('--sort', choices=['cumulative', 'self'], default='cumulative',
+                            help='Rank modules by time including (cumulative) or excluding (self) their imports.')
+        parser.add_argument('--packages', action='store_true',
+                            help='Sum self time per top-level package instead of listing modules.')
+        parser.add_argument('--import', dest='modules', action='append', default=[],
+                            help='Also import this module after startup, e.g. products.views.')
+
+    def handle(self, *args, **options):
+        code = STARTUP + ''.join(f"; import {module}" for module in options['modules'])
+        env = {**os.environ, 'DJANGO_SETTINGS_MODULE': settings.SETTINGS_MODULE}
+        result = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', code],
+            env=env, capture_output=True, text=True,
+        )
+        rows = parse_importtime(result.stderr)
+        if result.returncode:
+            errors = [line for line in result.stderr.splitlines() if not line.startswith('import time:')]
+            raise CommandError("Startup failed:\n" + '\n'.join(errors))
+
+        total = sum(self_us for _, self_us, _ in rows)
+        self.stdout.write(
+            f"{settings.SETTINGS_MODULE}: {len(rows)} modules, {total / 1000:.1f} ms of imports"
+        )
+        if options['packages']:
+            packages = defaultdict(lambda: [0, 0])
+            for module, self_us, _ in rows:
+                package = packages[module.split('.')[0]]
+                package[0] += self_us
+                package[1] += 1
+            ranked = sorted(packages.items(), key=lambda item: -item[1][0])[:options['limit']]
+            self.stdout.write(f"{'self ms':>9}  {'modules':>7}  package")
+            for package, (self_us, count) in ranked:
+                self.stdout.write(f"{self_us / 1000:9.1f}  {count:7d}  {package}")
+            return
+
+        index = 1 if options['sort'] == 'self' else 2
+        ranked = sorted(rows, key=lambda row: -row[index])[:options['limit']]
+        self.stdout.write(f"{'self ms':>9}  {'cumul ms':>9}  module")
+        for module, self_us, cumulative_us in ranked:
+            self.stdout.write(f"{self_us / 1000:9.1f}  {cumulative_us / 1000:9.1f}  {module}")
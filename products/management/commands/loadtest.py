@@ -0,0 +1,224 @@
+import json
+import os
+import random
+import statistics
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from django.conf import settings
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.core.servers.basehttp import ThreadedWSGIServer, WSGIRequestHandler
+from django.db import connection
+
+from inventory_backend import metrics
+from products.fake_groq import FakeGroqServer
+
+# Scenario name -> URL name reported by MetricsMiddleware
+SCENARIOS = {
+    'list': 'product-list-create',
+    'detail': 'product-detail',
+    'insights': 'insights',
+    'login': 'login',
+    'refresh': 'token_refresh',
+}
+# Metrics compared against --baseline; True when higher is better
+COMPARED = {'p95_ms': False, 'throughput_rps': True, 'queries_per_request': False}
+
+
+class QuietHandler(WSGIRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a throwaway database, serve the API in-process and drive its main "
+        "endpoints at the given concurrency. Prints a JSON report with latency "
+        "percentiles, throughput and queries per request."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=10)
+        parser.add_argument('--products', type=int, default=1000, help='Products per user.')
+        parser.add_argument('--requests', type=int, default=200, help='Requests per scenario.')
+        parser.add_argument('--concurrency', type=int, default=8)
+        parser.add_argument('--scenarios', default=','.join(SCENARIOS),
+                            help=f"Comma-separated subset of: {', '.join(SCENARIOS)}")
+        parser.add_argument('--llm-delay', type=float, default=0.2,
+                            help='Seconds the fake Groq server waits per completion.')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--output', help='Also write the JSON report to this file.')
+        parser.add_argument('--baseline', help='A previous report to compare against.')
+        parser.add_argument('--tolerance', type=float, default=0.2,
+                            help='Allowed relative regression before the command fails.')
+
+    def handle(self, *args, **options):
+        scenarios = [name for name in options['scenarios'].split(',') if name]
+        unknown = set(scenarios) - set(SCENARIOS)
+        if unknown:
+            raise CommandError(f"Unknown scenarios: {', '.join(sorted(unknown))}")
+
+        with tempfile.TemporaryDirectory() as tmp:
+            # An on-disk database so the server threads share it
+            test_settings = connection.settings_dict.setdefault('TEST', {})
+            old_name = connection.settings_dict['NAME']
+            if connection.vendor == 'sqlite':
+                test_settings['NAME'] = os.path.join(tmp, 'loadtest.sqlite3')
+            connection.creation.create_test_db(verbosity=0, autoclobber=True)
+            try:
+                report = self.run(scenarios, options)
+            finally:
+                connection.creation.destroy_test_db(old_name, verbosity=0)
+
+        output = json.dumps(report, indent=2)
+        self.stdout.write(output)
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                f.write(output + '\n')
+        if options['baseline']:
+            self.compare(report, options['baseline'], options['tolerance'])
+
+    def run(self, scenarios, options):
+        call_command(
+            'seed_inventory', users=options['users'], products=options['products'],
+            seed=options['seed'], stdout=open(os.devnull, 'w'),
+        )
+        httpd = ThreadedWSGIServer(('127.0.0.1', 0), QuietHandler, allow_reuse_address=False)
+        httpd.set_app(WSGIHandler())
+        server = threading.Thread(target=httpd.serve_forever, daemon=True)
+        server.start()
+        base_url = f"http://127.0.0.1:{httpd.server_address[1]}"
+
+        old_url = settings.GROQ_API_URL
+        old_rates = settings.INSIGHTS_THROTTLE_RATES
+        old_replicas = settings.DATABASE_REPLICAS
+        try:
+            with FakeGroqServer(delay=options['llm_delay']) as llm:
+                settings.GROQ_API_URL = llm.url
+                # The load is deliberate; measure the endpoints, not the throttles
+                settings.INSIGHTS_THROTTLE_RATES = {}
+                # Configured replicas are not part of the throwaway database
+                settings.DATABASE_REPLICAS = []
+                accounts = self.login_all(base_url, options['users'])
+                results = {
+                    name: self.run_scenario(name, base_url, accounts, options)
+                    for name in scenarios
+                }
+                llm_calls = llm.requests
+        finally:
+            settings.GROQ_API_URL = old_url
+            settings.INSIGHTS_THROTTLE_RATES = old_rates
+            settings.DATABASE_REPLICAS = old_replicas
+            httpd.shutdown()
+            httpd.server_close()
+
+        return {
+            'config': {
+                key: options[key]
+                for key in ('users', 'products', 'requests', 'concurrency', 'llm_delay', 'seed')
+            } | {'database': connection.vendor},
+            'llm_calls': llm_calls,
+            'scenarios': results,
+        }
+
+    def login_all(self, base_url, count):
+        accounts = []
+        with requests.Session() as session:
+            for n in range(count):
+                response = session.post(f"{base_url}/api/login/", json={
+                    'username': f"loaduser{n}", 'password': 'loadtest-password',
+                })
+                response.raise_for_status()
+                tokens = response.json()
+                headers = {'Authorization': f"Bearer {tokens['access']}"}
+                ids = session.get(
+                    f"{base_url}/api/products/?fields=id&page_size=1000", headers=headers
+                ).json()['results']
+                accounts.append({
+                    'username': f"loaduser{n}",
+                    'headers': headers,
+                    'refresh': tokens['refresh'],
+                    'product_ids': [row['id'] for row in ids],
+                })
+        return accounts
+
+    def request_for(self, name, account, rng):
+        if name == 'list':
+            return 'GET', '/api/products/', {'headers': account['headers']}
+        if name == 'detail':
+            product_id = rng.choice(account['product_ids'])
+            return 'GET', f"/api/products/{product_id}/", {'headers': account['headers']}
+        if name == 'insights':
+            return 'POST', '/api/insights/', {'headers': account['headers']}
+        if name == 'login':
+            return 'POST', '/api/login/', {
+                'json': {'username': account['username'], 'password': 'loadtest-password'},
+            }
+        return 'POST', '/api/token/refresh/', {'json': {'refresh': account['refresh']}}
+
+    def run_scenario(self, name, base_url, accounts, options):
+        local = threading.local()
+
+        def one(n):
+            session = getattr(local, 'session', None)
+            if session is None:
+                session = local.session = requests.Session()
+            rng = random.Random(options['seed'] * 1_000_003 + n)
+            method, path, kwargs = self.request_for(name, accounts[n % len(accounts)], rng)
+            start = time.perf_counter()
+            response = session.request(method, base_url + path, **kwargs)
+            response.content
+            return time.perf_counter() - start, response.status_code
+
+        queries_before = metrics.REQUEST_QUERIES.totals(view=SCENARIOS[name])
+        start = time.perf_counter()
+        with ThreadPoolExecutor(options['concurrency']) as pool:
+            results = list(pool.map(one, range(options['requests'])))
+        elapsed = time.perf_counter() - start
+        queries_after = metrics.REQUEST_QUERIES.totals(view=SCENARIOS[name])
+
+        latencies = sorted(duration * 1000 for duration, _ in results)
+        served = queries_after[0] - queries_before[0]
+        return {
+            'requests': len(results),
+            'errors': sum(1 for _, status in results if status >= 400),
+            'throughput_rps': round(len(results) / elapsed, 1),
+            'p50_ms': round(percentile(latencies, 0.50), 2),
+            'p95_ms': round(percentile(latencies, 0.95), 2),
+            'p99_ms': round(percentile(latencies, 0.99), 2),
+            'mean_ms': round(statistics.fmean(latencies), 2),
+            'queries_per_request': (
+                round((queries_after[1] - queries_before[1]) / served, 2) if served else None
+            ),
+        }
+
+    def compare(self, report, baseline_path, tolerance):
+        with open(baseline_path) as f:
+            baseline = json.load(f)
+        regressions = []
+        for name, current in report['scenarios'].items():
+            previous = baseline.get('scenarios', {}).get(name)
+            if not previous:
+                continue
+            for key, higher_is_better in COMPARED.items():
+                old, new = previous.get(key), current.get(key)
+                if not old or new is None:
+                    continue
+                change = (new - old) / old
+                if (-change if higher_is_better else change) > tolerance:
+                    regressions.append(f"{name}.{key}: {old} -> {new} ({change:+.0%})")
+        if regressions:
+            raise CommandError("Regressions against baseline:\n  " + "\n  ".join(regressions))
+        self.stderr.write(self.style.SUCCESS(f"No regressions beyond {tolerance:.0%} of {baseline_path}."))
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from products import summary
+
+
+class Command(BaseCommand):
+    help = "Recompute the InventorySummary table from the product rows."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', type=int, help='Only rebuild this user id.')
+
+    def handle(self, *args, **options):
+        summary.rebuild(options['user'])
+        target = f"user {options['user']}" if options['user'] else "all users"
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt inventory summary for {target}."))
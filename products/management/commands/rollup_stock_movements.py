@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from products import history
+
+
+class Command(BaseCommand):
+    help = (
+        "Fold new stock movements into the daily and weekly snapshots and record "
+        "closing stock for the current periods. Run it from cron every few minutes."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=50000)
+        parser.add_argument('--lag', type=int,
+                            help='Skip movements younger than this many seconds (default STOCK_ROLLUP_LAG).')
+
+    def handle(self, *args, **options):
+        processed = history.rollup(batch_size=options['batch_size'], lag=options['lag'])
+        history.snapshot_closing()
+        self.stdout.write(self.style.SUCCESS(f"Rolled up {processed} stock movements."))
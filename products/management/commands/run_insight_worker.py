@@ -0,0 +1,42 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from products import jobs
+
+
+class Command(BaseCommand):
+    help = "Process queued insight jobs from the InsightJob table."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, default=4,
+                            help='Number of jobs to run in parallel.')
+        parser.add_argument('--poll-interval', type=float, default=1.0,
+                            help='Seconds to sleep when the queue is empty.')
+        parser.add_argument('--once', action='store_true',
+                            help='Exit once the queue is drained.')
+
+    def handle(self, *args, **options):
+        concurrency = options['concurrency']
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            running = set()
+            while True:
+                running = {future for future in running if not future.done()}
+                job_id = jobs.claim_next() if len(running) < concurrency else None
+                if job_id is not None:
+                    running.add(pool.submit(self.run_job, job_id))
+                    continue
+                if options['once'] and not running:
+                    break
+                close_old_connections()
+                time.sleep(options['poll_interval'] if not running else 0.05)
+
+    def run_job(self, job_id):
+        close_old_connections()
+        try:
+            job = jobs.execute(job_id)
+            self.stdout.write(f"Insight job {job.id}: {job.status}")
+        finally:
+            close_old_connections()
@@ -0,0 +1,67 @@
+import random
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from products import summary
+from products.models import Product
+
+CATEGORIES = [
+    'Electronics', 'Home Office', 'Accessories', 'Apparel', 'Tools',
+    'Kitchen', 'Garden', 'Toys', 'Books', 'Sports', 'Health', 'Auto',
+]
+
+
+class Command(BaseCommand):
+    help = "Create N users with M random products each, using bulk inserts."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=10)
+        parser.add_argument('--products', type=int, default=1000, help='Products per user.')
+        parser.add_argument('--prefix', default='loaduser',
+                            help='Usernames are <prefix><n>; existing ones are replaced.')
+        parser.add_argument('--password', default='loadtest-password')
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        prefix = options['prefix']
+        # One hash shared by every seeded user; hashing per user would dominate
+        password = make_password(options['password'])
+        usernames = [f"{prefix}{n}" for n in range(options['users'])]
+
+        with transaction.atomic():
+            User.objects.filter(username__in=usernames).delete()
+            users = User.objects.bulk_create(
+                [User(username=username, email=f"{username}@example.com", password=password)
+                 for username in usernames]
+            )
+            if not all(user.pk for user in users):
+                users = list(User.objects.filter(username__in=usernames))
+
+            batch = []
+            for user in users:
+                for n in range(options['products']):
+                    batch.append(Product(
+                        user_id=user.pk,
+                        name=f"Product {n}",
+                        category=rng.choice(CATEGORIES),
+                        quantity=rng.choice([0, rng.randint(1, 9), rng.randint(10, 500)]),
+                        price=f"{rng.uniform(1, 2000):.2f}",
+                    ))
+                    if len(batch) >= options['batch_size']:
+                        Product.objects.bulk_create(batch)
+                        batch = []
+            Product.objects.bulk_create(batch)
+
+            # bulk_create skips the signal handlers that maintain the summary
+            for user in users:
+                summary.rebuild(user.pk)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Seeded {len(users)} users x {options['products']} products "
+            f"({prefix}0..{prefix}{len(users) - 1}, password {options['password']!r})."
+        ))
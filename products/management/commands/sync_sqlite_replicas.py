@@ -0,0 +1,40 @@
+import sqlite3
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = (
+        "Copy the SQLite primary onto the DB_REPLICAS files with SQLite's online "
+        "backup API, once or every --interval seconds. Stands in for replication "
+        "when trying the replica router locally."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--interval', type=float,
+                            help='Keep copying with this many seconds between rounds.')
+
+    def handle(self, *args, **options):
+        primary = settings.DATABASES['default']
+        if primary['ENGINE'] != 'django.db.backends.sqlite3':
+            raise CommandError("Only SQLite databases can be synced; use real replication for Postgres.")
+        if not settings.DATABASE_REPLICAS:
+            raise CommandError("No replicas configured; set DB_REPLICAS to one or more file paths.")
+
+        while True:
+            source = sqlite3.connect(primary['NAME'])
+            try:
+                for alias in settings.DATABASE_REPLICAS:
+                    target = sqlite3.connect(settings.DATABASES[alias]['NAME'])
+                    try:
+                        source.backup(target)
+                    finally:
+                        target.close()
+                    self.stdout.write(f"Copied {primary['NAME']} to {alias}.")
+            finally:
+                source.close()
+            if not options['interval']:
+                break
+            time.sleep(options['interval'])
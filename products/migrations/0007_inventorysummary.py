@@ -0,0 +1,66 @@
+# Generated by Django 5.2.18 on 2026-10-18 20:17
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, DecimalField, ExpressionWrapper, F, Q, Sum
+
+
+def build_summary(apps, schema_editor):
+    Product = apps.get_model('products', 'Product')
+    InventorySummary = apps.get_model('products', 'InventorySummary')
+    rows = (
+        Product.objects.order_by()
+        .values('user_id', 'category')
+        .annotate(
+            item_count=Count('id'),
+            total_value=Sum(ExpressionWrapper(
+                F('quantity') * F('price'),
+                output_field=DecimalField(max_digits=20, decimal_places=2),
+            )),
+            low_stock_count=Count('id', filter=Q(quantity__lt=10) & ~Q(quantity=0)),
+            out_of_stock_count=Count('id', filter=Q(quantity=0)),
+        )
+    )
+    InventorySummary.objects.bulk_create(
+        [
+            InventorySummary(
+                user_id=row['user_id'],
+                category=row['category'],
+                item_count=row['item_count'],
+                total_value=row['total_value'] or 0,
+                low_stock_count=row['low_stock_count'],
+                out_of_stock_count=row['out_of_stock_count'],
+            )
+            for row in rows.iterator()
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0006_product_lookup_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='InventorySummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('category', models.CharField(max_length=50)),
+                ('item_count', models.IntegerField(default=0)),
+                ('total_value', models.DecimalField(decimal_places=2, default=0, max_digits=20)),
+                ('low_stock_count', models.IntegerField(default=0)),
+                ('out_of_stock_count', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='inventory_summary', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('user', 'category'), name='products_summary_user_category_uniq')],
+            },
+        ),
+        migrations.RunPython(build_summary, migrations.RunPython.noop),
+    ]
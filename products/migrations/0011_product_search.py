@@ -0,0 +1,97 @@
+from django.db import migrations
+from django.db.utils import OperationalError
+
+# Kept in sync by triggers so bulk_create/bulk_update and queryset updates
+# are indexed too. Django rebuilds a SQLite table (dropping its triggers)
+# for some schema changes; a later migration that alters products_product
+# that way has to recreate them.
+SQLITE_FORWARDS = [
+    # Contentless: only the trigram index is stored, not a copy of the rows.
+    # ``owner`` holds '<user_id>' so a phrase match scopes results to a user.
+    """
+    CREATE VIRTUAL TABLE products_product_fts USING fts5(
+        name, category, owner, content='', tokenize='trigram'
+    )
+    """,
+    """
+    INSERT INTO products_product_fts (rowid, name, category, owner)
+    SELECT id, name, category, '<' || user_id || '>' FROM products_product
+    """,
+    """
+    CREATE TRIGGER products_product_fts_insert AFTER INSERT ON products_product BEGIN
+        INSERT INTO products_product_fts (rowid, name, category, owner)
+        VALUES (NEW.id, NEW.name, NEW.category, '<' || NEW.user_id || '>');
+    END
+    """,
+    """
+    CREATE TRIGGER products_product_fts_delete AFTER DELETE ON products_product BEGIN
+        INSERT INTO products_product_fts (products_product_fts, rowid, name, category, owner)
+        VALUES ('delete', OLD.id, OLD.name, OLD.category, '<' || OLD.user_id || '>');
+    END
+    """,
+    """
+    CREATE TRIGGER products_product_fts_update AFTER UPDATE OF name, category, user_id ON products_product
+    WHEN OLD.name IS NOT NEW.name OR OLD.category IS NOT NEW.category OR OLD.user_id IS NOT NEW.user_id
+    BEGIN
+        INSERT INTO products_product_fts (products_product_fts, rowid, name, category, owner)
+        VALUES ('delete', OLD.id, OLD.name, OLD.category, '<' || OLD.user_id || '>');
+        INSERT INTO products_product_fts (rowid, name, category, owner)
+        VALUES (NEW.id, NEW.name, NEW.category, '<' || NEW.user_id || '>');
+    END
+    """,
+]
+
+SQLITE_BACKWARDS = [
+    "DROP TRIGGER IF EXISTS products_product_fts_update",
+    "DROP TRIGGER IF EXISTS products_product_fts_delete",
+    "DROP TRIGGER IF EXISTS products_product_fts_insert",
+    "DROP TABLE IF EXISTS products_product_fts",
+]
+
+POSTGRES_FORWARDS = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX IF NOT EXISTS products_name_trgm_idx ON products_product USING gin (name gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS products_category_trgm_idx ON products_product USING gin (category gin_trgm_ops)",
+]
+
+POSTGRES_BACKWARDS = [
+    "DROP INDEX IF EXISTS products_category_trgm_idx",
+    "DROP INDEX IF EXISTS products_name_trgm_idx",
+]
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        try:
+            with schema_editor.connection.cursor() as cursor:
+                cursor.execute("CREATE VIRTUAL TABLE temp.products_fts_probe USING fts5(x, tokenize='trigram')")
+                cursor.execute("DROP TABLE temp.products_fts_probe")
+        except OperationalError:
+            # No FTS5 or a SQLite older than 3.34; search falls back to a scan
+            return
+        statements = SQLITE_FORWARDS
+    elif vendor == 'postgresql':
+        statements = POSTGRES_FORWARDS
+    else:
+        return
+    for sql in statements:
+        schema_editor.execute(sql)
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    statements = {'sqlite': SQLITE_BACKWARDS, 'postgresql': POSTGRES_BACKWARDS}.get(vendor, [])
+    for sql in statements:
+        schema_editor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0010_stock_history'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
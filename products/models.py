@@ -1,4 +1,6 @@
+import uuid
 from django.db import models
+from django.utils import timezone
 from django.contrib.auth.models import User
 
 # Create your models here.
@@ -15,6 +17,195 @@ class Product(models.Model):
     category = models.CharField(max_length=50)
     quantity = models.IntegerField()
     price = models.DecimalField(max_digits=10, decimal_places=2)
+    # Incremented on every write, for optimistic concurrency checks
+    version = models.PositiveIntegerField(default=1)
+
+    class Meta:
+        indexes = [
+            # Keyset pagination of the product list, filtered or ordered by
+            # category, quantity or price within a user's products
+            models.Index(fields=['user', 'category', 'id'], name='products_user_category_idx'),
+            models.Index(fields=['user', 'quantity', 'id'], name='products_user_quantity_idx'),
+            models.Index(fields=['user', 'price', 'id'], name='products_user_price_idx'),
+            models.Index(fields=['user', 'name'], name='products_user_name_idx'),
+            # The admin's category filter, across all users
+            models.Index(fields=['category', 'id'], name='products_category_idx'),
+            # Low/out-of-stock lookups only touch the small quantity < 10 slice;
+            # backends without partial index support skip this one.
+            models.Index(
+                fields=['user', 'quantity', 'name'],
+                condition=models.Q(quantity__lt=10),
+                name='products_user_low_stock_idx',
+            ),
+        ]
+
+    # Fields whose previous values the inventory summary needs on save
+    STOCK_FIELDS = ('user_id', 'category', 'quantity', 'price')
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_stock = {
+            name: value for name, value in zip(field_names, values)
+            if name in cls.STOCK_FIELDS
+        }
+        return instance
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding:
+            self.version += 1
+            update_fields = kwargs.get('update_fields')
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'version'}
+        super().save(*args, **kwargs)
+
+    def __str__(self):
+        return self.name
+
+class InventorySummary(models.Model):
+    """
+    Per-user, per-category inventory totals, kept in step with Product
+    writes by products.summary so reports never scan the product table.
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='inventory_summary')
+    category = models.CharField(max_length=50)
+    item_count = models.IntegerField(default=0)
+    total_value = models.DecimalField(max_digits=20, decimal_places=2, default=0)
+    low_stock_count = models.IntegerField(default=0)
+    out_of_stock_count = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'category'], name='products_summary_user_category_uniq'),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id}: {self.category}"
+
+class InventoryVersion(models.Model):
+    """
+    A per-user counter bumped in the same transaction as every product
+    write; drives ETags and the product response cache (products.versioning).
+    """
+    user = models.OneToOneField(
+        User, on_delete=models.CASCADE, primary_key=True, related_name='inventory_version'
+    )
+    version = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField()
+
+    def __str__(self):
+        return f"{self.user_id}: v{self.version}"
+
+class StockMovement(models.Model):
+    """
+    Append-only ledger of quantity changes, written by products.history in
+    the same transaction as the product write. Rows are never updated.
+    """
+    CREATE = 'create'
+    UPDATE = 'update'
+    DELETE = 'delete'
+    IMPORT = 'import'
+    BATCH = 'batch'
+    ADMIN = 'admin'
+    REASON_CHOICES = [
+        (CREATE, 'Created'),
+        (UPDATE, 'Updated'),
+        (DELETE, 'Deleted'),
+        (IMPORT, 'Bulk import'),
+        (BATCH, 'Batch update'),
+        (ADMIN, 'Admin action'),
+    ]
+
+    id = models.BigAutoField(primary_key=True)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='stock_movements')
+    # No FK constraint: the ledger outlives deleted products
+    product = models.ForeignKey(
+        Product, on_delete=models.DO_NOTHING, db_constraint=False, related_name='movements'
+    )
+    category = models.CharField(max_length=50)
+    delta = models.IntegerField()
+    quantity_after = models.IntegerField()
+    reason = models.CharField(max_length=10, choices=REASON_CHOICES)
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            # Time-range scans per user and per user/category
+            models.Index(fields=['user', 'created_at'], name='products_move_user_time_idx'),
+            models.Index(fields=['user', 'category', 'created_at'], name='products_move_cat_time_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.product_id}: {self.delta:+d} ({self.reason})"
+
+class StockSnapshot(models.Model):
+    """
+    Per-user, per-category movement totals for one day or week, rolled up
+    incrementally from StockMovement by ``manage.py rollup_stock_movements``.
+    The closing figures are copied from InventorySummary while the period
+    is still open.
+    """
+    DAY = 'day'
+    WEEK = 'week'
+    PERIOD_CHOICES = [(DAY, 'Day'), (WEEK, 'Week')]
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='stock_snapshots')
+    category = models.CharField(max_length=50)
+    period = models.CharField(max_length=4, choices=PERIOD_CHOICES)
+    period_start = models.DateField()
+    units_in = models.IntegerField(default=0)
+    units_out = models.IntegerField(default=0)
+    movements = models.IntegerField(default=0)
+    closing_item_count = models.IntegerField(null=True, blank=True)
+    closing_value = models.DecimalField(max_digits=20, decimal_places=2, null=True, blank=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'period', 'period_start', 'category'],
+                name='products_snapshot_period_uniq',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id}: {self.category} {self.period} {self.period_start}"
+
+class RollupCheckpoint(models.Model):
+    """Highest StockMovement id folded into the snapshots."""
+    name = models.CharField(max_length=50, primary_key=True)
+    last_movement_id = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.name}: {self.last_movement_id}"
+
+class InsightJob(models.Model):
+    PENDING = 'pending'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUS_CHOICES = [
+        (PENDING, 'Pending'),
+        (RUNNING, 'Running'),
+        (DONE, 'Done'),
+        (FAILED, 'Failed'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='insight_jobs')
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    result = models.JSONField(null=True, blank=True)
+    error = models.TextField(blank=True)
+    error_status = models.PositiveSmallIntegerField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            # The DB-backed worker polls for the oldest pending job
+            models.Index(fields=['status', 'created_at'], name='products_job_status_idx'),
+        ]
 
     def __str__(self):
-        return self.name
\ No newline at end of file
+        return f"{self.id} ({self.status})"
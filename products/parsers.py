@@ -0,0 +1,25 @@
+from rest_framework.parsers import BaseParser
+
+from .bulk import iter_csv_rows, iter_ndjson_rows
+
+
+class CSVStreamParser(BaseParser):
+    """
+    Parse a text/csv body lazily.
+
+    ``request.data`` becomes an iterator of ``(row, error)`` pairs that
+    reads the request stream line by line, so uploads are never held in
+    memory as a whole.
+    """
+    media_type = 'text/csv'
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        return iter_csv_rows(stream)
+
+
+class NDJSONStreamParser(BaseParser):
+    """Parse a newline-delimited JSON body lazily, one object per line."""
+    media_type = 'application/x-ndjson'
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        return iter_ndjson_rows(stream)
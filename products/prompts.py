@@ -0,0 +1,158 @@
+import logging
+
+from django.conf import settings
+
+from .history import TREND_WINDOW_DAYS
+from .stats import STOCK_LIST_LIMIT
+
+logger = logging.getLogger(__name__)
+
+# Bump whenever the prompt text changes so cached insights are not reused
+PROMPT_VERSION = '4'
+
+PROMPT_INTRO = (
+    "You are an AI inventory analyst. Based on the inventory data in the user message, generate insights in three sections: Summary, Trends, and Actions. "
+    "Provide concise, professional responses suitable for a dashboard.\n\n"
+)
+
+PROMPT_INSTRUCTIONS = (
+    "**Instructions**:\n"
+    "- Long lists in the data are cut to the most severe entries followed by 'and N more'; refer to the remaining count instead of inventing names.\n"
+    "- **Summary**: Provide a concise overview of the inventory in three distinct paragraphs, separated by double line breaks (use \n\n)."
+    "First paragraph: State the total number of items, number of distinct categories, and the total inventory value (e.g., 'The inventory includes 1,200 items across 8 categories, with a total value of $150,000'). Ensure figures are clear and precise, using approximate values if exact data is unavailable."
+    "Second paragraph: Identify the top categories by inventory share, including their percentages (e.g., 'Electronics (42%), Apparel (25%), and Home Goods (15%) dominate the inventory'). If percentages cannot be calculated due to missing data, briefly explain the limitation (e.g., 'Category percentages are unavailable due to incomplete sales data')."
+    f"Third paragraph: Compare with the previous period using only the 'Stock movement' figures from the data, prefixed with '🔄 Compared with the previous {TREND_WINDOW_DAYS} days' (e.g., '🔄 Compared with the previous {TREND_WINDOW_DAYS} days, Electronics stock fell by 35 units while Apparel grew by 12'). If the data says no movement history is recorded yet, state that instead. Never invent historical figures.\n"
+    "- **Trends**: Write three distinct paragraphs (use \\n\\n for paragraph breaks), identifying growth or decline patterns for products or categories from the stock movement figures and current quantities (e.g., units out exceeding units in, or low stock, suggest high demand). "
+    "First paragraph: Discuss demand patterns (e.g., 'Low stock levels of X suggest high demand'). "
+    "Second paragraph: Comment on inventory management (e.g., 'No out-of-stock items indicate effective inventory management'). "
+    "Third paragraph: Summarize how demand patterns and inventory management affect sales, customer experience, or operational efficiency (e.g., 'High demand for X, paired with strong inventory practices, likely boosts customer satisfaction by ensuring product availability'). Highlight any potential risks or opportunities, such as overstocking less popular items or scaling up stock for high-demand products."
+    "Fourth paragraph: End with a note like '📈 Trend analysis based on current data, with recommendations for improvement'.\n"
+    "- **Actions**: Provide recommendations in two sections with markdown formatting:\n"
+    "  - Start with '**❗ Out of Stock:**' followed by a markdown list (using '-') of out-of-stock items (e.g., '- Wireless Mouse').\n"
+    "  - Followed '**⚠️ Low on Stock:**' followed by a markdown list (using '-') of low stock items or items less than 10 (e.g., '- [8] Wireless Mouse').\n"
+    "  - Then add '**💡 Optimization Suggestions:**' Provide strategic suggestions to improve inventory management in a markdown list (using '-'). Base recommendations on trends, demand, or efficiency (e.g., '- Reduce desk lamp inventory by 15% due to seasonal demand decline', '- Increase stock of high-demand wireless keyboards by 10%').\n"
+    "  - Use \\n for line breaks between bullets and sections.\n"
+    "- Each section should be as detailed as possible.\n"
+    "- **Critical**: Return ONLY a valid JSON object with keys 'summary', 'trends', 'actions'. The values should be strings with markdown and emojis where specified. "
+    "Do not include any text outside the JSON. Ensure the JSON is parseable.\n\n"
+    "**Example Output**:\n"
+    "{\"summary\": \"Your inventory consists of 93 items across 5 categories, with a total value of $12,489.75.\\n\\nElectronics is your largest category (42%), followed by Home Office (28%) and Accessories (15%).\\n\\n"
+    f"🔄 Compared with the previous {TREND_WINDOW_DAYS} days, Electronics stock fell by 35 units while Home Office grew by 12.\", "
+    f"\"trends\": \"Electronics shipped 45 units in the last {TREND_WINDOW_DAYS} days against 10 received, twice the previous period's outflow, pointing to rising demand.\\n\\nAccessories movement was flat compared with the previous period.\\n\\n📈 Trend analysis based on the last {2 * TREND_WINDOW_DAYS} days of stock movements.\", "
+    "\"actions\": \"**❗ Out of Stock:**\\n- Wireless Mouse\\n- Ergonomic Keyboard\\n- Monitor Stand\\n**⚠️ Low on Stock:**\\n-[2] Wireless Keyboard\\n-[9] Wireless Earphones\\n**💡 Optimization Suggestions:**\\n- Consider bundling wireless peripherals for increased sales\\n- Reduce desk lamp inventory by 15% based on seasonal trends\"}\n\n"
+    "Now, generate the insights based on the provided data. Add more information on what each of the item category are mostly used for in Summary and ensure the output is concise and professional."
+    "Make at least 5 optimization suggestions."
+    "Make sure to include the emojis and markdown formatting as specified."
+    "Ensure that the Low on Stock displays the number of items in square brackets (e.g., -[2] Wireless Keyboard)."
+    "- **Important Note**: Ensure the JSON output is syntactically correct (e.g., proper brackets, quotes, commas). Do not include trailing commas, unclosed brackets, or any invalid JSON syntax. Double-check that the output can be parsed by a JSON parser without errors."
+    "Ensure that the JSON output will not return this error: Failed to generate insights error: Invalid JSON format in Groq response."
+)
+
+
+# Static across requests, so it goes first as the system message
+SYSTEM_PROMPT = PROMPT_INTRO + PROMPT_INSTRUCTIONS
+
+DATA_HEADER = "**Inventory Data**:\n"
+
+# Conservative average for BPE tokenizers on English text and product names
+CHARS_PER_TOKEN = 3
+# Role and framing tokens the chat format adds around each message
+MESSAGE_OVERHEAD_TOKENS = 4
+# Per-list caps tried in turn until the data fits the token budget;
+# None keeps every entry
+COMPACTION_LIMITS = (None, STOCK_LIST_LIMIT, 20, 10, 5, 0)
+
+
+def estimate_tokens(text):
+    """Upper-bound token estimate for ``text``, without a tokenizer."""
+    return -(-len(text.encode('utf-8')) // CHARS_PER_TOKEN)
+
+
+def _truncated_list(items, total, limit=None, noun='items'):
+    # Join the first ``limit`` names, noting how many were left out
+    shown = items if limit is None else items[:limit]
+    text = ', '.join(shown)
+    if total > len(shown):
+        more = total - len(shown)
+        text = f'{text}, and {more} more' if shown else f'{more} {noun}'
+    return text
+
+def format_movements(movements, limit=None):
+    """Render history.period_deltas() rows for the prompt."""
+    heading = f"Stock movement (last {TREND_WINDOW_DAYS} days vs previous {TREND_WINDOW_DAYS} days)"
+    if not movements:
+        return f"{heading}: no movement history recorded yet"
+    lines = [f"{heading}:"]
+    shown = movements if limit is None else movements[:limit]
+    for row in shown:
+        lines.append(
+            f"- {row['category']}: net {row['net']:+d} units (in {row['units_in']}, out {row['units_out']}), "
+            f"previous period net {row['previous_net']:+d}"
+        )
+    if not shown:
+        lines.append(f"- {len(movements)} categories changed")
+    elif len(movements) > len(shown):
+        lines.append(f"- and {len(movements) - len(shown)} more categories with smaller changes")
+    return '\n'.join(lines)
+
+def format_inventory_summary(stats, limit=None):
+    """
+    Render summary_stats() output as the data block of the prompt.
+
+    ``limit`` caps every list; the stats already order them by severity
+    (category size, lowest quantity, largest movement).
+    """
+    categories = [row['category'] for row in stats['categories']]
+    low_stock = _truncated_list(
+        [f'{name} ({quantity})' for name, quantity in stats['low_stock']],
+        stats['low_stock_count'],
+        limit,
+    )
+    out_of_stock = _truncated_list(stats['out_of_stock'], stats['out_of_stock_count'], limit)
+    summary = (
+        f"Total items: {stats['total_items']}\n"
+        f"Total value: ${stats['total_value']:.2f}\n"
+        f"Categories: {_truncated_list(categories, len(categories), limit, 'categories')}\n"
+        f"Low stock items (<=10): {low_stock or 'None'}\n"
+        f"Out of stock items: {out_of_stock or 'None'}"
+    )
+    if 'movements' in stats:
+        summary += '\n' + format_movements(stats['movements'], limit)
+    return summary
+
+
+def build_messages(inventory_summary):
+    return [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": DATA_HEADER + inventory_summary},
+    ]
+
+
+def prompt_tokens(messages):
+    """Estimated input tokens for chat ``messages``."""
+    return sum(estimate_tokens(message['content']) + MESSAGE_OVERHEAD_TOKENS for message in messages)
+
+
+def compact_inventory_summary(stats, budget=None):
+    """
+    Render ``stats`` with the longest lists that keep the whole prompt
+    within ``budget`` tokens (INSIGHTS_PROMPT_TOKEN_BUDGET by default).
+
+    The result depends only on ``stats`` and the budget, so it can be used
+    as a cache key.
+    """
+    budget = settings.INSIGHTS_PROMPT_TOKEN_BUDGET if budget is None else budget
+    available = budget - prompt_tokens(build_messages(''))
+    longest = max(len(stats['categories']), len(stats.get('movements', ())))
+    for limit in COMPACTION_LIMITS:
+        # Every listed entry costs at least a token; skip caps that cannot fit
+        if (longest if limit is None else min(longest, limit)) > max(available, 0):
+            continue
+        inventory_summary = format_inventory_summary(stats, limit)
+        if estimate_tokens(inventory_summary) <= available:
+            return inventory_summary
+    logger.warning(
+        "Inventory summary exceeds the prompt token budget",
+        extra={"budget": budget, "tokens": prompt_tokens(build_messages(inventory_summary))},
+    )
+    return inventory_summary
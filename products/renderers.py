@@ -0,0 +1,76 @@
+import json
+
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+
+try:
+    import orjson
+except ImportError:  # optional dependency
+    orjson = None
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer that encodes with orjson when it is installed.
+
+    Output matches JSONRenderer for the API's payloads: compact separators,
+    unescaped unicode, and DRF's encoder for the types orjson would format
+    differently (datetimes) or not at all (Decimal, lazy strings). Floats
+    can be spelled differently (orjson writes ``1e16`` where json writes
+    ``1e+16``). Data orjson refuses, such as ints wider than 64 bits, as
+    well as indented output and installs without orjson, go through the
+    standard renderer.
+    """
+    options = (orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME) if orjson else 0
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or data is None or self.get_indent(accepted_media_type, renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            ret = orjson.dumps(data, default=self.encoder_class().default, option=self.options)
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        # JSONRenderer escapes these two for JavaScript compatibility
+        if b'\xe2\x80\xa8' in ret or b'\xe2\x80\xa9' in ret:
+            ret = ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+        return ret
+
+
+class EventStreamRenderer(BaseRenderer):
+    """
+    Lets DRF content negotiation accept ``Accept: text/event-stream``.
+
+    Streaming views return a StreamingHttpResponse directly, so this renderer
+    only ever sees error payloads, which it sends as a single event.
+    """
+    media_type = 'text/event-stream'
+    format = 'event-stream'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return format_event('error', data).encode(self.charset)
+
+
+class CSVRenderer(BaseRenderer):
+    """
+    Selects CSV for the bulk export (``Accept: text/csv`` or ``?format=csv``).
+
+    The export itself is a StreamingHttpResponse; only error payloads are
+    rendered here.
+    """
+    media_type = 'text/csv'
+    format = 'csv'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return json.dumps(data, ensure_ascii=False).encode(self.charset)
+
+
+class NDJSONRenderer(CSVRenderer):
+    """Selects newline-delimited JSON for the bulk export."""
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+
+
+def format_event(event, data):
+    """Serialize one server-sent event."""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
@@ -0,0 +1,162 @@
+"""
+Ranked product search backed by a database index.
+
+SQLite uses the ``products_product_fts`` FTS5 table (trigram tokenizer),
+which triggers keep in sync with products_product; PostgreSQL uses pg_trgm
+GIN indexes on name and category. Both are created by migration 0011.
+Without either (another backend, or a SQLite build lacking FTS5) the
+search scans the user's rows with ``icontains``.
+"""
+
+import re
+from functools import lru_cache
+
+from django.db import connections, router
+from django.db.models import Q
+
+from .models import Product
+
+FTS_TABLE = 'products_product_fts'
+# Longer queries are rejected; they only add OR branches to the fuzzy match
+MAX_QUERY_LENGTH = 100
+# Trigram indexes cannot match anything shorter
+MIN_TERM_LENGTH = 3
+# Matches fetched from the index for ranking; bm25 would score every match
+# of each term across all users, which dominates on common terms
+CANDIDATE_LIMIT = 500
+# Fuzzy matches scoring below this are dropped
+SIMILARITY_THRESHOLD = 0.3
+
+WHITESPACE_RE = re.compile(r'\s+')
+WORD_RE = re.compile(r'\w+')
+
+
+def parse_terms(query):
+    """Split a search string into distinct, non-empty terms in order."""
+    return list(dict.fromkeys(term for term in WHITESPACE_RE.split(query.strip()) if term))
+
+
+@lru_cache(maxsize=10000)
+def _word_trigrams(word):
+    # pg_trgm's trigrams: the word padded with two leading spaces and one
+    # trailing space
+    padded = f'  {word} '
+    return frozenset(padded[i:i + 3] for i in range(len(padded) - 2))
+
+
+def _words(text):
+    return [_word_trigrams(word) for word in WORD_RE.findall(text.lower())]
+
+
+def _score(query_words, name):
+    name_words = _words(name)
+    if not query_words or not name_words:
+        return 0.0
+    return sum(
+        max(len(query_word & name_word) / len(query_word | name_word) for name_word in name_words)
+        for query_word in query_words
+    ) / len(query_words)
+
+
+def word_similarity(query, name):
+    """
+    Score in [0, 1] of how well ``name`` matches ``query``: the mean, over
+    the query's words, of the best trigram similarity to a word of ``name``.
+    """
+    return _score(_words(query), name)
+
+
+def _rank(rows, query, limit, threshold=0.0):
+    # ``rows`` are (id, name) pairs; best match first, ties by id
+    query_words = _words(query)
+    scored = [(_score(query_words, name), id) for id, name in rows]
+    scored.sort(key=lambda item: (-item[0], item[1]))
+    return [id for score, id in scored if score >= threshold][:limit]
+
+
+@lru_cache(maxsize=None)
+def _has_fts(alias, name):
+    # Keyed on the database name too, so a swapped-in test database is rechecked
+    return FTS_TABLE in connections[alias].introspection.table_names(include_views=False)
+
+
+def _phrase(text):
+    return '"' + text.replace('"', '""') + '"'
+
+
+def _trigrams(term):
+    return sorted({term[i:i + MIN_TERM_LENGTH] for i in range(len(term) - MIN_TERM_LENGTH + 1)})
+
+
+def _sqlite_search(connection, user_id, terms, limit):
+    owner = f"owner:{_phrase(f'<{user_id}>')}"
+    exact = ' AND '.join(f'{{name category}}:{_phrase(term)}' for term in terms)
+    # Any trigram of the query, so near misses and typos are still found
+    fuzzy = ' OR '.join(_phrase(gram) for term in terms for gram in _trigrams(term))
+    sql = (
+        "SELECT p.id, p.name FROM products_product p JOIN ("
+        f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s LIMIT %s"
+        ") matches ON matches.rowid = p.id"
+    )
+    query = ' '.join(terms)
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [f'{owner} AND ({exact})', CANDIDATE_LIMIT])
+        ids = _rank(cursor.fetchall(), query, limit)
+        if ids:
+            return ids
+        cursor.execute(sql, [f'{owner} AND {{name category}}:({fuzzy})', CANDIDATE_LIMIT])
+        return _rank(cursor.fetchall(), query, limit, SIMILARITY_THRESHOLD)
+
+
+def _like(term):
+    return '%' + term.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+
+
+def _postgres_search(connection, user_id, terms, limit):
+    # ILIKE and <% (word_similarity above pg_trgm.word_similarity_threshold)
+    # both use the GIN trigram indexes
+    matches = ' AND '.join(["(name ILIKE %s OR category ILIKE %s)"] * len(terms))
+    query = ' '.join(terms)
+    sql = (
+        "SELECT id FROM products_product "
+        f"WHERE user_id = %s AND (({matches}) OR %s <%% name) "
+        "ORDER BY word_similarity(%s, name) DESC, id LIMIT %s"
+    )
+    params = [user_id]
+    for term in terms:
+        params += [_like(term), _like(term)]
+    params += [query, query, limit]
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return [row[0] for row in cursor.fetchall()]
+
+
+def _scan_search(user_id, terms, limit):
+    condition = Q()
+    for term in terms:
+        condition &= Q(name__icontains=term) | Q(category__icontains=term)
+    rows = Product.objects.filter(condition, user_id=user_id).order_by().values_list('id', 'name')
+    return _rank(rows[:CANDIDATE_LIMIT], ' '.join(terms), limit)
+
+
+def search_product_ids(user_id, query, limit, using=None):
+    """
+    Return up to ``limit`` ids of ``user_id``'s products matching ``query``,
+    best match first.
+
+    Every whitespace-separated term must occur in the name or category;
+    matches are ranked by trigram similarity of the name to the query. When
+    nothing matches, the index backends fall back to similar names, which
+    catches typos.
+    """
+    terms = parse_terms(query)
+    if not terms:
+        return []
+    using = using or router.db_for_read(Product)
+    connection = connections[using]
+    indexable = all(len(term) >= MIN_TERM_LENGTH for term in terms)
+    if indexable and connection.vendor == 'sqlite' and _has_fts(using, connection.settings_dict['NAME']):
+        return _sqlite_search(connection, user_id, terms, limit)
+    if indexable and connection.vendor == 'postgresql':
+        return _postgres_search(connection, user_id, terms, limit)
+    return _scan_search(user_id, terms, limit)
@@ -1,8 +1,63 @@
 from rest_framework import serializers
-from .models import Product
+from inventory_backend.metrics import TimedListSerializer, TimedSerializerMixin
+from .models import InventorySummary, Product
 
-class ProductSerializer(serializers.ModelSerializer):
+class ProductSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     class Meta:
+        list_serializer_class = TimedListSerializer
         model = Product
-        fields = ['id', 'user', 'name', 'category', 'quantity', 'price']
-        read_only_fields = ['id', 'user']
\ No newline at end of file
+        fields = ['id', 'user', 'name', 'category', 'quantity', 'price', 'version']
+        read_only_fields = ['id', 'user', 'version']
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Sparse fieldsets: ?fields=id,name,quantity limits what reads return
+        fields = requested_fields(self.context.get('request'))
+        if fields:
+            for name in set(self.fields) - fields:
+                self.fields.pop(name)
+
+
+def requested_fields(request):
+    """Return the valid ``?fields=`` names for a read request, or None."""
+    if request is None or request.method not in ('GET', 'HEAD'):
+        return None
+    fields = request.query_params.get('fields')
+    if not fields:
+        return None
+    fields = set(fields.split(',')) & set(ProductSerializer.Meta.fields)
+    return fields or None
+
+
+# Model columns behind serializer fields whose names differ
+FIELD_COLUMNS = {'user': 'user_id'}
+
+
+def read_fields(request):
+    """The product fields a read returns, in ProductSerializer order."""
+    requested = requested_fields(request)
+    return [name for name in ProductSerializer.Meta.fields if not requested or name in requested]
+
+
+def product_rows(rows, fields):
+    """
+    Build ProductSerializer's output from ``values()`` rows.
+
+    Skips the per-field serializer machinery; prices are already quantized
+    to two places by the database converters, so ``str`` matches DRF's
+    DecimalField output.
+    """
+    columns = [FIELD_COLUMNS.get(name, name) for name in fields]
+    if 'price' not in fields:
+        return [{name: row[column] for name, column in zip(fields, columns)} for row in rows]
+    return [
+        {name: str(row[column]) if column == 'price' else row[column] for name, column in zip(fields, columns)}
+        for row in rows
+    ]
+
+
+class InventorySummarySerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    class Meta:
+        list_serializer_class = TimedListSerializer
+        model = InventorySummary
+        fields = ['category', 'item_count', 'total_value', 'low_stock_count', 'out_of_stock_count']
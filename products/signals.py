@@ -0,0 +1,94 @@
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models import QuerySet
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import Signal, receiver
+
+from inventory_backend.routers import pin_to_primary
+
+from . import history, insights_cache, summary, versioning
+from .models import Product, StockMovement
+
+# Sent with ``user_id`` once a change to that user's products is committed
+inventory_changed = Signal()
+
+
+def send_inventory_changed(user_id):
+    transaction.on_commit(
+        lambda: inventory_changed.send(sender=Product, user_id=user_id)
+    )
+
+
+def _stock(instance):
+    return (instance.user_id, instance.category, instance.quantity, instance.price)
+
+
+def _loaded_stock(instance):
+    # Stock as last read from or written to the database, if fully known
+    loaded = getattr(instance, '_loaded_stock', {})
+    if len(loaded) == len(Product.STOCK_FIELDS):
+        return tuple(loaded[name] for name in Product.STOCK_FIELDS)
+    return None
+
+
+@receiver(pre_save, sender=Product)
+def remember_previous_stock(sender, instance, raw=False, **kwargs):
+    instance._previous_stock = None
+    if raw or instance._state.adding:
+        return
+    instance._previous_stock = _loaded_stock(instance)
+    if instance._previous_stock is None:
+        # Deferred fields or an instance not loaded from the database
+        instance._previous_stock = (
+            Product.objects.filter(pk=instance.pk)
+            .values_list(*Product.STOCK_FIELDS)
+            .first()
+        )
+
+
+@receiver(post_save, sender=Product)
+def product_saved(sender, instance, created=False, raw=False, **kwargs):
+    if raw:
+        return
+    previous = getattr(instance, '_previous_stock', None)
+    summary.apply_changes(removed=[previous] if previous else [], added=[_stock(instance)])
+    history.record(
+        [(instance.pk, previous, _stock(instance))],
+        StockMovement.CREATE if created else StockMovement.UPDATE,
+    )
+    instance._loaded_stock = dict(zip(Product.STOCK_FIELDS, _stock(instance)))
+    user_ids = {instance.user_id}
+    if previous:
+        # Reassigning the owner changes the previous owner's inventory too
+        user_ids.add(previous[0])
+    for user_id in user_ids:
+        versioning.bump(user_id)
+        send_inventory_changed(user_id)
+
+
+def _deleting_users(origin):
+    # ``origin`` is the instance or queryset whose delete() started the cascade
+    model = origin.model if isinstance(origin, QuerySet) else type(origin)
+    return issubclass(model, User)
+
+
+@receiver(post_delete, sender=Product)
+def product_deleted(sender, instance, origin=None, **kwargs):
+    stock = _loaded_stock(instance) or _stock(instance)
+    summary.apply_changes(removed=[stock])
+    if not _deleting_users(origin):
+        # Skipped when the owners are being deleted, alone or through a
+        # queryset; their version rows and ledger go too
+        history.record([(instance.pk, stock, None)], StockMovement.DELETE)
+        versioning.bump(instance.user_id)
+    send_inventory_changed(instance.user_id)
+
+
+@receiver(inventory_changed)
+def invalidate_insights(sender, user_id, **kwargs):
+    insights_cache.invalidate(user_id)
+
+
+@receiver(inventory_changed)
+def pin_reads_to_primary(sender, user_id, **kwargs):
+    pin_to_primary(user_id)
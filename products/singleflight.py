@@ -0,0 +1,84 @@
+"""
+Coalescing of concurrent identical calls ("single flight").
+
+The first caller for a key becomes the leader and does the work; callers
+arriving while it runs wait on the leader's Future and get the same result
+or exception. This only spans one process; insights.py adds a cache lock
+on top so workers sharing the insights cache coalesce too.
+"""
+
+import asyncio
+import threading
+from concurrent.futures import Future, TimeoutError
+
+_calls = {}
+_lock = threading.Lock()
+
+
+class Abandoned(Exception):
+    """The leader gave up without a result; waiters should do the work themselves."""
+
+
+def join(key):
+    """
+    Return ``(future, leader)`` for ``key``.
+
+    The leader must call ``finish`` exactly once; everyone else waits on
+    ``future``.
+    """
+    with _lock:
+        future = _calls.get(key)
+        if future is not None:
+            return future, False
+        future = _calls[key] = Future()
+        return future, True
+
+
+def finish(key, future, result=None, error=None):
+    with _lock:
+        if _calls.get(key) is future:
+            del _calls[key]
+    if error is not None:
+        future.set_exception(error)
+    else:
+        future.set_result(result)
+
+
+def run(key, func, timeout=None):
+    """
+    Call ``func()`` once for all concurrent callers with the same ``key``.
+
+    Returns ``(result, leader)``. Waiters that time out, or whose leader
+    abandons the call, run ``func`` themselves.
+    """
+    future, leader = join(key)
+    if not leader:
+        try:
+            return future.result(timeout), False
+        except (Abandoned, TimeoutError):
+            return func(), True
+    try:
+        result = func()
+    except BaseException as e:
+        finish(key, future, error=e if isinstance(e, Exception) else Abandoned())
+        raise
+    finish(key, future, result)
+    return result, True
+
+
+async def arun(key, afunc, timeout=None):
+    """Async variant of run(); ``afunc`` is a coroutine function."""
+    future, leader = join(key)
+    if not leader:
+        try:
+            # shield() so a waiter timing out does not cancel the shared Future
+            return await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(future)), timeout), False
+        except (Abandoned, asyncio.TimeoutError):
+            return await afunc(), True
+    try:
+        result = await afunc()
+    except BaseException as e:
+        finish(key, future, error=e if isinstance(e, Exception) else Abandoned())
+        raise
+    finish(key, future, result)
+    return result, True
@@ -0,0 +1,73 @@
+from decimal import Decimal
+
+from django.db.models import Count, DecimalField, ExpressionWrapper, F, Q, Sum
+
+# Stock bands used by the insights and report endpoints
+LOW_STOCK_THRESHOLD = 10
+LOW_STOCK = Q(quantity__lt=LOW_STOCK_THRESHOLD) & ~Q(quantity=0)
+OUT_OF_STOCK = Q(quantity=0)
+
+# Max number of product names returned per stock band
+STOCK_LIST_LIMIT = 50
+
+STOCK_VALUE = ExpressionWrapper(
+    F('quantity') * F('price'),
+    output_field=DecimalField(max_digits=20, decimal_places=2),
+)
+
+
+def category_rows(products, group_by=('category',)):
+    return (
+        products.values(*group_by)
+        .annotate(
+            item_count=Count('id'),
+            total_value=Sum(STOCK_VALUE),
+            low_stock_count=Count('id', filter=LOW_STOCK),
+            out_of_stock_count=Count('id', filter=OUT_OF_STOCK),
+        )
+        .order_by('-item_count', 'category')
+    )
+
+
+def low_stock(products, list_limit):
+    return (
+        products.filter(LOW_STOCK)
+        .order_by('quantity', 'name')
+        .values_list('name', 'quantity')[:list_limit]
+    )
+
+
+def out_of_stock(products, list_limit):
+    return (
+        products.filter(OUT_OF_STOCK)
+        .order_by('name')
+        .values_list('name', flat=True)[:list_limit]
+    )
+
+
+def totals(rows):
+    categories = []
+    total_items = 0
+    total_value = Decimal('0')
+    low_stock_count = 0
+    out_of_stock_count = 0
+    for row in rows:
+        row['total_value'] = row['total_value'] or Decimal('0')
+        categories.append(row)
+        total_items += row['item_count']
+        total_value += row['total_value']
+        low_stock_count += row['low_stock_count']
+        out_of_stock_count += row['out_of_stock_count']
+
+    for row in categories:
+        row['share'] = row['item_count'] / total_items * 100
+
+    return {
+        'total_items': total_items,
+        'total_value': total_value,
+        'categories': categories,
+        'low_stock_count': low_stock_count,
+        'out_of_stock_count': out_of_stock_count,
+        'low_stock': [],
+        'out_of_stock': [],
+    }
@@ -0,0 +1,129 @@
+"""
+Maintenance of the materialized InventorySummary table.
+
+Product writes are folded in as deltas (the removed and added stock of each
+changed row) within the writing transaction; ``rebuild`` recomputes the
+table from the product rows when it needs to be brought back in sync.
+"""
+
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import IntegrityError, transaction
+from django.db.models import F
+
+from .models import InventorySummary, Product
+from .stats import (
+    LOW_STOCK_THRESHOLD, STOCK_LIST_LIMIT, category_rows, low_stock, out_of_stock, totals,
+)
+
+SUMMARY_FIELDS = ['item_count', 'total_value', 'low_stock_count', 'out_of_stock_count']
+
+
+def _contribution(quantity, price):
+    return {
+        'item_count': 1,
+        'total_value': quantity * price,
+        'low_stock_count': int(quantity < LOW_STOCK_THRESHOLD and quantity != 0),
+        'out_of_stock_count': int(quantity == 0),
+    }
+
+
+def apply_changes(removed=(), added=()):
+    """
+    Fold product changes into the summary.
+
+    ``removed`` and ``added`` are ``(user_id, category, quantity, price)``
+    tuples: the old state of updated/deleted rows and the new state of
+    created/updated rows.
+    """
+    deltas = defaultdict(lambda: dict.fromkeys(SUMMARY_FIELDS, 0))
+    for sign, rows in ((-1, removed), (1, added)):
+        for user_id, category, quantity, price in rows:
+            delta = deltas[(user_id, category)]
+            for field, value in _contribution(quantity, Decimal(price)).items():
+                delta[field] += sign * value
+
+    for (user_id, category), delta in deltas.items():
+        if any(delta.values()):
+            _apply_delta(user_id, category, delta)
+
+
+def _apply_delta(user_id, category, delta):
+    rows = InventorySummary.objects.filter(user_id=user_id, category=category)
+    updated = rows.update(**{field: F(field) + value for field, value in delta.items()})
+    if not updated:
+        if delta['item_count'] <= 0:
+            # Nothing to subtract from, e.g. the summary was already removed
+            # by a cascading user delete.
+            return
+        try:
+            with transaction.atomic():
+                InventorySummary.objects.create(user_id=user_id, category=category, **delta)
+        except IntegrityError:
+            # Created concurrently; fall back to the increment
+            rows.update(**{field: F(field) + value for field, value in delta.items()})
+    elif delta['item_count'] < 0:
+        rows.filter(item_count__lte=0).delete()
+
+
+def rebuild(user_id=None):
+    """Recompute the summary for one user, or for everyone."""
+    products = Product.objects.order_by()
+    summaries = InventorySummary.objects.all()
+    if user_id is not None:
+        products = products.filter(user_id=user_id)
+        summaries = summaries.filter(user_id=user_id)
+
+    rows = category_rows(products, group_by=('user_id', 'category')).order_by()
+    with transaction.atomic():
+        summaries.delete()
+        InventorySummary.objects.bulk_create(
+            [
+                InventorySummary(
+                    user_id=row['user_id'],
+                    category=row['category'],
+                    item_count=row['item_count'],
+                    total_value=row['total_value'] or 0,
+                    low_stock_count=row['low_stock_count'],
+                    out_of_stock_count=row['out_of_stock_count'],
+                )
+                for row in rows.iterator()
+            ],
+            batch_size=1000,
+        )
+
+
+def _summary_rows(user_id):
+    return (
+        InventorySummary.objects.filter(user_id=user_id)
+        .order_by('-item_count', 'category')
+        .values('category', *SUMMARY_FIELDS)
+    )
+
+
+def summary_stats(user_id, list_limit=STOCK_LIST_LIMIT):
+    """
+    Totals, per-category figures and stock-band counts for a user, read
+    from InventorySummary, plus up to ``list_limit`` low/out-of-stock names.
+
+    Cost is O(categories) plus the capped low/out-of-stock name lists.
+    """
+    stats = totals(list(_summary_rows(user_id)))
+    products = Product.objects.filter(user_id=user_id).order_by()
+    if stats['low_stock_count']:
+        stats['low_stock'] = list(low_stock(products, list_limit))
+    if stats['out_of_stock_count']:
+        stats['out_of_stock'] = list(out_of_stock(products, list_limit))
+    return stats
+
+
+async def asummary_stats(user_id, list_limit=STOCK_LIST_LIMIT):
+    """Async ORM variant of summary_stats()."""
+    stats = totals([row async for row in _summary_rows(user_id)])
+    products = Product.objects.filter(user_id=user_id).order_by()
+    if stats['low_stock_count']:
+        stats['low_stock'] = [row async for row in low_stock(products, list_limit)]
+    if stats['out_of_stock_count']:
+        stats['out_of_stock'] = [name async for name in out_of_stock(products, list_limit)]
+    return stats
@@ -1,3 +1,980 @@
-from django.test import TestCase
+import base64
+import json
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+from decimal import Decimal
+from io import StringIO
+from unittest import mock, skipUnless
+from urllib.parse import urlencode
 
-# Create your tests here.
+from django.contrib.auth.hashers import identify_hasher, make_password
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import CommandError, call_command
+from django.db import connection, connections
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils.translation import gettext_lazy
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from inventory_backend.routers import ReplicaRouter, is_pinned, replica_reads
+from users import passwords
+from users.tokens import UserRefreshToken
+
+from . import history, prompts, search, singleflight, summary
+from .fake_groq import DEFAULT_INSIGHTS, FakeGroqServer
+from .insights import generate_insights
+from .llm import GroqClient
+from .management.commands import loadtest
+from .models import InventorySummary, InventoryVersion, Product, StockMovement
+from .renderers import FastJSONRenderer
+from .serializers import ProductSerializer, product_rows
+
+
+def create_product(user, **fields):
+    values = {'name': 'Widget', 'category': 'Tools', 'quantity': 5, 'price': Decimal('2.00')}
+    values.update(fields)
+    return Product.objects.create(user=user, **values)
+
+
+def summary_rows(user):
+    return sorted(
+        InventorySummary.objects.filter(user=user).values_list(
+            'category', 'item_count', 'total_value', 'low_stock_count', 'out_of_stock_count'
+        )
+    )
+
+
+# A replica mirror is a separate connection that cannot see the test's
+# transaction; ReplicaMirrorTests covers the routing
+@override_settings(DATABASE_REPLICAS=[])
+class APITestCase(TestCase):
+    def setUp(self):
+        for cache in caches.all():
+            cache.clear()
+        self.user = User.objects.create_user('owner', password='pw')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+
+class UserDeleteTests(TestCase):
+    def setUp(self):
+        self.owners = [User.objects.create_user(f'owner{n}', password='pw') for n in range(2)]
+        self.other = User.objects.create_user('other', password='pw')
+        for user in [*self.owners, self.other]:
+            create_product(user)
+            create_product(user, category='Garden', quantity=0)
+
+    def assert_only_other_left(self):
+        self.assertFalse(Product.objects.exclude(user=self.other).exists())
+        self.assertFalse(InventorySummary.objects.exclude(user=self.other).exists())
+        self.assertFalse(InventoryVersion.objects.exclude(user=self.other).exists())
+        self.assertFalse(StockMovement.objects.exclude(user=self.other).exists())
+        self.assertEqual(Product.objects.filter(user=self.other).count(), 2)
+
+    def test_delete_one_user(self):
+        for user in self.owners:
+            user.delete()
+        self.assert_only_other_left()
+
+    def test_delete_users_through_queryset(self):
+        User.objects.filter(pk__in=[user.pk for user in self.owners]).delete()
+        self.assert_only_other_left()
+
+
+class ConditionalGetTests(APITestCase):
+    url = '/api/products/'
+
+    def setUp(self):
+        super().setUp()
+        self.product = create_product(self.user)
+
+    def test_unchanged_inventory_is_not_modified(self):
+        first = self.client.get(self.url)
+        self.assertEqual(first.status_code, 200)
+        etag = first['ETag']
+
+        second = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(second.status_code, 304)
+        self.assertEqual(second['ETag'], etag)
+
+    def test_write_changes_etag(self):
+        etag = self.client.get(self.url)['ETag']
+        create_product(self.user, name='Gadget')
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(len(response.data['results']), 2)
+
+    def test_etag_is_per_request(self):
+        etag = self.client.get(self.url)['ETag']
+        response = self.client.get(self.url, {'fields': 'id,name'}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_owner_change_changes_previous_owners_etag(self):
+        etag = self.client.get(self.url)['ETag']
+        self.product.user = User.objects.create_user('other', password='pw')
+        self.product.save()
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['results'], [])
+
+
+class StockMovementTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('owner', password='pw')
+
+    def movements(self, user):
+        return list(
+            StockMovement.objects.filter(user=user).order_by('id')
+            .values_list('reason', 'category', 'delta', 'quantity_after')
+        )
+
+    def test_writes_append_movements_and_bump_version(self):
+        product = create_product(self.user, quantity=4)
+        product.quantity = 10
+        product.save()
+        product.delete()
+        self.assertEqual(self.movements(self.user), [
+            ('create', 'Tools', 4, 4), ('update', 'Tools', 6, 10), ('delete', 'Tools', -10, 0),
+        ])
+        self.assertEqual(InventoryVersion.objects.get(user=self.user).version, 3)
+
+    def test_category_change_moves_stock_between_categories(self):
+        product = create_product(self.user, quantity=4)
+        product.category = 'Garden'
+        product.save()
+        self.assertEqual(self.movements(self.user), [
+            ('create', 'Tools', 4, 4), ('update', 'Tools', -4, 0), ('update', 'Garden', 4, 4),
+        ])
+
+    def test_owner_change_moves_stock_between_users(self):
+        other = User.objects.create_user('other', password='pw')
+        product = create_product(self.user, quantity=4)
+        product.user = other
+        product.save()
+        self.assertEqual(self.movements(self.user), [('create', 'Tools', 4, 4), ('update', 'Tools', -4, 0)])
+        self.assertEqual(self.movements(other), [('update', 'Tools', 4, 4)])
+
+
+class CursorPaginationTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        prices = ['3.00', '1.00', '2.00', '1.00', '3.00']
+        self.products = [create_product(self.user, name=f'P{n}', price=Decimal(price))
+                         for n, price in enumerate(prices)]
+
+    def collect(self, params, link='next'):
+        ids = []
+        response = self.client.get('/api/products/', params)
+        while True:
+            self.assertEqual(response.status_code, 200)
+            ids += [row['id'] for row in response.data['results']]
+            if not response.data[link]:
+                return ids
+            response = self.client.get(response.data[link])
+
+    def test_pages_cover_every_product_once(self):
+        self.assertEqual(self.collect({'page_size': 2}), [product.id for product in self.products])
+
+    def test_ordering_breaks_ties_on_id(self):
+        expected = sorted(self.products, key=lambda product: (-product.price, -product.id))
+        self.assertEqual(
+            self.collect({'page_size': 2, 'ordering': '-price'}), [product.id for product in expected]
+        )
+
+    def test_more_tied_rows_than_offset_cutoff(self):
+        Product.objects.bulk_create(
+            Product(user=self.user, name=f'Bulk{n}', category='Tools', quantity=5, price=Decimal('2.00'))
+            for n in range(1500)
+        )
+        products = Product.objects.filter(user=self.user)
+        for ordering in ['category', 'quantity', '-price']:
+            tiebreak = '-id' if ordering.startswith('-') else 'id'
+            expected = list(products.order_by(ordering, tiebreak).values_list('id', flat=True))
+            with self.subTest(ordering=ordering):
+                self.assertEqual(self.collect({'page_size': 100, 'ordering': ordering}), expected)
+
+    def test_previous_links_walk_back(self):
+        response = self.client.get('/api/products/', {'page_size': 2, 'ordering': 'price'})
+        while response.data['next']:
+            response = self.client.get(response.data['next'])
+        ids = [row['id'] for row in response.data['results']]
+        while response.data['previous']:
+            response = self.client.get(response.data['previous'])
+            ids = [row['id'] for row in response.data['results']] + ids
+        expected = sorted(self.products, key=lambda product: (product.price, product.id))
+        self.assertEqual(ids, [product.id for product in expected])
+
+    def test_invalid_cursor_is_not_found(self):
+        for position in ['1', '["1", "2"]', '["x"]']:
+            cursor = base64.b64encode(urlencode({'p': position}).encode()).decode()
+            with self.subTest(position=position):
+                response = self.client.get('/api/products/', {'cursor': cursor})
+                self.assertEqual(response.status_code, 404)
+
+    def test_other_users_products_are_not_listed(self):
+        create_product(User.objects.create_user('other', password='pw'))
+        self.assertEqual(len(self.collect({'page_size': 2})), len(self.products))
+
+
+class BatchUpdateTests(APITestCase):
+    url = '/api/products/batch/'
+
+    def setUp(self):
+        super().setUp()
+        self.first = create_product(self.user, quantity=10)
+        self.second = create_product(self.user, name='Gadget', quantity=1)
+
+    def quantities(self):
+        return list(Product.objects.order_by('id').values_list('quantity', flat=True))
+
+    def test_commits_all_items(self):
+        response = self.client.patch(self.url, [
+            {'id': self.first.id, 'quantity_delta': -4},
+            {'id': self.second.id, 'fields': {'name': 'Gizmo'}, 'version': self.second.version},
+        ], format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([result['status'] for result in response.data['results']], ['ok', 'ok'])
+        self.assertEqual(self.quantities(), [6, 1])
+        self.assertEqual(Product.objects.get(id=self.second.id).name, 'Gizmo')
+        self.assertEqual(
+            list(InventorySummary.objects.filter(user=self.user).values_list('item_count', 'total_value')),
+            [(2, Decimal('14.00'))],
+        )
+
+    def test_missing_product_rolls_back_batch(self):
+        response = self.client.patch(self.url, [
+            {'id': self.first.id, 'quantity_delta': -4},
+            {'id': 999999, 'quantity_delta': 1},
+        ], format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertTrue(response.data['rolled_back'])
+        self.assertEqual(
+            [result['status'] for result in response.data['results']], ['rolled_back', 'not_found']
+        )
+        self.assertEqual(self.quantities(), [10, 1])
+
+    def test_stale_version_conflicts(self):
+        response = self.client.patch(self.url, [
+            {'id': self.first.id, 'quantity_delta': 5},
+            {'id': self.second.id, 'fields': {'quantity': 7}, 'version': self.second.version - 1},
+        ], format='json')
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.data['results'][1], {
+            'id': self.second.id, 'status': 'conflict', 'current_version': self.second.version,
+        })
+        self.assertEqual(self.quantities(), [10, 1])
+
+    def test_malformed_items_are_invalid(self):
+        items = [
+            {'id': 2 ** 70, 'quantity_delta': 1},
+            {'id': self.first.id, 'quantity_delta': 2 ** 70},
+            {'id': self.first.id, 'quantity_delta': True},
+            {'id': self.first.id, 'fields': {'name': 'Gizmo'}, 'version': True},
+            {'id': self.first.id, 'fields': {'name': 'Gizmo'}, 'version': 2 ** 70},
+        ]
+        for item in items:
+            with self.subTest(item=item):
+                response = self.client.patch(self.url, [item], format='json')
+                self.assertEqual(response.status_code, 400)
+                self.assertEqual(response.data['results'][0]['status'], 'invalid')
+        self.assertEqual(self.quantities(), [10, 1])
+
+    def test_resulting_quantity_out_of_range_rolls_back_batch(self):
+        Product.objects.filter(id=self.second.id).update(quantity=2 ** 63 - 10)
+        for delta in [-16, 20]:
+            with self.subTest(delta=delta):
+                response = self.client.patch(self.url, [
+                    {'id': self.first.id, 'quantity_delta': 5},
+                    {'id': self.first.id if delta < 0 else self.second.id, 'quantity_delta': delta},
+                ], format='json')
+                self.assertEqual(response.status_code, 400)
+                self.assertEqual(
+                    [result['status'] for result in response.data['results']], ['rolled_back', 'invalid']
+                )
+                self.assertIn('quantity_delta', response.data['results'][1]['errors'])
+        self.assertEqual(self.quantities(), [10, 2 ** 63 - 10])
+
+
+class SummaryTests(APITestCase):
+    def assert_matches_rebuild(self):
+        incremental = summary_rows(self.user)
+        summary.rebuild(self.user.id)
+        self.assertEqual(incremental, summary_rows(self.user))
+
+    def test_writes_keep_summary_in_step(self):
+        hammer = create_product(self.user, name='Hammer', quantity=20, price=Decimal('9.50'))
+        create_product(self.user, name='Rake', category='Garden', quantity=3)
+        self.assertEqual(summary_rows(self.user), [
+            ('Garden', 1, Decimal('6.00'), 1, 0),
+            ('Tools', 1, Decimal('190.00'), 0, 0),
+        ])
+
+        hammer.quantity = 0
+        hammer.save()
+        self.assertEqual(summary_rows(self.user)[1], ('Tools', 1, Decimal('0.00'), 0, 1))
+
+        hammer.category = 'Garden'
+        hammer.save()
+        self.assertEqual(summary_rows(self.user), [('Garden', 2, Decimal('6.00'), 1, 1)])
+
+        hammer.delete()
+        self.assertEqual(summary_rows(self.user), [('Garden', 1, Decimal('6.00'), 1, 0)])
+        self.assert_matches_rebuild()
+
+    def test_owner_change_moves_summary(self):
+        other = User.objects.create_user('other', password='pw')
+        product = create_product(self.user)
+        product.user = other
+        product.save()
+        self.assertEqual(summary_rows(self.user), [])
+        self.assertEqual(summary_rows(other), [('Tools', 1, Decimal('10.00'), 1, 0)])
+
+    def test_report(self):
+        create_product(self.user, name='Hammer', quantity=20, price=Decimal('9.50'))
+        create_product(self.user, name='Saw', quantity=0)
+        create_product(self.user, name='Rake', category='Garden', quantity=3)
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/summary/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data, {
+            'total_items': 3,
+            'total_value': '196.00',
+            'low_stock_count': 1,
+            'out_of_stock_count': 1,
+            'categories': [
+                {'category': 'Tools', 'item_count': 2, 'total_value': '190.00',
+                 'low_stock_count': 0, 'out_of_stock_count': 1, 'share': 66.67},
+                {'category': 'Garden', 'item_count': 1, 'total_value': '6.00',
+                 'low_stock_count': 1, 'out_of_stock_count': 0, 'share': 33.33},
+            ],
+        })
+
+
+@override_settings(DATABASE_REPLICAS=[])
+class StatelessAuthenticationTests(TestCase):
+    url = '/api/products/'
+
+    def setUp(self):
+        for cache in caches.all():
+            cache.clear()
+        self.user = User.objects.create_user('owner', password='pw')
+        create_product(self.user)
+
+    def get(self, token):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(self.url)
+        self.assertFalse([query for query in queries if 'auth_user' in query['sql']])
+        return response
+
+    def test_reads_run_no_user_query(self):
+        response = self.get(UserRefreshToken.for_user(self.user).access_token)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['results']), 1)
+
+    def test_inactive_user_is_refused(self):
+        token = UserRefreshToken.for_user(self.user).access_token
+        token['is_active'] = False
+        response = self.get(token)
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(response.data['code'], 'user_inactive')
+
+    def test_token_without_user_claims(self):
+        # Issued before the username and is_active claims were added
+        response = self.get(AccessToken.for_user(self.user))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['results']), 1)
+
+    def test_token_of_deleted_user_sees_no_products(self):
+        token = UserRefreshToken.for_user(self.user).access_token
+        self.user.delete()
+        response = self.get(token)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['results'], [])
+
+
+class BulkTests(APITestCase):
+    url = '/api/products/bulk/'
+
+    def post(self, body, content_type, **params):
+        url = self.url + (f'?{urlencode(params)}' if params else '')
+        return self.client.generic('POST', url, body, content_type=content_type)
+
+    def products(self):
+        return list(Product.objects.filter(user=self.user).order_by('id').values_list('name', 'quantity', 'price'))
+
+    def test_csv_import_reports_row_errors(self):
+        existing = create_product(self.user)
+        body = (
+            '\ufeffid,name,category,quantity,price\n'
+            f'{existing.id},Widget,Tools,8,2.50\n'
+            ',Gadget,Tools,3,1.00\n'
+            ',Broken,Tools,many,1.00\n'
+            '999999,Missing,Tools,1,1.00\n'
+        ).encode('utf-8')
+        response = self.post(body, 'text/csv', batch_size=2)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            {key: response.data[key] for key in ('created', 'updated', 'failed')},
+            {'created': 1, 'updated': 1, 'failed': 2},
+        )
+        self.assertEqual([error['row'] for error in response.data['errors']], [3, 4])
+        self.assertIn('quantity', response.data['errors'][0]['errors'])
+        self.assertEqual(self.products(), [
+            ('Widget', 8, Decimal('2.50')), ('Gadget', 3, Decimal('1.00')),
+        ])
+        self.assertEqual(summary_rows(self.user), [('Tools', 2, Decimal('23.00'), 2, 0)])
+
+    def test_ndjson_import_reports_row_errors(self):
+        body = '\n'.join([
+            json.dumps({'name': 'Gadget', 'category': 'Tools', 'quantity': 3, 'price': '1.00'}),
+            '{not json',
+            '[1, 2]',
+            '',
+            json.dumps({'name': 'Rake', 'category': 'Garden', 'quantity': 0, 'price': '4.00'}),
+        ]).encode('utf-8-sig')
+        response = self.post(body, 'application/x-ndjson')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((response.data['created'], response.data['failed']), (2, 2))
+        self.assertEqual([error['row'] for error in response.data['errors']], [2, 3])
+        self.assertEqual(summary_rows(self.user), [
+            ('Garden', 1, Decimal('0.00'), 0, 1), ('Tools', 1, Decimal('3.00'), 1, 0),
+        ])
+
+    @override_settings(PRODUCT_BULK_MAX_BATCH_SIZE=100)
+    def test_batch_size_bounds(self):
+        body = b'name,category,quantity,price\nGadget,Tools,3,1.00\n'
+        for batch_size in ['0', '101', 'many']:
+            with self.subTest(batch_size=batch_size):
+                response = self.post(body, 'text/csv', batch_size=batch_size)
+                self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.post(body, 'text/csv', batch_size=100).status_code, 200)
+        self.assertEqual(len(self.products()), 1)
+
+    def test_multipart_upload(self):
+        uploads = [
+            SimpleUploadedFile('products.csv', b'\xef\xbb\xbfname,category,quantity,price\nGadget,Tools,3,1.00\n'),
+            SimpleUploadedFile('products.ndjson', b'{"name": "Rake", "category": "Garden", "quantity": 2, "price": "4.00"}\n'),
+        ]
+        for upload in uploads:
+            response = self.client.post(self.url, {'file': upload}, format='multipart')
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.data['created'], 1)
+        self.assertEqual(self.products(), [('Gadget', 3, Decimal('1.00')), ('Rake', 2, Decimal('4.00'))])
+
+    def test_body_that_is_not_csv_or_ndjson(self):
+        response = self.client.post(self.url, {'name': 'Gadget'}, format='json')
+        self.assertEqual(response.status_code, 415)
+
+    @override_settings(PRODUCT_EXPORT_CHUNK_SIZE=2)
+    def test_streamed_export(self):
+        products = [create_product(self.user, name=f'P{n}', price=Decimal('1.50')) for n in range(3)]
+        create_product(User.objects.create_user('other', password='pw'))
+
+        response = self.client.get(self.url, HTTP_ACCEPT='application/x-ndjson')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        rows = [json.loads(line) for line in b''.join(response.streaming_content).decode().splitlines()]
+        self.assertEqual(rows, [
+            {'id': product.id, 'name': product.name, 'category': 'Tools', 'quantity': 5, 'price': '1.50'}
+            for product in products
+        ])
+
+        response = self.client.get(self.url, {'format': 'csv'})
+        self.assertEqual(response['Content-Type'], 'text/csv; charset=utf-8')
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(lines[0], 'id,name,category,quantity,price')
+        self.assertEqual(lines[1:], [f'{product.id},{product.name},Tools,5,1.50' for product in products])
+
+
+class FastSerializationTests(APITestCase):
+    url = '/api/products/'
+
+    def setUp(self):
+        super().setUp()
+        for name, price in [('Widget', '0.10'), ('Caf\u00e9 \u2028', '12345678.90'), ('Bolt', '5')]:
+            create_product(self.user, name=name, price=Decimal(price))
+
+    def serialized(self, fields=ProductSerializer.Meta.fields):
+        products = Product.objects.filter(user=self.user).order_by('id')
+        rows = ProductSerializer(products, many=True).data
+        return [{name: row[name] for name in ProductSerializer.Meta.fields if name in fields} for row in rows]
+
+    def assert_same_rows(self, actual, expected):
+        self.assertEqual(actual, expected)
+        self.assertEqual([list(row) for row in actual], [list(row) for row in expected])
+
+    def test_product_rows_match_serializer(self):
+        for fields in [ProductSerializer.Meta.fields, ['id', 'price'], ['user', 'name']]:
+            with self.subTest(fields=fields):
+                rows = Product.objects.filter(user=self.user).order_by('id').values(
+                    'id', 'user_id', 'name', 'category', 'quantity', 'price', 'version'
+                )
+                self.assert_same_rows(product_rows(rows, fields), self.serialized(fields))
+
+    def test_list_matches_serializer(self):
+        for fields in [None, 'id,price', 'price,user,bogus']:
+            with self.subTest(fields=fields):
+                response = self.client.get(self.url, {'fields': fields} if fields else {})
+                expected = self.serialized(fields.split(',') if fields else ProductSerializer.Meta.fields)
+                self.assert_same_rows(json.loads(response.content)['results'], expected)
+
+    def test_fast_renderer_matches_drf_renderer(self):
+        payloads = [
+            {'results': self.serialized(), 'next': None},
+            {'price': Decimal('12345678.90'), 'name': 'Caf\u00e9 \u2028\u2029', 'lazy': gettext_lazy('Invalid cursor')},
+            {'at': datetime(2026, 1, 2, 3, 4, 5, 678901, tzinfo=timezone.utc), 1: 'int key'},
+            {'wide': 2 ** 70, 'items': [1, True, None]},
+        ]
+        for data in payloads:
+            with self.subTest(data=data):
+                self.assertEqual(FastJSONRenderer().render(data), JSONRenderer().render(data))
+
+
+@override_settings(PASSWORD_PBKDF2_ITERATIONS=1000, PASSWORD_HASH_CONCURRENCY=1, PASSWORD_HASH_QUEUE_TIMEOUT=0)
+class PasswordViewTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        # Slots are sized from the settings on first use
+        patcher = mock.patch.object(passwords, '_slots', None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def register(self, username='owner'):
+        return self.client.post(
+            '/api/register/', {'username': username, 'password': 'secret', 'email': 'a@example.com'}, format='json'
+        )
+
+    def login(self, password='secret'):
+        return self.client.post('/api/login/', {'username': 'owner', 'password': password}, format='json')
+
+    def iterations(self):
+        return int(User.objects.get(username='owner').password.split('$')[1])
+
+    def test_register_and_login(self):
+        response = self.register()
+        self.assertEqual(response.status_code, 201)
+        self.assertIn('access', response.data)
+        self.assertTrue(User.objects.get(username='owner').check_password('secret'))
+
+        response = self.login()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(set(response.data), {'access', 'refresh'})
+        self.assertEqual(self.login('wrong').status_code, 401)
+
+    def test_register_requires_all_fields(self):
+        response = self.client.post('/api/register/', {'username': 'owner', 'password': 'secret'}, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(User.objects.exists())
+
+    def test_duplicate_username(self):
+        self.register()
+        # The unique constraint, not a prior lookup, refuses the second one
+        response = self.register()
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data, {'error': 'Username already exists'})
+        self.assertEqual(User.objects.count(), 1)
+
+    def test_unknown_and_inactive_users_cannot_log_in(self):
+        self.assertEqual(self.login().status_code, 401)
+        self.register()
+        User.objects.filter(username='owner').update(is_active=False)
+        self.assertEqual(self.login().status_code, 401)
+
+    def test_saturated_hashing_sheds_load(self):
+        self.register()
+        slots = passwords.get_slots()
+        slots.acquire()
+        try:
+            for response in [self.login(), self.register('other')]:
+                self.assertEqual(response.status_code, 503)
+                self.assertEqual(response['Retry-After'], '1')
+        finally:
+            slots.release()
+        self.assertEqual(self.login().status_code, 200)
+
+    def test_login_upgrades_outdated_hash(self):
+        self.register()
+        self.assertEqual(self.iterations(), 1000)
+        with self.settings(PASSWORD_PBKDF2_ITERATIONS=2000):
+            self.assertEqual(self.login().status_code, 200)
+            self.assertEqual(self.iterations(), 2000)
+        user = User.objects.get(username='owner')
+        user.password = make_password('secret', hasher='pbkdf2_sha1')
+        user.save()
+        self.assertEqual(self.login().status_code, 200)
+        self.assertEqual(identify_hasher(User.objects.get(username='owner').password).algorithm, 'pbkdf2_sha256')
+
+
+@override_settings(DATABASE_REPLICAS=['replica1', 'replica2'], DB_REPLICA_STICKY_SECONDS=10)
+class ReplicaRouterTests(TestCase):
+    def setUp(self):
+        for cache in caches.all():
+            cache.clear()
+        self.user = User.objects.create_user('owner', password='pw')
+        self.router = ReplicaRouter()
+
+    def test_reads_in_replica_block_use_one_replica(self):
+        self.assertEqual(self.router.db_for_read(Product), 'default')
+        with replica_reads(self.user.id) as alias:
+            self.assertIn(alias, settings.DATABASE_REPLICAS)
+            self.assertEqual(self.router.db_for_read(Product), alias)
+            self.assertEqual(self.router.db_for_read(InventoryVersion), alias)
+            self.assertEqual(self.router.db_for_write(Product), 'default')
+        self.assertEqual(self.router.db_for_read(Product), 'default')
+
+    def test_write_pins_owner_to_primary_until_window_ends(self):
+        other = User.objects.create_user('other', password='pw')
+        with self.captureOnCommitCallbacks(execute=True):
+            create_product(self.user)
+        self.assertTrue(is_pinned(self.user.id))
+        with replica_reads(self.user.id) as alias:
+            self.assertIsNone(alias)
+            self.assertEqual(self.router.db_for_read(Product), 'default')
+        with replica_reads(other.id) as alias:
+            self.assertIn(alias, settings.DATABASE_REPLICAS)
+
+        with mock.patch('time.time', return_value=time.time() + 11):
+            self.assertFalse(is_pinned(self.user.id))
+            with replica_reads(self.user.id) as alias:
+                self.assertIn(alias, settings.DATABASE_REPLICAS)
+
+    def test_no_pin_without_replicas(self):
+        with self.settings(DATABASE_REPLICAS=[]):
+            with self.captureOnCommitCallbacks(execute=True):
+                create_product(self.user)
+            self.assertFalse(is_pinned(self.user.id))
+            with replica_reads(self.user.id) as alias:
+                self.assertIsNone(alias)
+
+
+@skipUnless(
+    'replica1' in settings.DATABASES,
+    "Set DB_REPLICAS (and a shared DB_REPLICA_PIN_CACHE) to run against a test mirror",
+)
+class ReplicaMirrorTests(TransactionTestCase):
+    """Queries through the replica1 alias, a TEST MIRROR of the primary."""
+    databases = '__all__'
+    url = '/api/products/'
+
+    def setUp(self):
+        for cache in caches.all():
+            cache.clear()
+        self.user = User.objects.create_user('owner', password='pw')
+        create_product(self.user)
+        caches[settings.DB_REPLICA_PIN_CACHE].clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def request(self, method, *args, **kwargs):
+        with CaptureQueriesContext(connections['default']) as primary, \
+                CaptureQueriesContext(connections['replica1']) as replica:
+            response = getattr(self.client, method)(*args, **kwargs)
+        return response, len(primary), len(replica)
+
+    @override_settings(DATABASE_REPLICAS=['replica1'])
+    def test_reads_go_to_replica_and_writes_pin_primary(self):
+        response, primary, replica = self.request('get', self.url)
+        self.assertEqual(len(response.data['results']), 1)
+        self.assertEqual(primary, 0)
+        self.assertGreater(replica, 0)
+
+        response, primary, replica = self.request(
+            'post', self.url, {'name': 'Gadget', 'category': 'Tools', 'quantity': 1, 'price': '1.00'}, format='json'
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertGreater(primary, 0)
+        self.assertEqual(replica, 0)
+
+        # The writer reads its own write from the primary until the pin expires
+        response, primary, replica = self.request('get', self.url)
+        self.assertEqual(len(response.data['results']), 2)
+        self.assertGreater(primary, 0)
+        self.assertEqual(replica, 0)
+
+        with mock.patch('time.time', return_value=time.time() + settings.DB_REPLICA_STICKY_SECONDS + 1):
+            response, primary, replica = self.request('get', self.url)
+        self.assertEqual(primary, 0)
+        self.assertGreater(replica, 0)
+
+
+class PromptBudgetTests(TestCase):
+    def setUp(self):
+        self.stats = {
+            'total_items': 900,
+            'total_value': Decimal('12345.60'),
+            'categories': [{'category': f'Category {n}'} for n in range(30)],
+            'low_stock': [(f'Low {n}', 1 + n % 9) for n in range(50)],
+            'low_stock_count': 80,
+            'out_of_stock': [f'Empty {n}' for n in range(50)],
+            'out_of_stock_count': 70,
+            'movements': [
+                {'category': f'Category {n}', 'net': -n, 'units_in': n, 'units_out': 2 * n, 'previous_net': 0}
+                for n in range(30)
+            ],
+        }
+
+    def budget_for(self, limit):
+        return prompts.prompt_tokens(prompts.build_messages(prompts.format_inventory_summary(self.stats, limit)))
+
+    def test_lists_shrink_step_by_step_to_fit_budget(self):
+        for limit in prompts.COMPACTION_LIMITS:
+            with self.subTest(limit=limit):
+                # The header and data are estimated apart, which may round up once
+                budget = self.budget_for(limit) + 1
+                text = prompts.compact_inventory_summary(self.stats, budget)
+                self.assertEqual(text, prompts.format_inventory_summary(self.stats, limit))
+                self.assertLessEqual(prompts.prompt_tokens(prompts.build_messages(text)), budget)
+
+    def test_budget_too_small_logs_and_sends_counts_only(self):
+        with self.assertLogs('products.prompts', 'WARNING'):
+            text = prompts.compact_inventory_summary(self.stats, self.budget_for(0) - 1)
+        self.assertEqual(text, prompts.format_inventory_summary(self.stats, 0))
+
+    def test_truncated_lists_count_what_was_left_out(self):
+        text = prompts.format_inventory_summary(self.stats, 5)
+        self.assertIn('Categories: Category 0, Category 1, Category 2, Category 3, Category 4, and 25 more\n', text)
+        self.assertIn('Low stock items (<=10): Low 0 (1), Low 1 (2), Low 2 (3), Low 3 (4), Low 4 (5), and 75 more\n', text)
+        self.assertIn('Out of stock items: Empty 0, Empty 1, Empty 2, Empty 3, Empty 4, and 65 more\n', text)
+        self.assertTrue(text.endswith('- and 25 more categories with smaller changes'))
+
+        text = prompts.format_inventory_summary(self.stats, 0)
+        self.assertIn('Categories: 30 categories\n', text)
+        self.assertIn('Low stock items (<=10): 80 items\n', text)
+        self.assertTrue(text.endswith('- 30 categories changed'))
+
+        # The capped lists from summary_stats still say how many were left out
+        self.assertIn('Empty 49, and 20 more', prompts.format_inventory_summary(self.stats))
+
+    def test_movement_window_follows_trend_window(self):
+        days = history.TREND_WINDOW_DAYS
+        heading = f'Stock movement (last {days} days vs previous {days} days)'
+        self.assertTrue(prompts.format_movements([]).startswith(heading))
+        self.assertIn(f'previous {days} days', prompts.SYSTEM_PROMPT)
+
+
+class SearchTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        if not search._has_fts('default', connection.settings_dict['NAME']):
+            self.skipTest("SQLite without FTS5 trigram support")
+
+    def search(self, query, user=None):
+        return search.search_product_ids((user or self.user).id, query, limit=10)
+
+    def test_index_follows_inserts_updates_and_deletes(self):
+        hammer = create_product(self.user, name='Claw Hammer')
+        self.assertEqual(self.search('hamm'), [hammer.id])
+
+        hammer.name = 'Mallet'
+        hammer.save()
+        self.assertEqual(self.search('hamm'), [])
+        self.assertEqual(self.search('mallet'), [hammer.id])
+
+        hammer.category = 'Carpentry'
+        hammer.save()
+        self.assertEqual(self.search('tools'), [])
+        self.assertEqual(self.search('carpentry'), [hammer.id])
+
+        other = User.objects.create_user('other')
+        hammer.user = other
+        hammer.save()
+        self.assertEqual(self.search('mallet'), [])
+        self.assertEqual(self.search('mallet', other), [hammer.id])
+
+        hammer.delete()
+        self.assertEqual(self.search('mallet', other), [])
+
+    def test_bulk_writes_are_indexed(self):
+        products = Product.objects.bulk_create([
+            Product(user=self.user, name=f'Socket {n}', category='Tools', quantity=1, price=1) for n in range(3)
+        ])
+        self.assertEqual(sorted(self.search('socket')), sorted(product.id for product in products))
+        Product.objects.filter(user=self.user).update(name='Wrench')
+        self.assertEqual(self.search('socket'), [])
+        self.assertEqual(len(self.search('wrench')), 3)
+
+    def test_best_match_first(self):
+        drilling = create_product(self.user, name='Drilling Machine')
+        drills = create_product(self.user, name='Drills')
+        drill = create_product(self.user, name='Drill')
+        create_product(self.user, name='Saw')
+        self.assertEqual(self.search('drill'), [drill.id, drills.id, drilling.id])
+        self.assertEqual(self.search('drill machine'), [drilling.id])
+
+    def test_typos_fall_back_to_similar_names(self):
+        hammer = create_product(self.user, name='Hammer')
+        self.assertEqual(self.search('hamer'), [hammer.id])
+
+    def test_results_are_scoped_to_the_user(self):
+        # Owner phrases must not match a longer id with the same prefix
+        first = User.objects.create_user('first', id=7)
+        second = User.objects.create_user('second', id=77)
+        for user in [self.user, first, second]:
+            create_product(user, name='Hammer')
+        for user in [self.user, first, second]:
+            with self.subTest(user=user.username):
+                self.assertEqual(
+                    self.search('hammer', user), list(Product.objects.filter(user=user).values_list('id', flat=True))
+                )
+
+    def test_endpoint(self):
+        hammer = create_product(self.user, name='Hammer', price=Decimal('9.50'))
+        create_product(User.objects.create_user('other'), name='Hammer')
+        response = self.client.get('/api/products/search/', {'q': 'hammer', 'fields': 'id,price'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data, {'results': [{'id': hammer.id, 'price': '9.50'}]})
+        for params in [{'q': ''}, {'q': 'x' * 101}, {'q': 'hammer', 'limit': 0}]:
+            with self.subTest(params=params):
+                self.assertEqual(self.client.get('/api/products/search/', params).status_code, 400)
+
+
+@override_settings(INSIGHTS_THROTTLE_RATES={'user': '2/m', 'global': '5/m'})
+class InsightsThrottleTests(APITestCase):
+    url = '/api/insights/'
+
+    def client_for(self, username):
+        client = APIClient()
+        client.force_authenticate(User.objects.create_user(username))
+        return client
+
+    def test_user_bucket(self):
+        statuses = [self.client.post(self.url).status_code for _ in range(4)]
+        self.assertEqual(statuses, [200, 200, 429, 429])
+
+    def test_refused_requests_do_not_drain_global_bucket(self):
+        for _ in range(8):
+            self.client.post(self.url)
+        self.assertEqual(self.client_for('other').post(self.url).status_code, 200)
+
+    def test_global_bucket(self):
+        for n in range(3):
+            client = self.client_for(f'user{n}')
+            for _ in range(2):
+                client.post(self.url)
+        # Six requests were allowed by user buckets; the global one holds five
+        response = self.client.post(self.url)
+        self.assertEqual(response.status_code, 429)
+        self.assertIn('Retry-After', response)
+
+
+@override_settings(GROQ_MAX_RETRIES=0, DATABASE_REPLICAS=[])
+class InsightsCoalescingTests(TransactionTestCase):
+    def setUp(self):
+        for cache in caches.all():
+            cache.clear()
+        self.user = User.objects.create_user('owner')
+        create_product(self.user)
+
+    def test_concurrent_requests_share_one_llm_call(self):
+        results = []
+        barrier = threading.Barrier(4)
+
+        def request(client):
+            barrier.wait()
+            try:
+                results.append(generate_insights(self.user.id, client=client))
+            finally:
+                connection.close()
+
+        with FakeGroqServer(delay=0.5) as server:
+            client = GroqClient(api_url=server.url, api_key='test', model='test')
+            threads = [threading.Thread(target=request, args=(client,)) for _ in range(4)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            self.assertEqual(server.requests, 1)
+
+        self.assertEqual([insights for insights, _ in results], [DEFAULT_INSIGHTS] * 4)
+        self.assertEqual(singleflight._calls, {})
+
+
+@override_settings(GROQ_MAX_RETRIES=0, INSIGHTS_THROTTLE_RATES={})
+class InsightsStreamTests(APITestCase):
+    def stream(self, **server_options):
+        create_product(self.user)
+        with FakeGroqServer(**server_options) as server:
+            with self.settings(GROQ_API_URL=server.url):
+                response = self.client.post('/api/insights/stream/', HTTP_ACCEPT='text/event-stream')
+                body = b''.join(response.streaming_content).decode()
+        self.assertEqual(response.status_code, 200)
+        return body.rstrip().split('\n\n')
+
+    def test_tokens_then_done(self):
+        events = self.stream()
+        self.assertTrue(events[0].startswith('event: token'))
+        self.assertTrue(events[-1].startswith('event: done'))
+        self.assertEqual(json.loads(events[-1].split('data: ', 1)[1]), DEFAULT_INSIGHTS)
+
+    def test_broken_upstream_stream_ends_with_error_event(self):
+        for failure in ['disconnect', 'invalid']:
+            with self.subTest(failure=failure):
+                for cache in caches.all():
+                    cache.clear()
+                events = self.stream(stream_failure=failure)
+                self.assertTrue(events[-1].startswith('event: error'))
+
+
+@override_settings(PASSWORD_PBKDF2_ITERATIONS=1000)
+class SeedInventoryTests(TestCase):
+    def seed(self, seed):
+        call_command(
+            'seed_inventory', users=2, products=30, prefix='seed', password='pw', seed=seed, batch_size=7,
+            stdout=StringIO(),
+        )
+
+    def test_reseeding_replaces_users_and_rebuilds_summary(self):
+        self.seed(1)
+        self.seed(2)
+        users = User.objects.filter(username__startswith='seed')
+        self.assertEqual(users.count(), 2)
+        self.assertEqual(Product.objects.count(), 60)
+        for user in users:
+            self.assertTrue(user.check_password('pw'))
+            seeded = summary_rows(user)
+            self.assertEqual(sum(row[1] for row in seeded), 30)
+            summary.rebuild(user.id)
+            self.assertEqual(seeded, summary_rows(user))
+
+
+class LoadtestBaselineTests(TestCase):
+    def report(self, p95_ms, throughput_rps):
+        return {'scenarios': {'list': {
+            'p95_ms': p95_ms, 'throughput_rps': throughput_rps, 'queries_per_request': 3,
+        }}}
+
+    def compare(self, report, tolerance=0.2):
+        with tempfile.NamedTemporaryFile('w', suffix='.json') as baseline:
+            json.dump(self.report(p95_ms=10.0, throughput_rps=100.0), baseline)
+            baseline.flush()
+            loadtest.Command(stderr=StringIO()).compare(report, baseline.name, tolerance)
+
+    def test_within_tolerance(self):
+        self.compare(self.report(p95_ms=11.9, throughput_rps=81.0))
+
+    def test_regressions_fail(self):
+        for report, metric in [
+            (self.report(p95_ms=12.5, throughput_rps=100.0), 'list.p95_ms'),
+            (self.report(p95_ms=10.0, throughput_rps=70.0), 'list.throughput_rps'),
+        ]:
+            with self.subTest(metric=metric):
+                with self.assertRaisesMessage(CommandError, metric):
+                    self.compare(report)
+
+    def test_percentile(self):
+        values = list(range(1, 101))
+        self.assertEqual(loadtest.percentile(values, 0.5), 51)
+        self.assertEqual(loadtest.percentile(values, 0.99), 99)
+        self.assertIsNone(loadtest.percentile([], 0.5))
@@ -0,0 +1,110 @@
+"""
+Token bucket throttles for the insights endpoints.
+
+Buckets live in the THROTTLE_CACHE alias. With the default locmem backend
+they are per process, so a limit applies to each worker separately; a
+shared backend (redis or memcached) makes it apply across all of them.
+A rate of ``"N/period"`` means a bucket holds up to N requests and
+refills at N per period; each request takes one token.
+"""
+
+import math
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.throttling import BaseThrottle
+
+from inventory_backend import metrics
+
+PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+# Attempts at the per-bucket lock before updating without it
+LOCK_ATTEMPTS = 20
+LOCK_WAIT = 0.002
+
+
+def parse_rate(rate):
+    """Return ``(capacity, tokens_per_second)`` for ``"N/period"``, or None if unset."""
+    if not rate:
+        return None
+    count, period = rate.split('/')
+    capacity = int(count)
+    return capacity, capacity / PERIODS[period[0]]
+
+
+def _acquire(cache, lock_key):
+    for _ in range(LOCK_ATTEMPTS):
+        if cache.add(lock_key, 1, timeout=1):
+            return True
+        time.sleep(LOCK_WAIT)
+    return False
+
+
+def take(key, capacity, refill, now=None, cache=None):
+    """
+    Take a token from the bucket at ``key``.
+
+    Returns ``(allowed, wait)`` where ``wait`` is the seconds until a
+    token is available again.
+    """
+    cache = cache or caches[settings.THROTTLE_CACHE]
+    now = time.time() if now is None else now
+    lock_key = f'{key}:lock'
+    # Cache backends have no compare-and-set; a short lock keeps the
+    # read-modify-write from losing updates under concurrency
+    locked = _acquire(cache, lock_key)
+    try:
+        tokens, updated = cache.get(key) or (capacity, now)
+        tokens = min(capacity, tokens + max(0.0, now - updated) * refill)
+        allowed = tokens >= 1
+        if allowed:
+            tokens -= 1
+        # Kept until the bucket would be full again, after which a fresh one is equivalent
+        cache.set(key, (tokens, now), timeout=math.ceil((capacity - tokens) / refill) + 1)
+    finally:
+        if locked:
+            cache.delete(lock_key)
+    return allowed, 0.0 if allowed else (1 - tokens) / refill
+
+
+class InsightsThrottle(BaseThrottle):
+    """
+    Take from the user's bucket, then from the global one; the rates are
+    ``settings.INSIGHTS_THROTTLE_RATES['user']`` and ``['global']``.
+
+    The global bucket is only charged for requests the user's bucket let
+    through, so one client retrying in a loop cannot drain it for everyone.
+    """
+
+    def buckets(self, request):
+        if request.user and request.user.is_authenticated:
+            yield 'user', f'throttle:insights:user:{request.user.id}'
+        yield 'global', 'throttle:insights:global'
+
+    def allow_request(self, request, view):
+        self._wait = 0.0
+        for scope, key in self.buckets(request):
+            rate = parse_rate(settings.INSIGHTS_THROTTLE_RATES.get(scope))
+            if rate is None:
+                continue
+            allowed, self._wait = take(key, *rate)
+            if not allowed:
+                metrics.THROTTLED_REQUESTS.inc(scope=scope)
+                return False
+        return True
+
+    def wait(self):
+        return self._wait
+
+
+INSIGHTS_THROTTLES = [InsightsThrottle]
+
+
+def check(request, throttles=INSIGHTS_THROTTLES):
+    """
+    Run ``throttles`` outside DRF; return the seconds to wait, or None if allowed.
+
+    Like DRF, every throttle is consulted and the longest wait wins.
+    """
+    waits = [throttle.wait() for throttle in (cls() for cls in throttles) if not throttle.allow_request(request, None)]
+    return max(waits) if waits else None
@@ -1,8 +1,24 @@
+from django.conf import settings
 from django.urls import path
-from .views import ProductListCreateView, ProductRetrieveUpdateDeleteView, InsightsView
+from .async_views import AsyncInsightsView
+from .views import (
+    ProductListCreateView, ProductRetrieveUpdateDeleteView, ProductBulkView, ProductBatchUpdateView, ProductSearchView,
+    InventorySummaryView, InsightsView, InsightJobView, InsightsCacheStatsView, InsightsStreamView,
+)
 
 urlpatterns = [
     path('products/', ProductListCreateView.as_view(), name='product-list-create'),
+    path('products/bulk/', ProductBulkView.as_view(), name='product-bulk'),
+    path('products/batch/', ProductBatchUpdateView.as_view(), name='product-batch'),
+    path('products/search/', ProductSearchView.as_view(), name='product-search'),
     path('products/<str:id>/', ProductRetrieveUpdateDeleteView.as_view(), name='product-detail'),
-    path('insights/', InsightsView.as_view(), name='insights'),
+    path('summary/', InventorySummaryView.as_view(), name='inventory-summary'),
+    path(
+        'insights/',
+        AsyncInsightsView.as_view() if settings.INSIGHTS_ASYNC_VIEW else InsightsView.as_view(),
+        name='insights'
+    ),
+    path('insights/stream/', InsightsStreamView.as_view(), name='insights-stream'),
+    path('insights/cache-stats/', InsightsCacheStatsView.as_view(), name='insights-cache-stats'),
+    path('insights/<uuid:job_id>/', InsightJobView.as_view(), name='insight-job'),
 ]
\ No newline at end of file
@@ -0,0 +1,99 @@
+"""
+Per-user inventory versions, conditional GETs and the product response cache.
+
+Every product write bumps the user's InventoryVersion row inside the writing
+transaction. Product reads look up that row (one primary-key query), derive
+a strong ETag and Last-Modified from it, and answer ``304 Not Modified``
+without touching the product table when the client is current. Otherwise
+the serialized payload is served from the cache, keyed by user, version and
+request, so an unchanged inventory is only serialized once.
+"""
+
+import hashlib
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+from rest_framework import status
+from rest_framework.response import Response
+
+from .models import InventoryVersion
+
+
+def bump(user_id):
+    """Increment ``user_id``'s inventory version; call inside the write transaction."""
+    now = timezone.now()
+    rows = InventoryVersion.objects.filter(user_id=user_id)
+    if rows.update(version=F('version') + 1, updated_at=now):
+        return
+    try:
+        with transaction.atomic():
+            InventoryVersion.objects.create(user_id=user_id, version=1, updated_at=now)
+    except IntegrityError:
+        # Created concurrently; fall back to the increment
+        rows.update(version=F('version') + 1, updated_at=now)
+
+
+def current(user_id):
+    """Return ``(version, updated_at)``; ``(0, None)`` before the first write."""
+    row = InventoryVersion.objects.filter(user_id=user_id).values_list('version', 'updated_at').first()
+    return row or (0, None)
+
+
+def _request_key(request, user_id, version):
+    # The representation depends on the path, query string and Accept header
+    raw = '\n'.join([
+        str(user_id), str(version), request.get_full_path(), request.META.get('HTTP_ACCEPT', ''),
+    ])
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+
+class ConditionalResponseMixin:
+    """
+    Conditional GET and response caching for the product list/detail views.
+
+    Subclasses keep their normal ``list``/``retrieve``; this wraps them.
+    """
+
+    def list(self, request, *args, **kwargs):
+        return self.versioned_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.versioned_response(super().retrieve, request, *args, **kwargs)
+
+    def versioned_response(self, view, request, *args, **kwargs):
+        version, updated_at = current(request.user.id)
+        key = _request_key(request, request.user.id, version)
+        etag = f'"{key[:32]}"'
+        # HTTP dates have one-second resolution
+        last_modified = int(updated_at.timestamp()) if updated_at else None
+
+        not_modified = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if not_modified is not None:
+            return self._add_validators(not_modified, etag, last_modified)
+
+        cache = caches[settings.PRODUCT_RESPONSE_CACHE]
+        cache_key = f"products:{key}"
+        data = cache.get(cache_key)
+        if data is not None:
+            response = Response(data)
+        else:
+            response = view(request, *args, **kwargs)
+            if response.status_code == status.HTTP_200_OK:
+                cache.set(cache_key, response.data, settings.PRODUCT_RESPONSE_CACHE_TTL)
+        if response.status_code == status.HTTP_200_OK:
+            self._add_validators(response, etag, last_modified)
+        return response
+
+    def _add_validators(self, response, etag, last_modified):
+        response['ETag'] = etag
+        if last_modified is not None:
+            response['Last-Modified'] = http_date(last_modified)
+        # Clients may keep the copy but must revalidate before reusing it
+        patch_cache_control(response, private=True, no_cache=True)
+        response['Vary'] = 'Accept, Authorization'
+        return response
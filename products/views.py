@@ -1,37 +1,233 @@
+import logging
+
 from rest_framework import generics
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
+from rest_framework.renderers import JSONRenderer
+from rest_framework.parsers import MultiPartParser
 from rest_framework.permissions import IsAuthenticated
-from .models import Product
-from .serializers import ProductSerializer
+from .models import InsightJob, Product
+from .serializers import (
+    FIELD_COLUMNS, InventorySummarySerializer, ProductSerializer, product_rows, read_fields,
+)
+from .filters import ProductFilter, ProductOrderingFilter
+from .insights import InsightsError, generate_insights, stream_insights
+from .renderers import CSVRenderer, EventStreamRenderer, NDJSONRenderer, format_event
+from .parsers import CSVStreamParser, NDJSONStreamParser
+from .bulk import export_csv, export_ndjson, import_products, iter_csv_rows, iter_ndjson_rows
+from .batch import CONFLICT, apply_batch
+from .search import MAX_QUERY_LENGTH, search_product_ids
+from .summary import summary_stats
+from .throttling import INSIGHTS_THROTTLES
+from .versioning import ConditionalResponseMixin
+from . import insights_cache, jobs
 from django.conf import settings
-import requests
-import json
+from django.db import transaction
+from django.http import StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from inventory_backend.routers import ReplicaReadMixin
+
+logger = logging.getLogger(__name__)
 
-class ProductListCreateView(generics.ListCreateAPIView):
+class ProductListCreateView(ReplicaReadMixin, ConditionalResponseMixin, generics.ListCreateAPIView):
     serializer_class = ProductSerializer
     permission_classes = [IsAuthenticated]
+    filter_backends = [ProductFilter, ProductOrderingFilter]
 
     def get_queryset(self):
         # Only return products for the authenticated user
-        return Product.objects.filter(user=self.request.user)
+        return Product.objects.filter(user_id=self.request.user.id)
+
+    def list(self, request, *args, **kwargs):
+        return self.versioned_response(self.list_rows, request, *args, **kwargs)
 
+    def list_rows(self, request, *args, **kwargs):
+        # Read fast path: plain values() rows instead of model instances and
+        # ProductSerializer, with the same output.
+        fields = read_fields(request)
+        columns = {FIELD_COLUMNS.get(name, name) for name in fields}
+        # The cursor needs whichever key the page is ordered by
+        columns.update(ProductOrderingFilter.ordering_fields)
+        queryset = self.filter_queryset(self.get_queryset()).values(*columns)
+        page = self.paginate_queryset(queryset)
+        if page is None:
+            return Response(product_rows(queryset, fields))
+        return self.get_paginated_response(product_rows(page, fields))
+
+    @transaction.atomic
     def perform_create(self, serializer):
         # Automatically set the user to the authenticated user
-        serializer.save(user=self.request.user)
+        serializer.save(user_id=self.request.user.id)
 
-class ProductRetrieveUpdateDeleteView(generics.RetrieveUpdateDestroyAPIView):
+class ProductRetrieveUpdateDeleteView(ReplicaReadMixin, ConditionalResponseMixin, generics.RetrieveUpdateDestroyAPIView):
     serializer_class = ProductSerializer
     lookup_field = 'id'
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
         # Only return products for the authenticated user
-        return Product.objects.filter(user=self.request.user)
+        return Product.objects.filter(user_id=self.request.user.id)
+
+    # The inventory summary is updated by signal handlers; keep it in the
+    # same transaction as the product write.
+    @transaction.atomic
+    def perform_update(self, serializer):
+        serializer.save()
+
+    @transaction.atomic
+    def perform_destroy(self, instance):
+        instance.delete()
+
+class ProductBulkView(APIView):
+    """
+    GET streams the user's products as NDJSON (default) or CSV.
+    POST imports a CSV or NDJSON body, or a multipart ``file`` upload.
+    """
+    permission_classes = [IsAuthenticated]
+    parser_classes = [CSVStreamParser, NDJSONStreamParser, MultiPartParser]
+    renderer_classes = [JSONRenderer, NDJSONRenderer, CSVRenderer]
+
+    def get(self, request):
+        products = Product.objects.filter(user_id=request.user.id)
+        chunk_size = settings.PRODUCT_EXPORT_CHUNK_SIZE
+        if request.accepted_renderer.format == 'csv':
+            response = StreamingHttpResponse(
+                export_csv(products, chunk_size), content_type="text/csv; charset=utf-8"
+            )
+            response["Content-Disposition"] = 'attachment; filename="products.csv"'
+        else:
+            response = StreamingHttpResponse(
+                export_ndjson(products, chunk_size), content_type="application/x-ndjson; charset=utf-8"
+            )
+            response["Content-Disposition"] = 'attachment; filename="products.ndjson"'
+        return response
+
+    def post(self, request):
+        try:
+            batch_size = int(request.query_params.get('batch_size', settings.PRODUCT_BULK_BATCH_SIZE))
+        except ValueError:
+            batch_size = 0
+        if not 1 <= batch_size <= settings.PRODUCT_BULK_MAX_BATCH_SIZE:
+            return Response(
+                {"error": f"batch_size must be between 1 and {settings.PRODUCT_BULK_MAX_BATCH_SIZE}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        rows = request.data
+        if 'file' in request.FILES:
+            upload = request.FILES['file']
+            if upload.name.lower().endswith('.csv') or upload.content_type == 'text/csv':
+                rows = iter_csv_rows(upload)
+            else:
+                rows = iter_ndjson_rows(upload)
+        elif not hasattr(rows, '__next__'):
+            return Response(
+                {"error": "Upload a CSV or NDJSON body, or a multipart 'file'"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        report = import_products(request.user.id, rows, batch_size)
+        return Response(report.as_dict())
+
+class ProductBatchUpdateView(APIView):
+    """
+    PATCH a list of ``{"id", "quantity_delta"}`` or ``{"id", "fields", "version"}``
+    items in one transaction. Any failing item rolls back the whole batch.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def patch(self, request):
+        items = request.data
+        if isinstance(items, dict):
+            items = items.get('items')
+        if not isinstance(items, list) or not items:
+            return Response(
+                {"error": "Send a non-empty list of items"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if len(items) > settings.PRODUCT_BATCH_MAX_ITEMS:
+            return Response(
+                {"error": f"At most {settings.PRODUCT_BATCH_MAX_ITEMS} items per batch"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        results, committed = apply_batch(request.user.id, items)
+        if committed:
+            return Response({"results": results})
+        conflict = any(result['status'] == CONFLICT for result in results)
+        return Response(
+            {"rolled_back": True, "results": results},
+            status=status.HTTP_409_CONFLICT if conflict else status.HTTP_400_BAD_REQUEST
+        )
+
+class ProductSearchView(ReplicaReadMixin, ConditionalResponseMixin, APIView):
+    """
+    GET ``?q=`` returns the user's best-matching products, ranked, as
+    ``{"results": [...]}``. ``limit`` caps the results and ``fields`` works
+    as on the product list.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        return self.versioned_response(self.search, request)
+
+    def search(self, request):
+        query = request.query_params.get('q', '').strip()
+        if not query or len(query) > MAX_QUERY_LENGTH:
+            return Response(
+                {"error": f"q must be between 1 and {MAX_QUERY_LENGTH} characters"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        try:
+            limit = int(request.query_params.get('limit', settings.PRODUCT_SEARCH_LIMIT))
+        except ValueError:
+            limit = 0
+        if not 1 <= limit <= settings.PRODUCT_SEARCH_MAX_LIMIT:
+            return Response(
+                {"error": f"limit must be between 1 and {settings.PRODUCT_SEARCH_MAX_LIMIT}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        ids = search_product_ids(request.user.id, query, limit)
+        fields = read_fields(request)
+        columns = {FIELD_COLUMNS.get(name, name) for name in fields} | {'id'}
+        rows = {
+            row['id']: row
+            for row in Product.objects.filter(user_id=request.user.id, id__in=ids).values(*columns)
+        }
+        return Response({"results": product_rows([rows[id] for id in ids if id in rows], fields)})
+
+class InventorySummaryView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        # Figures only; the report has no product name lists
+        stats = summary_stats(request.user.id, list_limit=0)
+        categories = InventorySummarySerializer(stats['categories'], many=True).data
+        for row, category in zip(categories, stats['categories']):
+            row['share'] = round(category['share'], 2)
+        return Response({
+            "total_items": stats['total_items'],
+            "total_value": f"{stats['total_value']:.2f}",
+            "low_stock_count": stats['low_stock_count'],
+            "out_of_stock_count": stats['out_of_stock_count'],
+            "categories": categories,
+        })
 
-class InsightsView(APIView):
+class InsightsView(ReplicaReadMixin, APIView):
     permission_classes = [IsAuthenticated]
+    throttle_classes = INSIGHTS_THROTTLES
+    # POST only aggregates; the job it may create is a write and goes to the primary
+    replica_methods = ('POST',)
+
+    def use_async(self, request):
+        # ?async=true|false overrides the INSIGHTS_ASYNC default
+        value = request.query_params.get('async')
+        if value is None:
+            return settings.INSIGHTS_ASYNC
+        return value.lower() in ('1', 'true', 'yes')
 
     def post(self, request):
         try:
@@ -42,137 +238,73 @@ class InsightsView(APIView):
                     status=status.HTTP_401_UNAUTHORIZED
                 )
 
-            products = Product.objects.filter(user=request.user)
-
-            # Handle empty inventory
-            if not products.exists():
+            if self.use_async(request):
+                job = jobs.enqueue(request.user.id)
+                location = reverse('insight-job', kwargs={'job_id': job.id})
                 return Response(
-                    {
-                        "summary": "No inventory data available.",
-                        "trends": "No trends available due to lack of inventory data.",
-                        "actions": "No actions recommended at this time."
-                    },
-                    status=status.HTTP_200_OK
+                    {"job_id": str(job.id), "status": job.status, "url": location},
+                    status=status.HTTP_202_ACCEPTED,
+                    headers={"Location": location}
                 )
 
-            total_items = products.count()
-            total_value = sum(p.quantity * p.price for p in products)
-            categories = list(set(p.category for p in products))
-            low_stock = [p for p in products if p.quantity < 10 and p.quantity != 0]
-            out_of_stock = [p for p in products if p.quantity == 0]
-
-            # Calculate category percentages
-            category_counts = {}
-            for product in products:
-                category_counts[product.category] = category_counts.get(product.category, 0) + 1
-            category_percentages = {
-                cat: (count / total_items * 100) for cat, count in category_counts.items()
-            }
-            sorted_categories = sorted(
-                category_percentages.items(),
-                key=lambda x: x[1],
-                reverse=True
-            )   
-
-            inventory_summary = (
-                f"Total items: {total_items}\n"
-                f"Total value: ${total_value:.2f}\n"
-                f"Categories: {', '.join(categories)}\n"
-                f"Low stock items (<=10): {', '.join([f'{p.name} ({p.quantity})' for p in low_stock]) or 'None'}\n"
-                f"Out of stock items: {', '.join([p.name for p in out_of_stock]) or 'None'}"
-            )
+            generated_insights, cache_hit = generate_insights(request.user.id)
+            headers = {}
+            if cache_hit is not None:
+                headers["X-Insights-Cache"] = "HIT" if cache_hit else "MISS"
+            return Response(generated_insights, headers=headers)
 
-            prompt = (
-                "You are an AI inventory analyst. Based on the provided inventory data, generate insights in three sections: Summary, Trends, and Actions. "
-                "Provide concise, professional responses suitable for a dashboard.\n\n"
-                "**Inventory Data**:\n"
-                f"{inventory_summary}\n\n"
-                "**Instructions**:\n"
-                "- **Summary**: Provide a concise overview of the inventory in three distinct paragraphs, separated by double line breaks (use \n\n)."
-                "First paragraph: State the total number of items, number of distinct categories, and the total inventory value (e.g., 'The inventory includes 1,200 items across 8 categories, with a total value of $150,000'). Ensure figures are clear and precise, using approximate values if exact data is unavailable."
-                "Second paragraph: Identify the top categories by inventory share, including their percentages (e.g., 'Electronics (42%), Apparel (25%), and Home Goods (15%) dominate the inventory'). If percentages cannot be calculated due to missing data, briefly explain the limitation (e.g., 'Category percentages are unavailable due to incomplete sales data')."
-                "Offer a hypothetical comparison to a previous period, prefixed with '🔄 Based on historical data' (e.g., '🔄 Based on historical data, current inventory levels are 18% higher than last year, reflecting increased stock in high-demand categories'). If no prior data exists, note the assumption or use industry trends for context.\n"
-                "- **Trends**: Write three distinct paragraphs (use \\n\\n for paragraph breaks), identifying growth or decline patterns for products or categories, inferring based on quantities (e.g., low stock suggests high demand). "
-                "First paragraph: Discuss demand patterns (e.g., 'Low stock levels of X suggest high demand'). "
-                "Second paragraph: Comment on inventory management (e.g., 'No out-of-stock items indicate effective inventory management'). "
-                "Third paragraph: Summarize how demand patterns and inventory management affect sales, customer experience, or operational efficiency (e.g., 'High demand for X, paired with strong inventory practices, likely boosts customer satisfaction by ensuring product availability'). Highlight any potential risks or opportunities, such as overstocking less popular items or scaling up stock for high-demand products."
-                "Fourth paragraph: End with a note like '📈 Trend analysis based on current data, with recommendations for improvement'.\n"
-                "- **Actions**: Provide recommendations in two sections with markdown formatting:\n"
-                "  - Start with '**❗ Out of Stock:**' followed by a markdown list (using '-') of out-of-stock items (e.g., '- Wireless Mouse').\n"
-                "  - Followed '**⚠️ Low on Stock:**' followed by a markdown list (using '-') of low stock items or items less than 10 (e.g., '- [8] Wireless Mouse').\n"
-                "  - Then add '**💡 Optimization Suggestions:**' Provide strategic suggestions to improve inventory management in a markdown list (using '-'). Base recommendations on trends, demand, or efficiency (e.g., '- Reduce desk lamp inventory by 15% due to seasonal demand decline', '- Increase stock of high-demand wireless keyboards by 10%').\n"
-                "  - Use \\n for line breaks between bullets and sections.\n"
-                "- Each section should be as detailed as possible.\n"
-                "- **Critical**: Return ONLY a valid JSON object with keys 'summary', 'trends', 'actions'. The values should be strings with markdown and emojis where specified. "
-                "Do not include any text outside the JSON. Ensure the JSON is parseable.\n\n"
-                "**Example Output**:\n"
-                "{\"summary\": \"Your inventory consists of 93 items across 5 categories, with a total value of $12,489.75.\\n\\nElectronics is your largest category (42%), followed by Home Office (28%) and Accessories (15%).\\n\\n🔄 Based on historical data, your current inventory levels are 18% higher than the same period last year.\", "
-                "\"trends\": \"Wireless Headphones and Ergonomic Keyboards have shown consistent growth over the past 3 months.\\n\\nSales of desk accessories have decreased by 12% compared to last quarter.\\n\\n📈 Trend analysis based on 6-month data.\", "
-                "\"actions\": \"**❗ Out of Stock:**\\n- Wireless Mouse\\n- Ergonomic Keyboard\\n- Monitor Stand\\n**⚠️ Low on Stock:**\\n-[2] Wireless Keyboard\\n-[9] Wireless Earphones\\n**💡 Optimization Suggestions:**\\n- Consider bundling wireless peripherals for increased sales\\n- Reduce desk lamp inventory by 15% based on seasonal trends\"}\n\n"
-                "Now, generate the insights based on the provided data. Add more information on what each of the item category are mostly used for in Summary and ensure the output is concise and professional."
-                "Make at least 5 optimization suggestions."
-                "Make sure to include the emojis and markdown formatting as specified."
-                "Ensure that the Low on Stock displays the number of items in square brackets (e.g., -[2] Wireless Keyboard)."
-                "- **Important Note**: Ensure the JSON output is syntactically correct (e.g., proper brackets, quotes, commas). Do not include trailing commas, unclosed brackets, or any invalid JSON syntax. Double-check that the output can be parsed by a JSON parser without errors."
-                "Ensure that the JSON output will not return this error: Failed to generate insights error: Invalid JSON format in Groq response."
-            )
+        except InsightsError as e:
+            return Response({"error": e.message}, status=e.status_code)
 
-            response = requests.post(
-                "https://api.groq.com/openai/v1/chat/completions",
-                headers={
-                    "Content-Type": "application/json",
-                    "Authorization": f"Bearer {settings.GROQ_API_KEY}",
-                },
-                json={
-                    "model": "meta-llama/llama-4-scout-17b-16e-instruct",
-                    "messages": [{"role": "user", "content": prompt}]
-                },
+        except Exception:
+            logger.exception("Insights request failed")
+            return Response(
+                {"error": "Internal server error"},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
 
-            if not response.ok:
-                error_body = response.text
-                print(f"Groq API Error: {response.status_code} {error_body}")
-                return Response(
-                    {"error": f"Failed to generate insights: {error_body}"},
-                    status=response.status_code
-                )
-            
-            data = response.json()
-            content = data.get("choices", [{}])[0].get("message", {}).get("content", "")
-            print(f"Raw Groq response: {content}")
-
-            import re
-            json_match = re.search(r"```json\s*\n([\s\S]*?)\n```", content)
+class InsightsStreamView(ReplicaReadMixin, APIView):
+    permission_classes = [IsAuthenticated]
+    throttle_classes = INSIGHTS_THROTTLES
+    replica_methods = ('POST',)
+    renderer_classes = [JSONRenderer, EventStreamRenderer]
 
-            if json_match:
-                json_text = json_match.group(1)
-            else:
-                # Fallback: Try using full content directly
-                json_text = content.strip()
-            
-            try:
-                generated_insights = json.loads(json_text)
-
-                # Check for required keys
-                if not all(key in generated_insights for key in ["summary", "trends", "actions"]):
-                    print(f"Missing required keys in Groq response: {generated_insights}")
-                    return Response(
-                        {"error": "Incomplete insights data from Groq API"},
-                        status=status.HTTP_500_INTERNAL_SERVER_ERROR
-                    )
-
-                return Response(generated_insights)
-
-            except json.JSONDecodeError as e:
-                print(f"JSON parse error: {str(e)}, content: {json_text}")
-                return Response(
-                    {"error": "Invalid JSON format in Groq response"},
-                    status=status.HTTP_500_INTERNAL_SERVER_ERROR
-                )
-        
-        except Exception as e:
-            print(f"Server error: {str(e)}")
+    def post(self, request):
+        try:
+            events, cache_hit = stream_insights(request.user.id)
+        except Exception:
+            logger.exception("Insights request failed")
             return Response(
                 {"error": "Internal server error"},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
-            )
\ No newline at end of file
+            )
+
+        response = StreamingHttpResponse(
+            (format_event(event, data) for event, data in events),
+            content_type="text/event-stream; charset=utf-8"
+        )
+        response["Cache-Control"] = "no-cache"
+        # Stop nginx from buffering the stream
+        response["X-Accel-Buffering"] = "no"
+        if cache_hit is not None:
+            response["X-Insights-Cache"] = "HIT" if cache_hit else "MISS"
+        return response
+
+class InsightJobView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, job_id):
+        job = get_object_or_404(InsightJob, id=job_id, user_id=request.user.id)
+        data = {"job_id": str(job.id), "status": job.status}
+        if job.status == InsightJob.DONE:
+            data["result"] = job.result
+        elif job.status == InsightJob.FAILED:
+            data["error"] = job.error
+            data["error_status"] = job.error_status
+        return Response(data)
+
+class InsightsCacheStatsView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        return Response(insights_cache.stats())
@@ -0,0 +1,35 @@
+"""
+Authentication that trusts the signed token claims instead of loading the
+User row on every request.
+
+``request.user`` is a ClaimsUser: ``id``, ``username`` and ``is_active`` come
+from the token, so views that only filter by ``request.user.id`` run no auth
+query. A view that needs the full model loads it by ``request.user.id``.
+"""
+
+from django.contrib.auth import get_user_model
+from django.utils.functional import cached_property
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTStatelessUserAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.models import TokenUser
+
+
+class ClaimsUser(TokenUser):
+    @cached_property
+    def id(self):
+        # Claims are strings; match the type of User.pk so ids compare equal
+        return get_user_model()._meta.pk.to_python(super().id)
+
+    @cached_property
+    def is_active(self):
+        # Tokens issued before the claim existed were only given to active users
+        return self.token.get('is_active', True)
+
+
+class StatelessJWTAuthentication(JWTStatelessUserAuthentication):
+    def get_user(self, validated_token):
+        user = super().get_user(validated_token)
+        if not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        return user
@@ -0,0 +1,22 @@
+"""
+Password hashers whose cost is set from settings.
+
+They keep Django's algorithm names, so existing hashes still verify. When
+the configured cost differs from a stored hash's cost, ``must_update`` is
+true and the hash is re-encoded on the user's next successful login.
+"""
+
+from django.conf import settings
+from django.contrib.auth import hashers
+
+
+class PBKDF2PasswordHasher(hashers.PBKDF2PasswordHasher):
+    @property
+    def iterations(self):
+        return settings.PASSWORD_PBKDF2_ITERATIONS
+
+
+class ScryptPasswordHasher(hashers.ScryptPasswordHasher):
+    @property
+    def work_factor(self):
+        return settings.PASSWORD_SCRYPT_WORK_FACTOR
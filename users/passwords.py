@@ -0,0 +1,86 @@
+"""
+Bounded password hashing for login and registration.
+
+Hashing is deliberately slow, but hashlib's pbkdf2_hmac and scrypt release
+the GIL, so hashes run inline on the request thread without stalling the
+rest of the process and use separate cores in parallel. What a burst of
+logins can do is tie up every request thread at once. At most
+PASSWORD_HASH_CONCURRENCY hashes run at a time per process; a request that
+gets no slot within PASSWORD_HASH_QUEUE_TIMEOUT seconds raises
+PasswordHashBusy so the caller can shed load rather than queue
+indefinitely. Set PASSWORD_HASH_CONCURRENCY to 0 to remove the cap.
+"""
+
+import threading
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import check_password, get_hasher, identify_hasher, make_password
+
+_slots = None
+_slots_lock = threading.Lock()
+
+
+class PasswordHashBusy(Exception):
+    """Raised when no hashing slot frees up in time."""
+
+
+def get_slots():
+    global _slots
+    with _slots_lock:
+        if _slots is None:
+            _slots = threading.BoundedSemaphore(settings.PASSWORD_HASH_CONCURRENCY)
+    return _slots
+
+
+def _run(func, *args):
+    if not settings.PASSWORD_HASH_CONCURRENCY:
+        return func(*args)
+    slots = get_slots()
+    if not slots.acquire(timeout=settings.PASSWORD_HASH_QUEUE_TIMEOUT):
+        raise PasswordHashBusy()
+    try:
+        return func(*args)
+    finally:
+        slots.release()
+
+
+def hash_password(raw_password):
+    return _run(make_password, raw_password)
+
+
+def _verify(raw_password, encoded):
+    # Check the password and, if the stored hash uses outdated parameters,
+    # return a fresh one within the same slot.
+    if not check_password(raw_password, encoded):
+        return False, None
+    preferred = get_hasher()
+    try:
+        hasher = identify_hasher(encoded)
+    except ValueError:
+        return True, None
+    outdated = hasher.algorithm != preferred.algorithm or preferred.must_update(encoded)
+    return True, make_password(raw_password) if outdated else None
+
+
+def authenticate(username, password):
+    """
+    Return the active user matching the credentials, or None.
+
+    Equivalent to django.contrib.auth.authenticate() with ModelBackend,
+    including the transparent upgrade of outdated hashes.
+    """
+    User = get_user_model()
+    user = User._default_manager.filter(**{User.USERNAME_FIELD: username}).first()
+    if user is None:
+        # Hash anyway so unknown usernames take as long as wrong passwords
+        hash_password(password)
+        return None
+
+    valid, upgraded = _run(_verify, password, user.password)
+    if not valid or not user.is_active:
+        return None
+    if upgraded:
+        user.password = upgraded
+        user.save(update_fields=['password'])
+    return user
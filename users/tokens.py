@@ -0,0 +1,26 @@
+"""
+JWTs carrying the user claims that StatelessJWTAuthentication needs.
+
+Access tokens copy their claims from the refresh token, so tokens issued by
+``/api/login/``, ``/api/register/``, ``/api/token/`` and
+``/api/token/refresh/`` all carry ``username`` and ``is_active``.
+"""
+
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+from rest_framework_simplejwt.tokens import RefreshToken
+
+
+def add_user_claims(token, user):
+    token['username'] = user.get_username()
+    token['is_active'] = user.is_active
+    return token
+
+
+class UserRefreshToken(RefreshToken):
+    @classmethod
+    def for_user(cls, user):
+        return add_user_claims(super().for_user(user), user)
+
+
+class UserTokenObtainPairSerializer(TokenObtainPairSerializer):
+    token_class = UserRefreshToken
@@ -2,10 +2,19 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 from django.contrib.auth.models import User
-from rest_framework_simplejwt.tokens import RefreshToken
-from django.contrib.auth import authenticate
+from django.db import IntegrityError, transaction
+from .tokens import UserRefreshToken
+from .passwords import PasswordHashBusy, authenticate, hash_password
 from rest_framework.permissions import AllowAny  # Import AllowAny
 
+def _busy():
+    response = Response(
+        {"error": "Too many sign-in attempts in progress, please retry"},
+        status=status.HTTP_503_SERVICE_UNAVAILABLE
+    )
+    response["Retry-After"] = "1"
+    return response
+
 class RegisterView(APIView):
     permission_classes = [AllowAny]  # Allow unauthenticated access
 
@@ -20,14 +29,26 @@ class RegisterView(APIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        if User.objects.filter(username=username).exists():
+        try:
+            user = User(
+                username=User.normalize_username(username),
+                email=User.objects.normalize_email(email),
+                password=hash_password(password),
+            )
+        except PasswordHashBusy:
+            return _busy()
+
+        # A single INSERT; the unique constraint on username settles races
+        try:
+            with transaction.atomic():
+                user.save()
+        except IntegrityError:
             return Response(
                 {"error": "Username already exists"},
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        user = User.objects.create_user(username=username, email=email, password=password)
-        refresh = RefreshToken.for_user(user)
+        refresh = UserRefreshToken.for_user(user)
         return Response({
             "message": "User registered successfully",
             "access": str(refresh.access_token),
@@ -47,14 +68,17 @@ class LoginView(APIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        user = authenticate(username=username, password=password)
+        try:
+            user = authenticate(username, password)
+        except PasswordHashBusy:
+            return _busy()
         if user is None:
             return Response(
                 {"error": "Invalid credentials"},
                 status=status.HTTP_401_UNAUTHORIZED
             )
 
-        refresh = RefreshToken.for_user(user)
+        refresh = UserRefreshToken.for_user(user)
         return Response({
             "access": str(refresh.access_token),
             "refresh": str(refresh),